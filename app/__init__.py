@@ -3,9 +3,12 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+import click
 from flask import Flask, render_template, redirect, url_for
 from app.config import Config
 from app.extensions import db
+from app.query_counter import init_query_counter
+from app.metrics import init_metrics
 from app.blueprints import auth_bp,admin_bp, teacher_bp, student_bp
 
 
@@ -26,6 +29,12 @@ def create_app(config_class=Config):
     # Initialize Flask extensions
     db.init_app(app)
 
+    # Count SQL statements per request (see app/query_counter.py)
+    init_query_counter(app)
+
+    # Request/SQL timing histograms and /metrics, when METRICS_ENABLED (see app/metrics.py)
+    init_metrics(app)
+
     # Register blueprints directly
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
@@ -47,8 +56,51 @@ def create_app(config_class=Config):
         db.session.rollback()
         return render_template('500.html'), 500
 
-    # Create database tables at startup
-    with app.app_context():
-        db.create_all()
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and indexes."""
+        init_db()
+        print("Database initialized.")
+
+    @app.cli.command('export-data')
+    @click.argument('output', type=click.File('w'), default='-')
+    @click.option('--tables', default='', help='Comma-separated tables (default: all).')
+    @click.option('--election-id', type=int, default=None, help='Only this election and its users.')
+    @click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), default='ndjson')
+    def export_data_command(output, tables, election_id, fmt):
+        """Stream a dump of the database to OUTPUT (default: stdout)."""
+        from app.services.export_service import iter_ndjson, iter_csv, resolve_tables
+
+        selected = resolve_tables([t for t in tables.split(',') if t])
+        if fmt == 'csv' and len(selected) != 1:
+            raise click.UsageError('CSV export needs exactly one table (--tables <name>).')
+        chunks = iter_csv(selected[0], election_id) if fmt == 'csv' else iter_ndjson(selected, election_id)
+        for chunk in chunks:
+            output.write(chunk)
+
+    @app.cli.command('import-data')
+    @click.argument('dump', type=click.File('r'))
+    def import_data_command(dump):
+        """Restore an NDJSON dump into an empty database."""
+        from app.services.export_service import import_ndjson
+
+        for table, count in import_ndjson(dump).items():
+            print(f"{table}: {count} rows")
+
+    # Create database tables at startup, unless the schema is managed with `flask init-db`
+    if app.config.get('AUTO_CREATE_SCHEMA', True):
+        with app.app_context():
+            db.create_all()
 
     return app
+
+
+def init_db():
+    """
+    Create every missing table, then add the indexes that db.create_all()
+    does not add to tables that already exist. Must run in an app context.
+    """
+    from app.scripts.migrate_indexes import migrate_indexes
+
+    db.create_all()
+    return migrate_indexes()
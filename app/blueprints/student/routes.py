@@ -5,16 +5,16 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from app.services import (
-    cast_vote,
-    delete_votes_by_student,
+    submit_ballot,
     get_votes_by_student,
     get_election_by_id,
     get_student_by_id,
     update_student_profile,
-    update_student_password
+    update_student_password,
+    get_votes_map
 )
 from app.models import Student, StudentVote
-from app.dao import get_groups_by_election, get_members_by_group
+from app.dao import get_groups_with_members
 from functools import wraps
 
 student_bp = Blueprint('student', __name__, url_prefix='/student')
@@ -101,10 +101,8 @@ def vote(election_id):
         if total_score > 100:
             flash(f"Total score cannot exceed 100. You have assigned {total_score}.", "danger")
         else:
-            delete_votes_by_student(election_id, student_id)
-            for candidate_id, score in scores.items():
-                if score > 0:
-                    cast_vote(election_id, student_id, candidate_id, score)
+            # Old ballot replaced in one transaction
+            submit_ballot(election_id, student_id, scores)
             flash("Votes submitted successfully.", "success")
             return redirect(url_for('student.dashboard'))
 
@@ -127,25 +125,12 @@ def vote(election_id):
 @student_required
 def view_results(election_id):
     election = get_election_by_id(election_id)
-    groups = get_groups_by_election(election_id)
-
-    # Get all votes for this election (list of StudentVote)
-    votes = StudentVote.query.filter_by(election_id=election_id).all()
-
-    # Build a mapping: voter_id -> dict of candidate_id -> score
-    votes_map = {}
-    for vote in votes:
-        votes_map.setdefault(vote.voter_id, {})[vote.candidate_id] = vote.score
-
-    # Build group data with members and their votes
-    group_data = []
-    for group in groups:
-        members = get_members_by_group(group.id)
-        students = [Student.query.get(m.student_id) for m in members]
-        group_data.append({
-            'group': group,
-            'members': students,
-        })
+
+    # Mapping voter_id -> dict of candidate_id -> score, from the election's affinity snapshot
+    votes_map = get_votes_map(election_id)
+
+    # Groups, members and student rows in one query
+    group_data = get_groups_with_members(election_id)
 
     return render_template('student/group_results.html',
                            election=election,
@@ -1,7 +1,7 @@
 import sys
 import os
 from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app, jsonify
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
@@ -11,11 +11,13 @@ from app.services import (
     list_all_students,
     get_teacher_by_id, 
     update_teacher_profile,
-    update_teacher_password, run_full_grouping
+    update_teacher_password,
+    grouping_engine_names, enqueue_grouping_job, get_job_status, job_status, GroupingJobConflict,
+    get_votes_map
 )
 
 from app.models import Student, StudentVote
-from app.dao import get_groups_by_election, get_members_by_group
+from app.dao import get_groups_with_members, get_latest_job_for_election
 
 teacher_bp = Blueprint('teacher', __name__, url_prefix='/teacher')
 
@@ -109,7 +111,9 @@ def manage_election(election_id):
     View and manage a specific election (students, votes, status).
     """
     election = get_election_by_id(election_id)
-    return render_template('teacher/manage_election.html', election=election)
+    job = get_latest_job_for_election(election_id)
+    return render_template('teacher/manage_election.html', election=election,
+                           job=job_status(job) if job else None)
 
 @teacher_bp.route('/election/<int:election_id>/delete')
 @teacher_required
@@ -145,56 +149,100 @@ def generate_groups(election_id):
 
     students = [s.id for s in election.students]
     group_size = election.students_per_group
+    engine = request.args.get('engine', current_app.config.get('GROUPING_ENGINE', 'kmeans'))
+
+    if engine not in grouping_engine_names():
+        flash(f"Unknown grouping engine '{engine}'.", "danger")
+        return redirect(url_for('teacher.manage_election', election_id=election_id))
 
     if len(students) < group_size:
         flash(f"Not enough students to form a group (need at least {group_size}).", "warning")
         return redirect(url_for('teacher.manage_election', election_id=election_id))
 
+    # ?profile=cpu|memory|all captures a cProfile and/or per-stage peak memory into the job result
+    profile = request.args.get('profile', '')
+    engine_options = {}
+    if engine == 'exact':
+        engine_options['time_limit'] = current_app.config.get('GROUPING_EXACT_TIME_LIMIT', 5.0)
+    elif engine == 'annealing':
+        # ?budget_ms= trades latency for quality, up to the configured maximum
+        default_budget = current_app.config.get('GROUPING_ANNEALING_BUDGET_MS', 2000)
+        max_budget = current_app.config.get('GROUPING_ANNEALING_MAX_BUDGET_MS', 30000)
+        budget_ms = request.args.get('budget_ms', default_budget, type=int)
+        engine_options['budget_ms'] = min(max(budget_ms, 1), max_budget)
+
+    # ?mode=incremental keeps the existing groups and only moves students whose votes changed
+    if request.args.get('mode') == 'incremental':
+        engine_options['incremental'] = True
+        engine_options['stability'] = current_app.config.get('GROUPING_STABILITY_PENALTY', 1.0)
+
+    # Grouping runs on the background job pool; a running job for this election absorbs
+    # an identical request, and a request with another engine or options is refused
+    wants_json = request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
     try:
-        student_to_group, score, groups_to_highlight, total_satisfaction, avg_satisfaction = run_full_grouping(
-            election_id, students, group_size
+        job = enqueue_grouping_job(
+            election_id, students, group_size, engine=engine,
+            restarts=current_app.config.get('GROUPING_RESTARTS', 5),
+            workers=current_app.config.get('GROUPING_WORKERS', 1),
+            refine=current_app.config.get('GROUPING_REFINE', False),
+            refine_budget=current_app.config.get('GROUPING_REFINE_BUDGET'),
+            profile=profile in ('cpu', 'all'),
+            trace_memory=profile in ('memory', 'all'),
+            **engine_options
         )
-        flash(f"Groups generated (Affinity Score: {score:.2f}, Satisfaction Score: {total_satisfaction:.2f}).", "success")
-    except Exception as e:
-        flash(f"Error during group formation: {str(e)}", "danger")
+    except GroupingJobConflict as conflict:
+        running = conflict.job
+        if wants_json:
+            return jsonify({
+                'error': str(conflict),
+                'job_id': running.id,
+                'engine': running.engine,
+                'status_url': url_for('teacher.grouping_job_status', job_id=running.id)
+            }), 409
+        flash(f"Group generation with {running.engine} is already in progress (job #{running.id}); "
+              f"try again when it has finished.", "warning")
         return redirect(url_for('teacher.manage_election', election_id=election_id))
 
-    return redirect(url_for('teacher.view_groups', election_id=election_id))
+    if wants_json:
+        return jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'engine': job.engine,
+            'status_url': url_for('teacher.grouping_job_status', job_id=job.id)
+        }), 202
+
+    flash(f"Group generation started with {engine} (job #{job.id}).", "info")
+    return redirect(url_for('teacher.manage_election', election_id=election_id))
+
+
+@teacher_bp.route('/jobs/<int:job_id>')
+@teacher_required
+def grouping_job_status(job_id):
+    """
+    Report the stage, progress and final scores of a group-generation job as JSON.
+    """
+    status = get_job_status(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(status)
 
 
 @teacher_bp.route('/election/<int:election_id>/groups')
 @teacher_required
 def view_groups(election_id):
     election = get_election_by_id(election_id)
-    groups = get_groups_by_election(election_id)
-
-    # Get all votes for this election (list of StudentVote)
-    votes = StudentVote.query.filter_by(election_id=election_id).all()
-
-    # Build a mapping: voter_id -> dict of candidate_id -> score
-    votes_map = {}
-    for vote in votes:
-        votes_map.setdefault(vote.voter_id, {})[vote.candidate_id] = vote.score
-
-    group_data = []
-    for group in groups:
-        members = get_members_by_group(group.id)
-        students = [Student.query.get(m.student_id) for m in members]
-
-        member_ids = {m.student_id for m in members}
-        highlight = False
-
-        for student in students:
-            voted_candidates = votes_map.get(student.id, {})
-            if set(voted_candidates.keys()).intersection(member_ids - {student.id}):
-                highlight = True
-                break
-
-        group_data.append({
-            'group': group,
-            'members': students,
-            'highlight': highlight
-        })
+
+    # Mapping voter_id -> dict of candidate_id -> score, from the election's affinity snapshot
+    votes_map = get_votes_map(election_id)
+
+    # Groups, members and student rows in one query
+    group_data = get_groups_with_members(election_id)
+    for entry in group_data:
+        member_ids = {student.id for student in entry['members']}
+        entry['highlight'] = any(
+            set(votes_map.get(student.id, {})).intersection(member_ids - {student.id})
+            for student in entry['members']
+        )
 
     return render_template('teacher/view_groups.html',
                            election=election,
@@ -16,5 +16,58 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///clustering.db')  # DB path
     SQLALCHEMY_TRACK_MODIFICATIONS = False  # Disable event notifications (improves performance)
 
+    # Create missing tables in create_app(). Set to false for fast startup in
+    # production and create the schema once with `flask init-db` instead
+    AUTO_CREATE_SCHEMA = os.getenv('AUTO_CREATE_SCHEMA', 'true').lower() == 'true'
+
+    # Grouping engine used by "Generate Groups" ('kmeans', 'balanced', 'spectral', 'louvain',
+    # 'exact', the branch-and-bound solver that proves the optimum for classes of up to
+    # about 16-20 students within GROUPING_EXACT_TIME_LIMIT, or
+    # 'annealing', which improves its grouping until a time budget runs out)
+    GROUPING_ENGINE = os.getenv('GROUPING_ENGINE', 'kmeans')
+
+    # Seeded restarts per grouping run, and worker processes to run them on (1 = serial)
+    GROUPING_RESTARTS = int(os.getenv('GROUPING_RESTARTS', 5))
+    GROUPING_WORKERS = int(os.getenv('GROUPING_WORKERS', 1))
+
+    # Optional swap-based refinement after the engine, and its time budget in seconds
+    GROUPING_REFINE = os.getenv('GROUPING_REFINE', 'false').lower() == 'true'
+    GROUPING_REFINE_BUDGET = float(os.getenv('GROUPING_REFINE_BUDGET', 2.0))
+
+    # Wall-clock cap in seconds of the 'exact' engine's search; when it is reached the
+    # best grouping found so far is kept and its optimality gap reported
+    GROUPING_EXACT_TIME_LIMIT = float(os.getenv('GROUPING_EXACT_TIME_LIMIT', 5.0))
+
+    # Default time budget in milliseconds of the 'annealing' engine, and the largest
+    # budget a teacher may request with ?budget_ms=
+    GROUPING_ANNEALING_BUDGET_MS = int(os.getenv('GROUPING_ANNEALING_BUDGET_MS', 2000))
+    GROUPING_ANNEALING_MAX_BUDGET_MS = int(os.getenv('GROUPING_ANNEALING_MAX_BUDGET_MS', 30000))
+
+    # Incremental regrouping (?mode=incremental): affinity penalty per student moved out
+    # of its current group; higher values keep more of the existing groups
+    GROUPING_STABILITY_PENALTY = float(os.getenv('GROUPING_STABILITY_PENALTY', 1.0))
+
+    # Background group generation: worker threads, and seconds without progress
+    # after which a queued/running job left by another process is considered abandoned
+    GROUPING_JOB_WORKERS = int(os.getenv('GROUPING_JOB_WORKERS', 2))
+    GROUPING_JOB_STALE_SECONDS = int(os.getenv('GROUPING_JOB_STALE_SECONDS', 1800))
+
+    # Grouping results kept in memory per process, keyed by a fingerprint of the
+    # votes, roster and parameters; regenerating unchanged input skips clustering (0 = off)
+    GROUPING_RESULT_CACHE_SIZE = int(os.getenv('GROUPING_RESULT_CACHE_SIZE', 64))
+
+    # Persistent cache of generated group names: on/off, maximum entries kept
+    # (least recently used are evicted first) and seconds an unused entry lives
+    NAME_CACHE_ENABLED = os.getenv('NAME_CACHE_ENABLED', 'true').lower() == 'true'
+    NAME_CACHE_MAX_ENTRIES = int(os.getenv('NAME_CACHE_MAX_ENTRIES', 10000))
+    NAME_CACHE_TTL_SECONDS = int(os.getenv('NAME_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+
+    # Prometheus metrics at /metrics: request latency, SQL statements and their time per
+    # request, grouping stage durations. Statements slower than METRICS_SLOW_QUERY_SECONDS
+    # are counted and logged on the 'app.sql' logger. Only local addresses may scrape.
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_SLOW_QUERY_SECONDS = float(os.getenv('METRICS_SLOW_QUERY_SECONDS', 0.1))
+    METRICS_ALLOWED_ADDRESSES = os.getenv('METRICS_ALLOWED_ADDRESSES', '127.0.0.1,::1').split(',')
+
     # Flask environment
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')  # development or production
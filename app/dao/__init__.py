@@ -27,7 +27,8 @@ from .student_dao import (
     list_all_students,
     delete_student_by_id,
     update_student,
-    update_student_password
+    update_student_password,
+    get_first_names_by_ids
 )
 
 from .election_dao import (
@@ -43,7 +44,9 @@ from .vote_dao import (
     get_votes_by_voter,
     get_votes_for_candidate,
     get_all_votes_for_election,
-    delete_votes_by_voter
+    delete_votes_by_voter,
+    clear_ballot,
+    bulk_insert_votes
 )
 
 from .group_dao import (
@@ -51,5 +54,35 @@ from .group_dao import (
     add_group_member,
     get_groups_by_election,
     get_members_by_group,
-    delete_groups_by_election
+    get_groups_with_members,
+    delete_groups_by_election,
+    clear_groups_for_election,
+    bulk_create_groups,
+    move_group_members,
+    rename_groups
+)
+
+from .job_dao import (
+    add_job,
+    get_job_by_id,
+    get_active_job_for_election,
+    get_latest_job_for_election,
+    update_job
+)
+
+from .name_cache_dao import (
+    get_cached_names,
+    store_cached_names,
+    evict_cached_names
+)
+
+from .snapshot_dao import (
+    get_snapshot_state,
+    get_snapshot_data_at,
+    bump_vote_version,
+    insert_snapshot,
+    update_snapshot,
+    delete_snapshot,
+    get_grouping_baseline,
+    save_grouping_baseline
 )
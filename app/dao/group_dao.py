@@ -3,8 +3,10 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from sqlalchemy import insert, delete, select, update, bindparam
+
 from app.extensions import db
-from app.models import Group, GroupMember
+from app.models import Group, GroupMember, Student
 
 def add_group(group: Group) -> Group:
     """
@@ -60,6 +62,55 @@ def get_members_by_group(group_id: int) -> list:
     """
     return GroupMember.query.filter_by(group_id=group_id).all()
 
+def get_groups_with_members(election_id: int) -> list[dict]:
+    """
+    Load all groups of an election with their member Student rows in one
+    outer-joined query (groups without members are kept, with an empty list).
+
+    Args:
+        election_id (int): The election ID
+
+    Returns:
+        list[dict]: One {'group': Group, 'members': [Student, ...]} per group, ordered by group ID
+    """
+    rows = db.session.query(Group, Student).outerjoin(
+        GroupMember, GroupMember.group_id == Group.id
+    ).outerjoin(
+        Student, Student.id == GroupMember.student_id
+    ).filter(
+        Group.election_id == election_id
+    ).order_by(Group.id, GroupMember.student_id).all()
+
+    groups = {}
+    for group, student in rows:
+        entry = groups.setdefault(group.id, {'group': group, 'members': []})
+        if student is not None:
+            entry['members'].append(student)
+    return list(groups.values())
+
+def clear_groups_for_election(election_id: int) -> int:
+    """
+    Delete all groups of an election and their members with two set-based
+    DELETE statements. Does not commit, so it can share a transaction with
+    the insertion of the replacement groups.
+
+    Args:
+        election_id (int): Election ID to clear
+
+    Returns:
+        int: Number of deleted group records
+    """
+    group_ids = select(Group.id).where(Group.election_id == election_id).scalar_subquery()
+    db.session.execute(
+        delete(GroupMember).where(GroupMember.group_id.in_(group_ids)),
+        execution_options={'synchronize_session': False}
+    )
+    result = db.session.execute(
+        delete(Group).where(Group.election_id == election_id),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
 def delete_groups_by_election(election_id: int) -> int:
     """
     Delete all groups and their members from a given election.
@@ -70,11 +121,86 @@ def delete_groups_by_election(election_id: int) -> int:
     Returns:
         int: Number of deleted group records
     """
-    groups = get_groups_by_election(election_id)
-    deleted_count = 0
-    for group in groups:
-        GroupMember.query.filter_by(group_id=group.id).delete()
-        db.session.delete(group)
-        deleted_count += 1
+    deleted_count = clear_groups_for_election(election_id)
     db.session.commit()
     return deleted_count
+
+def bulk_create_groups(election_id: int, groups: list[list[int]], names: list[str]) -> list[int]:
+    """
+    Insert groups and their memberships with two executemany INSERTs and one
+    SELECT of the new group IDs, whatever the number of groups. Does not commit.
+
+    Args:
+        election_id (int): Election the groups belong to
+        groups (list[list[int]]): Student IDs of each group
+        names (list[str]): Name of each group, aligned with groups
+
+    Returns:
+        list[int]: New group IDs, aligned with groups
+    """
+    if not groups:
+        return []
+
+    # One executemany without RETURNING, then one SELECT for the new IDs: ordered
+    # RETURNING (SQLite, PostgreSQL) would send a statement per group
+    db.session.execute(
+        insert(Group.__table__),
+        [{'election_id': election_id, 'group_name': name} for name in names]
+    )
+    # IDs only grow, so the newest rows of the election are the ones just inserted,
+    # in insertion order (callers clear the old groups first anyway)
+    group_ids = list(db.session.scalars(
+        select(Group.id).where(Group.election_id == election_id).order_by(Group.id.desc()).limit(len(groups))
+    ))[::-1]
+
+    member_rows = [
+        {'group_id': group_id, 'student_id': student_id}
+        for group_id, members in zip(group_ids, groups)
+        for student_id in members
+    ]
+    if member_rows:
+        db.session.execute(insert(GroupMember.__table__), member_rows)
+
+    return group_ids
+
+def move_group_members(moves: list[tuple[int, int, int]]) -> int:
+    """
+    Move students between existing groups with one executemany UPDATE of their
+    membership rows; rows of students that stay put are not touched. Does not commit.
+
+    Args:
+        moves (list[tuple[int, int, int]]): (student_id, old group ID, new group ID) per moved student
+
+    Returns:
+        int: Number of moved students
+    """
+    if not moves:
+        return 0
+    table = GroupMember.__table__
+    db.session.execute(
+        update(table).where(
+            table.c.student_id == bindparam('moved_student'),
+            table.c.group_id == bindparam('old_group')
+        ).values(group_id=bindparam('new_group')),
+        [{'moved_student': student_id, 'old_group': old, 'new_group': new} for student_id, old, new in moves]
+    )
+    return len(moves)
+
+def rename_groups(names: dict[int, str]) -> int:
+    """
+    Set the name of several groups with one executemany UPDATE. Does not commit.
+
+    Args:
+        names (dict[int, str]): Mapping group ID -> new name
+
+    Returns:
+        int: Number of renamed groups
+    """
+    if not names:
+        return 0
+    table = Group.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('renamed_group')).values(group_name=bindparam('new_name')),
+        [{'renamed_group': group_id, 'new_name': name} for group_id, name in names.items()]
+    )
+    return len(names)
@@ -0,0 +1,82 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+from app.models import GroupingJob
+
+# Statuses of a job that has not completed yet
+ACTIVE_JOB_STATUSES = ('queued', 'running')
+
+def add_job(job: GroupingJob) -> GroupingJob:
+    """
+    Persist a new GroupingJob.
+
+    Args:
+        job (GroupingJob): The job instance to save
+
+    Returns:
+        GroupingJob: The saved job with its ID
+    """
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def get_job_by_id(job_id: int) -> GroupingJob:
+    """
+    Fetch a job by its primary key.
+
+    Args:
+        job_id (int): Job ID
+
+    Returns:
+        GroupingJob: The matching job or None
+    """
+    return db.session.get(GroupingJob, job_id)
+
+def get_active_job_for_election(election_id: int) -> GroupingJob:
+    """
+    Fetch the queued or running job of an election, if any.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        GroupingJob: The active job or None
+    """
+    return GroupingJob.query.filter(
+        GroupingJob.election_id == election_id,
+        GroupingJob.status.in_(ACTIVE_JOB_STATUSES)
+    ).order_by(GroupingJob.id.desc()).first()
+
+def get_latest_job_for_election(election_id: int) -> GroupingJob:
+    """
+    Fetch the most recently created job of an election.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        GroupingJob: The latest job or None
+    """
+    return GroupingJob.query.filter_by(election_id=election_id).order_by(GroupingJob.id.desc()).first()
+
+def update_job(job_id: int, **fields) -> GroupingJob:
+    """
+    Update columns of a job and commit.
+
+    Args:
+        job_id (int): Job ID
+        **fields: Column values to set (status, stage, progress, result, error)
+
+    Returns:
+        GroupingJob: The updated job, or None if not found
+    """
+    job = get_job_by_id(job_id)
+    if not job:
+        return None
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.session.commit()
+    return job
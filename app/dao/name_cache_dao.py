@@ -0,0 +1,94 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+from app.models import GroupNameCache
+
+def get_cached_names(signatures: list[str]) -> dict[str, str]:
+    """
+    Look up cached names and mark the found entries as used (one UPDATE).
+    Does not commit.
+
+    Args:
+        signatures (list[str]): Cache keys to look up
+
+    Returns:
+        dict[str, str]: Mapping signature -> name for the entries found
+    """
+    signatures = list(set(signatures))
+    if not signatures:
+        return {}
+
+    rows = db.session.query(GroupNameCache.signature, GroupNameCache.name).filter(
+        GroupNameCache.signature.in_(signatures)
+    ).all()
+    found = {signature: name for signature, name in rows}
+
+    if found:
+        db.session.query(GroupNameCache).filter(
+            GroupNameCache.signature.in_(list(found))
+        ).update({
+            GroupNameCache.hits: GroupNameCache.hits + 1,
+            GroupNameCache.last_used_at: datetime.utcnow()
+        }, synchronize_session=False)
+    return found
+
+def store_cached_names(entries: dict[str, tuple[int, str, str]]) -> int:
+    """
+    Insert new cache entries, skipping signatures that already exist. Does not commit.
+
+    Args:
+        entries (dict): Mapping signature -> (prompt_version, initials, name)
+
+    Returns:
+        int: Number of entries inserted
+    """
+    if not entries:
+        return 0
+
+    existing = {
+        signature for (signature,) in db.session.query(GroupNameCache.signature).filter(
+            GroupNameCache.signature.in_(list(entries))
+        )
+    }
+    now = datetime.utcnow()
+    rows = [
+        {'signature': signature, 'prompt_version': version, 'initials': initials, 'name': name,
+         'hits': 0, 'created_at': now, 'last_used_at': now}
+        for signature, (version, initials, name) in entries.items()
+        if signature not in existing
+    ]
+    if rows:
+        db.session.execute(db.insert(GroupNameCache), rows)
+    return len(rows)
+
+def evict_cached_names(max_entries: int = None, ttl_seconds: int = None) -> int:
+    """
+    Drop entries unused for longer than ttl_seconds, then the least recently used
+    ones beyond max_entries. Does not commit.
+
+    Args:
+        max_entries (int): Maximum number of entries to keep (None = unbounded)
+        ttl_seconds (int): Maximum age since last use (None = no expiry)
+
+    Returns:
+        int: Number of entries deleted
+    """
+    deleted = 0
+    if ttl_seconds:
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+        deleted += db.session.query(GroupNameCache).filter(
+            GroupNameCache.last_used_at < cutoff
+        ).delete(synchronize_session=False)
+
+    if max_entries is not None:
+        keep = db.session.query(GroupNameCache.id).order_by(
+            GroupNameCache.last_used_at.desc(), GroupNameCache.id.desc()
+        ).limit(max_entries)
+        deleted += db.session.query(GroupNameCache).filter(
+            GroupNameCache.id.not_in(keep.scalar_subquery())
+        ).delete(synchronize_session=False)
+    return deleted
@@ -0,0 +1,158 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import delete, update, select
+from sqlalchemy.dialects import sqlite, postgresql
+
+from app.extensions import db
+from app.models import AffinitySnapshot, GroupingBaseline, VoteVersion
+
+# Dialects with INSERT ... ON CONFLICT, used to bump a vote counter in one statement
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def get_snapshot_state(election_id: int):
+    """
+    Fetch an election's vote-write count together with the version and blob of
+    its snapshot, in one statement and without loading ORM objects.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        tuple: (vote count, snapshot version or None, data bytes or None)
+    """
+    row = db.session.execute(select(
+        select(VoteVersion.version).where(VoteVersion.election_id == election_id).scalar_subquery(),
+        select(AffinitySnapshot.version).where(AffinitySnapshot.election_id == election_id).scalar_subquery(),
+        select(AffinitySnapshot.data).where(AffinitySnapshot.election_id == election_id).scalar_subquery()
+    )).one()
+    return row[0] or 0, row[1], row[2]
+
+def bump_vote_version(election_id: int) -> int:
+    """
+    Count one vote write for an election, creating its counter on first use.
+    Call it in the transaction that writes the student_votes rows; it is a
+    single upsert on SQLite and PostgreSQL, and the counter row stays locked
+    until that transaction ends. Does not commit.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        int: The election's vote-write count including this write
+    """
+    upsert = UPSERT_DIALECTS.get(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        return db.session.execute(
+            upsert(VoteVersion).values(election_id=election_id, version=1).on_conflict_do_update(
+                index_elements=[VoteVersion.election_id], set_={'version': VoteVersion.version + 1}
+            ).returning(VoteVersion.version)
+        ).scalar_one()
+
+    result = db.session.execute(
+        update(VoteVersion).where(VoteVersion.election_id == election_id).values(version=VoteVersion.version + 1),
+        execution_options={'synchronize_session': False}
+    )
+    if result.rowcount == 0:
+        db.session.add(VoteVersion(election_id=election_id, version=1))
+        db.session.flush()
+        return 1
+    return db.session.execute(
+        select(VoteVersion.version).where(VoteVersion.election_id == election_id)
+    ).scalar_one()
+
+def get_snapshot_data_at(election_id: int, version: int):
+    """
+    Fetch the blob of an election's snapshot if it was built at the given vote-write count.
+
+    Args:
+        election_id (int): Election ID
+        version (int): Expected snapshot version
+
+    Returns:
+        bytes: Serialized snapshot, or None if there is none at that version
+    """
+    return db.session.execute(
+        select(AffinitySnapshot.data).where(
+            AffinitySnapshot.election_id == election_id,
+            AffinitySnapshot.version == version
+        )
+    ).scalar()
+
+def insert_snapshot(election_id: int, data: bytes, version: int = 0):
+    """
+    Insert a new snapshot row. Does not commit.
+
+    Args:
+        election_id (int): Election ID
+        data (bytes): Serialized snapshot
+        version (int): Vote-write count the snapshot was built at
+    """
+    db.session.add(AffinitySnapshot(election_id=election_id, version=version, data=data))
+    db.session.flush()
+
+def update_snapshot(election_id: int, data: bytes, version: int, expected_version: int) -> bool:
+    """
+    Replace the blob of a snapshot, only if nobody replaced it since it was read
+    at expected_version (optimistic locking). Does not commit.
+
+    Args:
+        election_id (int): Election ID
+        data (bytes): Serialized snapshot
+        version (int): Vote-write count the new blob was built at
+        expected_version (int): Snapshot version read before the rebuild
+
+    Returns:
+        bool: True if the row was updated
+    """
+    result = db.session.execute(
+        update(AffinitySnapshot).where(
+            AffinitySnapshot.election_id == election_id,
+            AffinitySnapshot.version == expected_version
+        ).values(data=data, version=version, updated_at=db.func.now()),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount == 1
+
+def delete_snapshot(election_id: int) -> int:
+    """
+    Drop an election's snapshot so the next reader rebuilds it from the votes. Does not commit.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        int: Number of deleted rows (0 or 1)
+    """
+    result = db.session.execute(
+        delete(AffinitySnapshot).where(AffinitySnapshot.election_id == election_id),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+def get_grouping_baseline(election_id: int):
+    """
+    Fetch the vote blob an election's current groups were computed from.
+
+    Args:
+        election_id (int): Election ID
+
+    Returns:
+        bytes: Serialized vote matrix, or None if no grouping run stored one
+    """
+    return db.session.query(GroupingBaseline.data).filter(
+        GroupingBaseline.election_id == election_id
+    ).scalar()
+
+def save_grouping_baseline(election_id: int, data: bytes):
+    """
+    Insert or replace an election's grouping baseline. Does not commit.
+
+    Args:
+        election_id (int): Election ID
+        data (bytes): Serialized vote matrix of the grouping run
+    """
+    db.session.merge(GroupingBaseline(election_id=election_id, data=data))
+    db.session.flush()
@@ -53,6 +53,24 @@ def list_all_students() -> list:
     """
     return Student.query.order_by(Student.created_at.desc()).all()
 
+def get_first_names_by_ids(student_ids: list[int]) -> dict:
+    """
+    Load the first names of many students with IN queries (one per chunk of IDs).
+
+    Args:
+        student_ids (list[int]): IDs of the students
+
+    Returns:
+        dict: student_id -> first_name (None when not set); unknown IDs are absent
+    """
+    ids = list(set(student_ids))
+    first_names = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = db.session.query(Student.id, Student.first_name).filter(Student.id.in_(chunk)).all()
+        first_names.update(rows)
+    return first_names
+
 def update_student(student_id: int, first_name: str, last_name: str, class_name: str, section: str) -> Student:
     """
     Update basic profile information for a student.
@@ -3,8 +3,11 @@ import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
+from sqlalchemy import delete, insert
+
 from app.extensions import db
 from app.models import StudentVote
+from .snapshot_dao import bump_vote_version
 
 def add_or_update_vote(vote: StudentVote) -> StudentVote:
     """
@@ -27,6 +30,8 @@ def add_or_update_vote(vote: StudentVote) -> StudentVote:
     else:
         db.session.add(vote)  # new vote
 
+    # Outdates the election's affinity snapshot; the next reader rebuilds it
+    bump_vote_version(vote.election_id)
     db.session.commit()
     return vote or existing_vote
 
@@ -76,7 +81,7 @@ def get_all_votes_for_election(election_id: int) -> list:
 
 def delete_votes_by_voter(election_id: int, voter_id: int) -> int:
     """
-    Delete all votes cast by a student in an election.
+    Delete all votes cast by a student in an election with one DELETE statement.
 
     Args:
         election_id (int): Election ID
@@ -85,10 +90,48 @@ def delete_votes_by_voter(election_id: int, voter_id: int) -> int:
     Returns:
         int: Number of deleted vote records
     """
-    votes = get_votes_by_voter(election_id, voter_id)
-    count = len(votes)
-    for vote in votes:
-        db.session.delete(vote)
-
+    count = clear_ballot(election_id, voter_id)
+    bump_vote_version(election_id)
     db.session.commit()
     return count
+
+def clear_ballot(election_id: int, voter_id: int) -> int:
+    """
+    Delete a voter's votes in an election with one set-based DELETE. Does not
+    commit, so it can share a transaction with the insertion of the new ballot.
+
+    Args:
+        election_id (int): Election ID
+        voter_id (int): Student who cast the votes
+
+    Returns:
+        int: Number of deleted vote records
+    """
+    result = db.session.execute(
+        delete(StudentVote).where(
+            StudentVote.election_id == election_id,
+            StudentVote.voter_id == voter_id
+        ),
+        execution_options={'synchronize_session': False}
+    )
+    return result.rowcount
+
+def bulk_insert_votes(election_id: int, voter_id: int, scores: dict[int, int]) -> int:
+    """
+    Insert a voter's votes with one executemany INSERT. Does not commit.
+
+    Args:
+        election_id (int): Election ID
+        voter_id (int): Student casting the votes
+        scores (dict[int, int]): Mapping candidate_id -> score
+
+    Returns:
+        int: Number of inserted vote records
+    """
+    rows = [
+        {'election_id': election_id, 'voter_id': voter_id, 'candidate_id': candidate_id, 'score': score}
+        for candidate_id, score in scores.items()
+    ]
+    if rows:
+        db.session.execute(insert(StudentVote), rows)
+    return len(rows)
@@ -0,0 +1,231 @@
+import sys
+import os
+import time
+import logging
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Response, g, request, abort, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.query_counter import request_query_count
+
+logger = logging.getLogger('app.sql')
+
+# Prometheus' default latency buckets, in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, '') for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str, labelnames: tuple = (), buckets: tuple = REQUEST_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels.get(name, '') for name in self.labelnames))
+        return series['count'] if series else 0
+
+    def samples(self):
+        with self._lock:
+            snapshot = {key: {'buckets': list(s['buckets']), 'sum': s['sum'], 'count': s['count']}
+                        for key, s in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, series['buckets']):
+                yield f"{self.name}_bucket", {**labels, 'le': repr(float(bound))}, count
+            yield f"{self.name}_bucket", {**labels, 'le': '+Inf'}, series['count']
+            yield f"{self.name}_sum", labels, series['sum']
+            yield f"{self.name}_count", labels, series['count']
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint.', ('method', 'endpoint', 'status')
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL statements executed per request.', ('endpoint',), QUERY_COUNT_BUCKETS
+)
+REQUEST_QUERY_TIME = Histogram(
+    'http_request_db_seconds', 'Time spent in SQL statements per request.', ('endpoint',), REQUEST_BUCKETS
+)
+QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Duration of individual SQL statements.', (), QUERY_BUCKETS
+)
+SLOW_QUERIES = Counter(
+    'db_slow_queries_total', 'SQL statements slower than METRICS_SLOW_QUERY_SECONDS.', ('endpoint',)
+)
+GROUPING_STAGE_DURATION = Histogram(
+    'grouping_stage_duration_seconds', 'Duration of grouping pipeline stages.', ('stage',), REQUEST_BUCKETS
+)
+
+METRICS = [REQUEST_DURATION, REQUEST_QUERIES, REQUEST_QUERY_TIME, QUERY_DURATION, SLOW_QUERIES,
+           GROUPING_STAGE_DURATION]
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    Values are per process; each worker of a multi-process server exposes its own.
+    """
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+def clear_metrics() -> None:
+    for metric in METRICS:
+        metric.clear()
+
+
+def _current_endpoint() -> str:
+    return (request.endpoint or 'unmatched') if has_request_context() else 'background'
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+
+    # The hooks are engine-wide; statements of apps without metrics are not recorded
+    config = current_app.config if has_app_context() else {}
+    if has_app_context() and not config.get('METRICS_ENABLED', False):
+        return
+
+    QUERY_DURATION.observe(seconds)
+    if has_request_context():
+        g.query_seconds = g.get('query_seconds', 0.0) + seconds
+    if seconds >= config.get('METRICS_SLOW_QUERY_SECONDS', 0.1):
+        endpoint = _current_endpoint()
+        SLOW_QUERIES.inc(endpoint=endpoint)
+        logger.warning("Slow query (%.3f s, %s): %s", seconds, endpoint, ' '.join(statement.split())[:500])
+
+
+def _observe_grouping_stage(record):
+    GROUPING_STAGE_DURATION.observe(record['seconds'], stage=record['stage'])
+
+
+def init_metrics(app):
+    """
+    Time every request and SQL statement and serve the results at /metrics.
+    Does nothing unless METRICS_ENABLED is set, so a disabled app pays no
+    per-request or per-statement cost.
+
+    Args:
+        app (Flask): The application
+    """
+    if not app.config.get('METRICS_ENABLED', False):
+        return
+
+    if not event.contains(Engine, 'before_cursor_execute', _before_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_execute)
+
+    # Grouping stage timings come from the instrumentation of run_full_grouping
+    from app.services.instrumentation_service import add_stage_listener
+    add_stage_listener(_observe_grouping_stage)
+
+    allowed_addresses = set(app.config.get('METRICS_ALLOWED_ADDRESSES', ('127.0.0.1', '::1')))
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_start = time.perf_counter()
+        g.query_seconds = 0.0
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop('request_start', None)
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method, endpoint=endpoint,
+                                     status=response.status_code)
+            REQUEST_QUERIES.observe(request_query_count(), endpoint=endpoint)
+            REQUEST_QUERY_TIME.observe(g.get('query_seconds', 0.0), endpoint=endpoint)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        # Local scrapers only; the metrics expose route names and load
+        if request.remote_addr not in allowed_addresses:
+            abort(403)
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
@@ -7,4 +7,9 @@ from app.models.teacher import Teacher     # Teacher user model
 from app.models.student import Student     # Student user model
 from app.models.election import Election   # Election model created by teachers
 from app.models.vote import StudentVote    # Voting record between students
-from app.models.group import Group, GroupMember  # Group and group membership models
\ No newline at end of file
+from app.models.group import Group, GroupMember  # Group and group membership models
+from app.models.grouping_job import GroupingJob  # Background group-generation jobs
+from app.models.name_cache import GroupNameCache  # Cached generated group names
+from app.models.affinity_snapshot import AffinitySnapshot  # Per-election vote matrix blobs
+from app.models.vote_version import VoteVersion  # Per-election vote write counters
+from app.models.grouping_baseline import GroupingBaseline  # Votes behind the current groups
@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+
+class AffinitySnapshot(db.Model):
+    """
+    AffinitySnapshot model holding an election's raw vote matrix as one
+    compressed NumPy blob (student ID index plus CSR arrays), so readers do not
+    scan student_votes. The vote services patch it in the transaction of each
+    write; a reader that still finds it behind the election's VoteVersion
+    rebuilds it from the rows.
+    """
+
+    __tablename__ = 'affinity_snapshots'
+
+    # One snapshot per election
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), primary_key=True)
+
+    # VoteVersion count the blob was built at (read before the vote rows, so the
+    # blob holds at least every write up to this count)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    # np.savez_compressed archive with arrays student_ids, indptr, indices, data
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    # Timestamp of the last update
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # Relationship to the Election model
+    election = db.relationship(
+        'Election',
+        backref=db.backref('affinity_snapshot', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    def __repr__(self):
+        """
+        String representation of the snapshot for debugging.
+        """
+        return f"<AffinitySnapshot election={self.election_id} v{self.version} {len(self.data)} bytes>"
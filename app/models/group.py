@@ -20,7 +20,7 @@ class Group(db.Model):
     group_name = db.Column(db.String(100))
     
     # Foreign key to the election this group belongs to
-    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False)
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False, index=True)
 
     # Relationship to the Election model
     election = db.relationship(
@@ -46,7 +46,7 @@ class GroupMember(db.Model):
 
     # Composite primary key (group_id + student_id)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True, index=True)
 
     # Relationship to Group
     group = db.relationship(
@@ -0,0 +1,37 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+
+class GroupingBaseline(db.Model):
+    """
+    GroupingBaseline model holding the vote matrix an election's current groups
+    were computed from, in the AffinitySnapshot blob format (roster index plus
+    CSR arrays). Incremental re-grouping diffs it against the live votes to
+    find the students whose ties changed since the last run.
+    """
+
+    __tablename__ = 'grouping_baselines'
+
+    # One baseline per election, replaced by every grouping run
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), primary_key=True)
+
+    # np.savez_compressed archive with arrays student_ids, indptr, indices, data
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    # Timestamp of the grouping run that stored it
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # Relationship to the Election model
+    election = db.relationship(
+        'Election',
+        backref=db.backref('grouping_baseline', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    def __repr__(self):
+        """
+        String representation of the baseline for debugging.
+        """
+        return f"<GroupingBaseline election={self.election_id} {len(self.data)} bytes>"
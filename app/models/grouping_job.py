@@ -0,0 +1,50 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+
+class GroupingJob(db.Model):
+    """
+    GroupingJob model tracking a background group-generation run for an election.
+    The row is created when the job is queued and updated as the worker progresses.
+    """
+
+    __tablename__ = 'grouping_jobs'
+
+    # Unique identifier of the job
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Foreign key to the election being grouped
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Lifecycle status: queued, running, finished or failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+
+    # Current pipeline stage (e.g. clustering, persisting) and completion fraction (0.0 - 1.0)
+    stage = db.Column(db.String(50), nullable=False, default='queued')
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+
+    # Grouping engine requested for this run
+    engine = db.Column(db.String(30), nullable=False, default='kmeans')
+
+    # JSON-encoded final scores once finished, or the error message if it failed
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    # Timestamps for creation and last progress update
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    # Relationship to the Election model
+    election = db.relationship(
+        'Election',
+        backref=db.backref('grouping_jobs', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    def __repr__(self):
+        """
+        String representation of the job for debugging.
+        """
+        return f"<GroupingJob {self.id} election={self.election_id} {self.status}:{self.stage}>"
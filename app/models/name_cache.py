@@ -0,0 +1,39 @@
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+
+class GroupNameCache(db.Model):
+    """
+    GroupNameCache model storing generated group names, keyed by the initials
+    signature of the group and the version of the naming prompt.
+    """
+
+    __tablename__ = 'group_name_cache'
+
+    # Unique identifier of the entry
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Lookup key "<prompt version>:<sorted initials>", unique per entry
+    signature = db.Column(db.String(120), unique=True, nullable=False, index=True)
+
+    # Prompt version and initials the name was generated for
+    prompt_version = db.Column(db.Integer, nullable=False)
+    initials = db.Column(db.String(100), nullable=False)
+
+    # The generated group name
+    name = db.Column(db.String(100), nullable=False)
+
+    # Number of cache hits, and timestamps used for TTL / least-recently-used eviction
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        """
+        String representation of the entry for debugging.
+        """
+        return f"<GroupNameCache {self.signature} -> {self.name}>"
@@ -13,6 +13,13 @@ class StudentVote(db.Model):
 
     __tablename__ = 'student_votes'
 
+    # One vote per (election, voter, candidate); the unique index also serves
+    # lookups by election and by (election, voter). Candidate-side lookups use the second index.
+    __table_args__ = (
+        db.Index('uq_student_votes_ballot', 'election_id', 'voter_id', 'candidate_id', unique=True),
+        db.Index('ix_student_votes_election_candidate', 'election_id', 'candidate_id', 'voter_id'),
+    )
+
     # Unique identifier for each vote entry
     id = db.Column(db.Integer, primary_key=True)
 
@@ -0,0 +1,33 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.extensions import db
+
+class VoteVersion(db.Model):
+    """
+    VoteVersion model counting the vote writes of an election. Every vote
+    writer bumps it in the same transaction as its student_votes rows, so an
+    AffinitySnapshot built at an older count is known to be out of date.
+    """
+
+    __tablename__ = 'vote_versions'
+
+    # One counter per election, created by the first vote write
+    election_id = db.Column(db.Integer, db.ForeignKey('elections.id', ondelete='CASCADE'), primary_key=True)
+
+    # Number of vote writes committed for the election
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    # Relationship to the Election model
+    election = db.relationship(
+        'Election',
+        backref=db.backref('vote_version', uselist=False, cascade='all, delete-orphan', passive_deletes=True)
+    )
+
+    def __repr__(self):
+        """
+        String representation of the counter for debugging.
+        """
+        return f"<VoteVersion election={self.election_id} v{self.version}>"
@@ -0,0 +1,83 @@
+import sys
+import os
+import threading
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Counters opened by count_queries() in the current thread
+_local = threading.local()
+
+
+class QueryCounter:
+    """
+    Number of SQL statements executed while a count_queries() block is open.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __repr__(self):
+        return f"<QueryCounter {self.count}>"
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Engine hook: count the statement for the current request and open counters.
+    """
+    if has_app_context():
+        g.query_count = g.get('query_count', 0) + 1
+    for counter in getattr(_local, 'counters', ()):
+        counter.count += 1
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the SQL statements executed by the current thread inside the block.
+
+    Example:
+        with count_queries() as counter:
+            client.get('/teacher/election/1/groups')
+        assert counter.count <= 5
+    """
+    counter = QueryCounter()
+    counters = _local.__dict__.setdefault('counters', [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+def request_query_count() -> int:
+    """
+    Number of SQL statements executed so far in the current app/request context.
+    """
+    return g.get('query_count', 0) if has_app_context() else 0
+
+
+def init_query_counter(app):
+    """
+    Register the statement counter. In debug and testing mode every response
+    also carries its query count in an X-Query-Count header.
+
+    Args:
+        app (Flask): The application
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _on_execute):
+        event.listen(Engine, 'before_cursor_execute', _on_execute)
+
+    @app.before_request
+    def _reset_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def _add_query_count_header(response):
+        if app.debug or app.testing:
+            response.headers['X-Query-Count'] = str(request_query_count())
+        return response
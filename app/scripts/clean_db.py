@@ -4,7 +4,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from app.extensions import db
-from app.models import Group, GroupMember, StudentVote, Student, Election
+from app.models import Group, GroupMember, StudentVote, Student, Election, AffinitySnapshot, GroupingBaseline, VoteVersion
 
 def clean_database():
     print("Deleting GroupMembers...")
@@ -19,6 +19,15 @@ def clean_database():
     StudentVote.query.delete()
     db.session.commit()
 
+    print("Deleting AffinitySnapshots...")
+    AffinitySnapshot.query.delete()
+    VoteVersion.query.delete()
+    db.session.commit()
+
+    print("Deleting GroupingBaselines...")
+    GroupingBaseline.query.delete()
+    db.session.commit()
+
     print("Deleting Elections...")
     Election.query.delete()
     db.session.commit()
@@ -0,0 +1,190 @@
+import sys
+import os
+import time
+import uuid
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import Teacher, Student, Election, StudentVote
+from app.models.election import election_students
+
+# Rows per executemany batch
+INSERT_BATCH = 50000
+
+
+def synthetic_ballots(n_students: int, votes_per_student: int = 20, clique_size: int = 0, clique_share: float = 0.6,
+                      popularity_skew: float = 0.0, mutual_share: float = 0.0, max_score: int = 5, seed: int = 0):
+    """
+    Generate ballots with a tunable preference structure, fully vectorized.
+
+    Args:
+        n_students (int): Cohort size
+        votes_per_student (int): Classmates scored per ballot (before mutual votes are added)
+        clique_size (int): Size of friend cliques (0 = no cliques)
+        clique_share (float): Fraction of each ballot spent inside the voter's clique
+        popularity_skew (float): Zipf exponent of candidate popularity (0 = uniform)
+        mutual_share (float): Fraction of votes answered by a reverse vote
+        max_score (int): Scores are drawn uniformly from 1..max_score
+        seed (int): Random seed
+
+    Returns:
+        tuple: (voter_idx, candidate_idx, scores) as arrays of student indices 0..n-1;
+               no self-votes and at most one vote per (voter, candidate)
+    """
+    rng = np.random.default_rng(seed)
+    n = n_students
+    k = min(votes_per_student, n - 1)
+    if n < 2 or k <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    # Oversample, then drop self-votes and repeats and keep the first k per voter
+    draws = int(k * 1.5) + 2
+    voters = np.repeat(np.arange(n), draws)
+
+    popularity = np.arange(1, n + 1, dtype=np.float64) ** -popularity_skew
+    popularity = rng.permutation(popularity / popularity.sum())
+    candidates = rng.choice(n, size=len(voters), p=popularity)
+
+    if clique_size > 1:
+        # Cliques are contiguous blocks of a random ordering of the cohort
+        order = rng.permutation(n)
+        position = np.empty(n, dtype=np.int64)
+        position[order] = np.arange(n)
+        block_start = (position[voters] // clique_size) * clique_size
+        block_len = np.minimum(clique_size, n - block_start)
+        in_clique = rng.random(len(voters)) < clique_share
+        offsets = (rng.random(len(voters)) * block_len).astype(np.int64)
+        candidates = np.where(in_clique, order[block_start + offsets], candidates)
+
+    keep = voters != candidates
+    voters, candidates = voters[keep], candidates[keep]
+    _, first = np.unique(voters * n + candidates, return_index=True)
+    first.sort()
+    voters, candidates = voters[first], candidates[first]
+    rank = np.arange(len(voters)) - np.searchsorted(voters, voters)
+    voters, candidates = voters[rank < k], candidates[rank < k]
+
+    if mutual_share > 0:
+        answered = rng.random(len(voters)) < mutual_share
+        pairs = np.concatenate([voters * n + candidates, candidates[answered] * n + voters[answered]])
+        pairs = np.unique(pairs)
+        voters, candidates = pairs // n, pairs % n
+
+    scores = rng.integers(1, max_score + 1, size=len(voters))
+    return voters, candidates, scores
+
+
+def _insert_batches(table, rows):
+    for start in range(0, len(rows), INSERT_BATCH):
+        db.session.execute(insert(table), rows[start:start + INSERT_BATCH])
+
+
+def generate_dataset(n_students: int, teacher_id: int = None, password: str = 'password', group_size: int = 4,
+                     seed: int = 0, **ballot_options) -> dict:
+    """
+    Create an election with a synthetic cohort and ballots using bulk inserts
+    and one password hash shared by every generated account.
+
+    Args:
+        n_students (int): Cohort size
+        teacher_id (int): Owner of the election; a generated teacher if omitted
+        password (str): Password of every generated account
+        group_size (int): students_per_group of the election
+        seed (int): Random seed
+        **ballot_options: Passed to synthetic_ballots (votes_per_student, clique_size, ...)
+
+    Returns:
+        dict: election_id, teacher_id, student_ids, vote count and seconds per stage
+    """
+    timings = {}
+    start = time.perf_counter()
+    password_hash = generate_password_hash(password)
+    run = uuid.uuid4().hex[:6]
+
+    if teacher_id is None:
+        teacher_id = db.session.execute(insert(Teacher).returning(Teacher.id), [{
+            'unique_id': f"gt{run}", 'email': f"teacher.{run}@dataset.test", 'password_hash': password_hash,
+            'first_name': 'Dataset', 'last_name': 'Teacher'
+        }]).scalar_one()
+
+    student_rows = [
+        {'unique_id': f"g{run}{i:07d}", 'email': f"s{i}.{run}@dataset.test", 'password_hash': password_hash,
+         'first_name': f"Student{i}", 'last_name': run.upper()}
+        for i in range(n_students)
+    ]
+    _insert_batches(Student.__table__, student_rows)
+    student_ids = np.asarray(db.session.scalars(
+        select(Student.id).where(Student.email.like(f"%.{run}@dataset.test")).order_by(Student.id)
+    ).all(), dtype=np.int64)
+    timings['students'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    election_id = db.session.execute(insert(Election).returning(Election.id), [{
+        'title': f"Synthetic election {run} ({n_students} students)", 'start_date': now,
+        'end_date': now + timedelta(days=7), 'students_per_group': group_size, 'teacher_id': teacher_id,
+        'status': 'running'
+    }]).scalar_one()
+    _insert_batches(election_students, [{'election_id': election_id, 'student_id': int(sid)} for sid in student_ids])
+    timings['election'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    voters, candidates, scores = synthetic_ballots(n_students, seed=seed, **ballot_options)
+    timings['ballots'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _insert_batches(StudentVote.__table__, [
+        {'election_id': election_id, 'voter_id': v, 'candidate_id': c, 'score': s}
+        for v, c, s in zip(student_ids[voters].tolist(), student_ids[candidates].tolist(), scores.tolist())
+    ])
+    db.session.commit()
+    timings['votes'] = time.perf_counter() - start
+
+    return {
+        'election_id': election_id,
+        'teacher_id': teacher_id,
+        'student_ids': student_ids.tolist(),
+        'votes': len(scores),
+        'timings': timings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic election with bulk inserts.")
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--votes-per-student', type=int, default=20)
+    parser.add_argument('--clique-size', type=int, default=0)
+    parser.add_argument('--clique-share', type=float, default=0.6)
+    parser.add_argument('--popularity-skew', type=float, default=0.0)
+    parser.add_argument('--mutual-share', type=float, default=0.0)
+    parser.add_argument('--max-score', type=int, default=5)
+    parser.add_argument('--group-size', type=int, default=4)
+    parser.add_argument('--teacher-id', type=int, default=None)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        report = generate_dataset(
+            args.students, teacher_id=args.teacher_id, password=args.password, group_size=args.group_size,
+            seed=args.seed, votes_per_student=args.votes_per_student, clique_size=args.clique_size,
+            clique_share=args.clique_share, popularity_skew=args.popularity_skew,
+            mutual_share=args.mutual_share, max_score=args.max_score
+        )
+    stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in report['timings'].items())
+    print(f"Election {report['election_id']}: {len(report['student_ids'])} students, "
+          f"{report['votes']} votes ({stages})")
+
+
+if __name__ == '__main__':
+    main()
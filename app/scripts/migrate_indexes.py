@@ -0,0 +1,85 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import text, inspect
+
+from app.extensions import db
+from app.models import StudentVote, Group, GroupMember
+
+# Tables whose model-declared indexes are added to existing databases
+INDEXED_MODELS = (StudentVote, Group, GroupMember)
+
+
+def dedupe_votes(connection) -> int:
+    """
+    Remove duplicate (election, voter, candidate) votes, keeping the most recent
+    row of each, so the unique ballot index can be created. This matches how
+    votes are read for clustering (the last vote wins).
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+
+    Returns:
+        int: Number of deleted rows
+    """
+    result = connection.execute(text(
+        "DELETE FROM student_votes WHERE id NOT IN ("
+        " SELECT MAX(id) FROM student_votes GROUP BY election_id, voter_id, candidate_id"
+        ")"
+    ))
+    return result.rowcount
+
+
+def missing_indexes(connection) -> list:
+    """
+    Indexes declared on the models that the database does not have yet.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        list[sqlalchemy.Index]: Indexes to create
+    """
+    inspector = inspect(connection)
+    missing = []
+    for model in INDEXED_MODELS:
+        table = model.__table__
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def migrate_indexes(engine=None) -> dict:
+    """
+    Bring an existing SQLite or PostgreSQL database up to the current indexes:
+    deduplicate votes, then create every missing index in one transaction.
+    Safe to run repeatedly; new databases get the indexes from db.create_all().
+
+    Args:
+        engine: SQLAlchemy engine; defaults to the app's db.engine
+
+    Returns:
+        dict: duplicates_removed and the names of the indexes created
+    """
+    engine = engine or db.engine
+    with engine.begin() as connection:
+        to_create = missing_indexes(connection)
+        removed = 0
+        if any(index.unique for index in to_create):
+            removed = dedupe_votes(connection)
+        for index in to_create:
+            index.create(connection, checkfirst=True)
+    return {'duplicates_removed': removed, 'indexes_created': [index.name for index in to_create]}
+
+
+if __name__ == "__main__":
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        report = migrate_indexes()
+        print(f"Removed {report['duplicates_removed']} duplicate votes.")
+        for name in report['indexes_created']:
+            print(f"Created index {name}")
+        print("Index migration completed.")
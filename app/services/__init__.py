@@ -1,6 +1,8 @@
 # Initialize the services package.
 # This file can be used to expose or alias frequently-used service functions.
 
+import importlib
+
 # Example: Direct imports for convenience
 from .admin_service import (
     create_admin,
@@ -45,12 +47,56 @@ from .vote_service import (
     get_votes_by_student,
     get_votes_for_candidate,
     get_all_votes_for_election,
-    delete_votes_by_student
+    delete_votes_by_student,
+    submit_ballot,
+    get_votes_map
+)
+
+from .job_service import (
+    enqueue_grouping_job,
+    get_job_status,
+    job_status,
+    wait_for_job,
+    grouping_engine_names,
+    GroupingJobConflict
 )
 
-from .clustering_service import (
-    run_full_grouping,
-    create_groups_and_name
+from .instrumentation_service import (
+    GroupingInstrumentation,
+    add_stage_listener,
+    remove_stage_listener
 )
 
-from .openai_service import OpenAIService
+# Grouping, snapshot and naming services pull in NumPy, SciPy, scikit-learn and
+# the OpenAI SDK. They are resolved on first attribute access (PEP 562) so that
+# importing app.services - and so every blueprint and CLI script - stays fast.
+_LAZY_ATTRIBUTES = {
+    'run_full_grouping': '.clustering_service',
+    'create_groups_and_name': '.clustering_service',
+    'run_grouping_engine': '.clustering_service',
+    'compare_engines': '.clustering_service',
+    'GROUPING_ENGINES': '.clustering_service',
+    'GroupingResult': '.clustering_service',
+    'load_vote_snapshot': '.snapshot_service',
+    'election_matrices': '.snapshot_service',
+    'votes_map_for_election': '.snapshot_service',
+    'result_cache_stats': '.result_cache_service',
+    'clear_result_cache': '.result_cache_service',
+    'OpenAIService': '.openai_service',
+    'generate_group_names_cached': '.name_cache_service',
+    'name_cache_stats': '.name_cache_service',
+    'reset_name_cache_stats': '.name_cache_service',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
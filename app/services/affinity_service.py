@@ -0,0 +1,137 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+
+from app.models import StudentVote
+from app.extensions import db
+
+# Multiplier applied to a vote when the candidate voted back for the voter
+MUTUAL_VOTE_MULTIPLIER = 1.5
+
+
+def load_vote_arrays(election_id: int):
+    """
+    Load the (voter, candidate, score) columns of an election's votes as arrays.
+    Only the three columns are selected, so no ORM objects are hydrated.
+
+    Args:
+        election_id (int): The election ID
+
+    Returns:
+        tuple: (voter_ids, candidate_ids, scores) as NumPy arrays, in insertion order
+    """
+    rows = db.session.query(
+        StudentVote.voter_id,
+        StudentVote.candidate_id,
+        StudentVote.score
+    ).filter_by(election_id=election_id).order_by(StudentVote.id).all()
+
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.float64)
+
+    voters, candidates, scores = zip(*rows)
+    return (
+        np.asarray(voters, dtype=np.int64),
+        np.asarray(candidates, dtype=np.int64),
+        np.asarray(scores, dtype=np.float64)
+    )
+
+
+def _positions(student_ids: np.ndarray, ids: np.ndarray):
+    """
+    Map student IDs to their row index in `student_ids`.
+
+    Returns:
+        tuple: (positions, valid mask) where invalid entries are IDs outside the roster
+    """
+    n = len(student_ids)
+    if n == 0:
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+
+    sorter = np.argsort(student_ids, kind='stable')
+    pos = np.searchsorted(student_ids, ids, sorter=sorter)
+    pos = np.minimum(pos, n - 1)
+    idx = sorter[pos]
+    valid = student_ids[idx] == ids
+    return idx, valid
+
+
+def build_vote_matrix(voter_ids, candidate_ids, scores, student_ids) -> sparse.csr_matrix:
+    """
+    Build the raw n×n vote matrix V where V[i, j] is the score student i gave student j.
+    Votes involving students outside `student_ids` are dropped, and when the same
+    (voter, candidate) pair appears more than once the last vote wins.
+
+    Args:
+        voter_ids (array-like): Voter student IDs
+        candidate_ids (array-like): Candidate student IDs
+        scores (array-like): Vote scores
+        student_ids (list[int]): Roster; row/column order of the matrix
+
+    Returns:
+        csr_matrix: Sparse vote matrix (explicit zero scores are kept as votes)
+    """
+    student_ids = np.asarray(student_ids, dtype=np.int64)
+    voter_ids = np.asarray(voter_ids, dtype=np.int64)
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(student_ids)
+
+    rows, valid_rows = _positions(student_ids, voter_ids)
+    cols, valid_cols = _positions(student_ids, candidate_ids)
+    keep = valid_rows & valid_cols
+    rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+    # Keep only the last occurrence of each (voter, candidate) pair
+    linear = rows * n + cols
+    _, first_in_reversed = np.unique(linear[::-1], return_index=True)
+    last = len(linear) - 1 - first_in_reversed
+    rows, cols, scores = rows[last], cols[last], scores[last]
+
+    return sparse.csr_matrix((scores, (rows, cols)), shape=(n, n))
+
+
+def build_affinity_matrix(vote_matrix: sparse.spmatrix) -> sparse.csr_matrix:
+    """
+    Turn a raw vote matrix into the symmetric affinity matrix used for clustering.
+    A vote is multiplied by MUTUAL_VOTE_MULTIPLIER when the candidate also voted
+    for the voter, then the matrix is symmetrized as (M + M.T) / 2.
+
+    Args:
+        vote_matrix (spmatrix): Output of build_vote_matrix
+
+    Returns:
+        csr_matrix: Symmetric sparse affinity matrix
+    """
+    votes = sparse.csr_matrix(vote_matrix)
+
+    # Pattern of cast votes (1 where a vote exists, even with a zero score)
+    pattern = votes.copy()
+    pattern.data = np.ones_like(pattern.data)
+
+    mutual_part = votes.multiply(pattern.T).tocsr()
+    weighted = votes + (MUTUAL_VOTE_MULTIPLIER - 1) * mutual_part
+
+    return ((weighted + weighted.T) / 2).tocsr()
+
+
+def affinity_for_election(election_id: int, student_ids: list[int]):
+    """
+    Build the vote and affinity matrices for an election straight from the
+    student_votes rows.
+
+    Args:
+        election_id (int): The election ID
+        student_ids (list[int]): Roster; row/column order of the matrices
+
+    Returns:
+        tuple: (affinity csr_matrix, vote csr_matrix)
+    """
+    voters, candidates, scores = load_vote_arrays(election_id)
+    vote_matrix = build_vote_matrix(voters, candidates, scores, student_ids)
+    return build_affinity_matrix(vote_matrix), vote_matrix
@@ -0,0 +1,188 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+
+from .scoring_service import gain_table, total_affinity
+
+# Default wall-clock budget of the 'annealing' engine, in milliseconds
+ANNEALING_BUDGET_MS = 2000
+
+# Swap proposals drawn and evaluated together per step
+PROPOSAL_BATCH = 256
+
+# Share of proposals that pair a student with a member of a group it has a vote tie to;
+# the rest pair two random students so the walk can leave any neighbourhood
+TARGETED_SHARE = 0.8
+
+# Final temperature relative to the starting one
+COOLING_RATIO = 1e-3
+
+# Smallest gain considered an improvement (guards against float noise)
+MIN_GAIN = 1e-9
+
+
+class _SwapState:
+    """
+    A balanced partition that supports O(1) swap deltas and O(degree) swaps.
+
+    gains[i, g] is the affinity of student i to the members of group g; the
+    members of group g sit in slots[start[g]:start[g] + size[g]] so a random
+    member is drawn in O(1) and a swap just exchanges two slots.
+    """
+
+    def __init__(self, adjacency: sparse.csr_matrix, labels: np.ndarray):
+        self.adjacency = adjacency
+        self.labels = labels
+        self.n_groups = int(labels.max()) + 1
+        self.gains = gain_table(adjacency, labels, self.n_groups)
+        self.size = np.bincount(labels, minlength=self.n_groups)
+        self.start = np.concatenate(([0], np.cumsum(self.size)[:-1]))
+        self.slots = np.argsort(labels, kind='stable')
+        self.position = np.empty_like(self.slots)
+        self.position[self.slots] = np.arange(len(labels))
+
+    def pair_weight(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        return np.asarray(self.adjacency[i, j]).ravel()
+
+    def delta(self, i: int, j: int) -> float:
+        """
+        Score change of swapping i with j, in O(1) plus one search in i's vote row.
+        """
+        a, b = self.labels[i], self.labels[j]
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        at = indptr[i] + np.searchsorted(indices[indptr[i]:indptr[i + 1]], j)
+        weight = self.adjacency.data[at] if at < indptr[i + 1] and indices[at] == j else 0.0
+        gains = self.gains
+        return float(gains[i, b] - gains[i, a] + gains[j, a] - gains[j, b] - 2 * weight)
+
+    def deltas(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """
+        Score change of swapping i[t] with j[t], for every t at once.
+        """
+        a, b = self.labels[i], self.labels[j]
+        gains = self.gains
+        return gains[i, b] - gains[i, a] + gains[j, a] - gains[j, b] - 2 * self.pair_weight(i, j)
+
+    def swap(self, i: int, j: int) -> None:
+        a, b = self.labels[i], self.labels[j]
+        indptr, indices, data = self.adjacency.indptr, self.adjacency.indices, self.adjacency.data
+
+        row = slice(indptr[i], indptr[i + 1])
+        self.gains[indices[row], a] -= data[row]
+        self.gains[indices[row], b] += data[row]
+        row = slice(indptr[j], indptr[j + 1])
+        self.gains[indices[row], b] -= data[row]
+        self.gains[indices[row], a] += data[row]
+
+        self.labels[i], self.labels[j] = b, a
+        pi, pj = self.position[i], self.position[j]
+        self.slots[pi], self.slots[pj] = j, i
+        self.position[i], self.position[j] = pj, pi
+
+    def propose(self, rng, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Draw swap candidates (i, j) between different groups.
+        """
+        n = len(self.labels)
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        i = rng.integers(n, size=count)
+        j = rng.integers(n, size=count)
+
+        # Targeted: j is a random member of the group of one of i's vote neighbours
+        degree = indptr[i + 1] - indptr[i]
+        targeted = (rng.random(count) < TARGETED_SHARE) & (degree > 0)
+        if targeted.any():
+            ti = i[targeted]
+            neighbour = indices[indptr[ti] + (rng.random(len(ti)) * degree[targeted]).astype(np.int64)]
+            group = self.labels[neighbour]
+            j[targeted] = self.slots[self.start[group] + (rng.random(len(ti)) * self.size[group]).astype(np.int64)]
+
+        different = self.labels[i] != self.labels[j]
+        return i[different], j[different]
+
+
+def anneal(affinity, labels, budget_ms: float = ANNEALING_BUDGET_MS, seed: int = 42) -> tuple[np.ndarray, dict]:
+    """
+    Anytime simulated annealing over balanced partitions. Every move swaps two
+    students of different groups, so group sizes never change. Proposals are
+    drawn and scored in vectorized batches (O(1) each from a gain table), then
+    accepted one by one with the Metropolis rule, re-scored against the current
+    partition. The temperature cools geometrically over the time budget and the
+    best partition seen is returned when the budget runs out.
+
+    Args:
+        affinity: Symmetric affinity matrix, dense or sparse
+        labels (array-like): Starting group label per student; fixes the group sizes
+        budget_ms (float): Wall-clock budget in milliseconds
+        seed (int): Seed of the proposal and acceptance draws
+
+    Returns:
+        tuple: (best labels, stats dict with score_before, score_after, proposals,
+                accepted, improvements and elapsed)
+    """
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000.0
+    rng = np.random.default_rng(seed)
+
+    adjacency = sparse.csr_matrix(affinity, dtype=np.float64)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.sort_indices()
+
+    labels = np.array(labels, dtype=np.int64)
+    score_before = total_affinity(adjacency, labels)
+    best_labels, best_score = labels.copy(), score_before
+    stats = {'proposals': 0, 'accepted': 0, 'improvements': 0}
+    if len(labels) < 2 or labels.max() == 0:
+        return best_labels, {**stats, 'score_before': score_before, 'score_after': score_before,
+                             'elapsed': time.perf_counter() - start}
+
+    state = _SwapState(adjacency, labels)
+    current = score_before
+
+    # Start hot enough that a typical worsening swap is accepted about half the time
+    i, j = state.propose(rng, PROPOSAL_BATCH)
+    worsening = -state.deltas(i, j)
+    worsening = worsening[worsening > MIN_GAIN]
+    initial_temperature = worsening.mean() / np.log(2) if len(worsening) else 1.0
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        temperature = initial_temperature * COOLING_RATIO ** ((now - start) / (deadline - start))
+
+        i, j = state.propose(rng, PROPOSAL_BATCH)
+        draws = rng.random(len(i))
+        deltas = state.deltas(i, j)
+        stats['proposals'] += len(i)
+
+        with np.errstate(over='ignore'):
+            candidates = np.flatnonzero((deltas > 0) | (draws < np.exp(deltas / temperature)))
+        for t in candidates.tolist():
+            si, sj = i[t], j[t]
+            if state.labels[si] == state.labels[sj]:
+                continue
+            # Earlier swaps of this batch may have changed the delta
+            delta = state.delta(si, sj)
+            if delta <= 0 and draws[t] >= np.exp(delta / temperature):
+                continue
+            state.swap(si, sj)
+            current += delta
+            stats['accepted'] += 1
+            if current > best_score + MIN_GAIN:
+                best_score = current
+                best_labels = state.labels.copy()
+                stats['improvements'] += 1
+
+    return best_labels, {
+        **stats,
+        'score_before': score_before,
+        'score_after': float(total_affinity(adjacency, best_labels)),
+        'elapsed': time.perf_counter() - start
+    }
@@ -0,0 +1,130 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import kmeans_plusplus
+from sklearn.metrics.pairwise import euclidean_distances
+
+# Above this many students the slot-expanded n×n assignment problem is too
+# expensive to solve exactly on every iteration; a regret-ordered greedy is used instead
+EXACT_ASSIGNMENT_LIMIT = 600
+
+
+def group_capacities(n_students: int, group_size: int) -> list[int]:
+    """
+    Split n students into ceil(n / group_size) groups whose sizes differ by at most one.
+    No group is larger than group_size.
+
+    Args:
+        n_students (int): Number of students
+        group_size (int): Maximum number of students per group
+
+    Returns:
+        list[int]: Size of each group
+    """
+    nb_groups = max(1, -(-n_students // group_size))
+    base, extra = divmod(n_students, nb_groups)
+    return [base + 1 if g < extra else base for g in range(nb_groups)]
+
+
+def capacitated_assign(cost: np.ndarray, capacities: list[int]) -> np.ndarray:
+    """
+    Assign each row (student) to a column (group) minimizing total cost while
+    filling every group exactly to its capacity.
+
+    Small problems are solved exactly as a min-cost assignment over one column
+    per group slot. Larger ones use a greedy pass that places the students with
+    the most to lose (highest regret) first.
+
+    Args:
+        cost (np.ndarray): n×k matrix of assignment costs
+        capacities (list[int]): Size of each of the k groups; must sum to n
+
+    Returns:
+        np.ndarray: Group label per student
+    """
+    n, k = cost.shape
+    capacities = np.asarray(capacities, dtype=np.int64)
+
+    if n <= EXACT_ASSIGNMENT_LIMIT:
+        slot_group = np.repeat(np.arange(k), capacities)
+        rows, slots = linear_sum_assignment(cost[:, slot_group])
+        labels = np.empty(n, dtype=np.int64)
+        labels[rows] = slot_group[slots]
+        return labels
+
+    preferences = np.argsort(cost, axis=1, kind='stable')
+    if k > 1:
+        ordered = np.take_along_axis(cost, preferences[:, :2], axis=1)
+        regret = ordered[:, 1] - ordered[:, 0]
+    else:
+        regret = np.zeros(n)
+
+    remaining = capacities.copy()
+    labels = np.empty(n, dtype=np.int64)
+    for student in np.argsort(-regret, kind='stable'):
+        for group in preferences[student]:
+            if remaining[group] > 0:
+                labels[student] = group
+                remaining[group] -= 1
+                break
+    return labels
+
+
+def affinity_features(affinities: np.ndarray) -> np.ndarray:
+    """
+    Feature rows for clustering students on an affinity matrix.
+
+    Two students who vote for each other have non-zero entries in different
+    columns of their raw affinity rows, so Euclidean distance does not bring
+    them together. Adding each student's total affinity on the diagonal and
+    normalizing the rows makes a direct tie the dominant shared coordinate.
+
+    Args:
+        affinities (np.ndarray): Dense symmetric affinity matrix
+
+    Returns:
+        np.ndarray: n×n L2-normalized feature rows
+    """
+    features = np.array(affinities, dtype=np.float64)
+    np.fill_diagonal(features, np.maximum(features.sum(axis=1), 1e-9))
+    return features / np.linalg.norm(features, axis=1, keepdims=True)
+
+
+def balanced_k_means(features: np.ndarray, capacities: list[int], random_state: int = 42,
+                     max_iter: int = 30) -> np.ndarray:
+    """
+    Constrained k-means: Lloyd iterations where the assignment step is a
+    capacitated min-cost assignment, so every group ends at its exact size.
+
+    Args:
+        features (np.ndarray): n×d feature rows (e.g. affinity rows)
+        capacities (list[int]): Size of each group; must sum to n
+        random_state (int): Seed for k-means++ initialisation
+        max_iter (int): Maximum number of assignment/update rounds
+
+    Returns:
+        np.ndarray: Group label per student
+    """
+    k = len(capacities)
+    centers, _ = kmeans_plusplus(features, n_clusters=k, random_state=random_state)
+
+    labels = None
+    for _ in range(max_iter):
+        cost = euclidean_distances(features, centers, squared=True)
+        new_labels = capacitated_assign(cost, capacities)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+        # Every group is non-empty by construction, so the means are well defined
+        onehot = sparse.csr_matrix(
+            (np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), k)
+        )
+        centers = (onehot.T @ features) / np.asarray(capacities, dtype=np.float64)[:, None]
+
+    return labels
@@ -1,10 +1,35 @@
+import time
 import numpy as np
+from scipy import sparse
 from sklearn.cluster import KMeans
 from collections import defaultdict
 
-from app.models import StudentVote, Group, GroupMember, Student
+from app.models import StudentVote
 from app.extensions import db
+from app.dao import (get_first_names_by_ids, clear_groups_for_election, bulk_create_groups, get_groups_with_members,
+                     move_group_members, rename_groups, get_grouping_baseline, save_grouping_baseline)
 from .openai_service import OpenAIService
+from .name_cache_service import generate_group_names_cached
+from .snapshot_service import (election_matrices, load_vote_snapshot, roster_vote_matrix, serialize_snapshot,
+                               deserialize_snapshot, affinity_delta)
+from .balanced_service import group_capacities, balanced_k_means, affinity_features
+from .graph_service import vote_graph, recursive_bisection
+from .community_service import louvain_communities, community_pieces, pack_pieces
+from .exact_service import exact_partition, EXACT_TIME_LIMIT
+from .annealing_service import anneal, ANNEALING_BUDGET_MS
+from .restart_service import run_restarts
+from .scoring_service import total_affinity, student_satisfaction, labels_from_groups, groups_with_internal_votes
+from .refinement_service import refine_by_swaps
+from .result_cache_service import result_fingerprint, get_cached_result, store_result
+from .instrumentation_service import GroupingInstrumentation, stage
+
+# Share of the exact engine's time left after the warm start given to the search;
+# an unfinished search leaves the rest of the time limit to annealing its best grouping
+SEARCH_SHARE = 0.6
+
+# Default penalty of incremental re-grouping, in affinity units, per student
+# moved out of its current group (a swap moves two students)
+STABILITY_PENALTY = 1.0
 
 
 def votes_for_student(election_id: int, student_ids: list[int]) -> dict[int, dict[int, int]]:
@@ -44,54 +69,59 @@ def get_preferences(election_id: int, vote_map: dict[int, dict[int, int]]) -> di
     return score_map
 
 
-def run_k_means(election_id: int, student_ids: list[int], group_size: int):
+def intra_group_score(affinities: np.ndarray, groups: list[list[int]]) -> float:
     """
-    Run KMeans clustering on affinity matrix derived from votes.
+    Total affinity inside the groups, counting each pair of members once.
+
+    Args:
+        affinities: Dense symmetric affinity matrix
+        groups: Groups as lists of row indices
 
     Returns:
-        result_groups (list[list[int]]): student ID groups
-        global_score (float): affinity score
+        float: Sum of affinities[i][j] over all pairs i < j sharing a group
     """
-    vote_map = votes_for_student(election_id, student_ids)
-    score_map = get_preferences(election_id, vote_map)
+    return total_affinity(affinities, labels_from_groups(groups, len(affinities)))
 
-    n = len(student_ids)
-    index_map = {sid: i for i, sid in enumerate(student_ids)}
-    reverse_map = {i: sid for sid, i in index_map.items()}
 
-    nb_groups = max(1, n // group_size)
-    if n % group_size > 0:
-        nb_groups += 1
+def labelling_score(affinities: np.ndarray, labels) -> float:
+    """
+    Intra-group affinity of a label vector (each pair of members counted once).
+    """
+    return total_affinity(affinities, labels)
 
-    affinities = np.zeros((n, n))
-    for sid, prefs in score_map.items():
-        i = index_map[sid]
-        for cid, score in prefs.items():
-            j = index_map[cid]
-            affinities[i][j] = score
 
-    affinities = (affinities + affinities.T) / 2  # symmetric
+def _kmeans_fit(affinities: np.ndarray, seed: int, nb_groups: int):
+    """
+    One seeded KMeans restart (top-level so it can run in a worker process).
+    """
+    kmeans = KMeans(n_clusters=nb_groups, random_state=seed, n_init=5)
+    return kmeans.fit_predict(affinities)
 
-    best_score = -float('inf')
-    best_labels = None
 
-    for seed in range(5):
-        kmeans = KMeans(n_clusters=nb_groups, random_state=42 + seed, n_init=5)
-        labels = kmeans.fit_predict(affinities)
+def kmeans_groups(affinities: np.ndarray, group_size: int, restarts: int = 5, workers: int = 1) -> list[list[int]]:
+    """
+    Unconstrained KMeans on the affinity rows, followed by a greedy rebalance
+    that moves students from oversized groups to undersized ones.
 
-        score = 0
-        groups = [[] for _ in range(nb_groups)]
-        for idx, lbl in enumerate(labels):
-            groups[lbl].append(idx)
+    Args:
+        affinities: Dense symmetric affinity matrix
+        group_size: Maximum number of students per group
+        restarts: Number of seeded KMeans restarts; the highest-affinity one is kept
+        workers: Worker processes for the restarts (1 runs them serially)
 
-        for g in groups:
-            for i in range(len(g)):
-                for j in range(i + 1, len(g)):
-                    score += affinities[g[i]][g[j]]
+    Returns:
+        list[list[int]]: Groups as lists of row indices
+    """
+    n = len(affinities)
+    nb_groups = max(1, n // group_size)
+    if n % group_size > 0:
+        nb_groups += 1
 
-        if score > best_score:
-            best_score = score
-            best_labels = labels
+    seeds = [42 + seed for seed in range(restarts)]
+    with stage('restarts'):
+        _, best_score, best_labels = run_restarts(
+            _kmeans_fit, labelling_score, affinities, seeds, args=(nb_groups,), workers=workers
+        )
 
     # Construct groups from best_labels
     groups = [[] for _ in range(nb_groups)]
@@ -99,99 +129,424 @@ def run_k_means(election_id: int, student_ids: list[int], group_size: int):
         groups[lbl].append(idx)
 
     # --- REBALANCE STEP TO RESPECT group_size LIMIT ---
-    groupes_trop_grands = [i for i, g in enumerate(groups) if len(g) > group_size]
-    groupes_trop_petits = [i for i, g in enumerate(groups) if len(g) < group_size]
+    with stage('rebalance'):
+        groupes_trop_grands = [i for i, g in enumerate(groups) if len(g) > group_size]
+        groupes_trop_petits = [i for i, g in enumerate(groups) if len(g) < group_size]
 
-    while groupes_trop_grands and groupes_trop_petits:
-        grand_idx = groupes_trop_grands[0]
-        petit_idx = groupes_trop_petits[0]
+        while groupes_trop_grands and groupes_trop_petits:
+            grand_idx = groupes_trop_grands[0]
+            petit_idx = groupes_trop_petits[0]
 
-        # Find the student to move minimizing affinity loss
-        meilleur_etudiant = None
-        min_perte = float('inf')
+            # Find the student to move minimizing affinity loss
+            meilleur_etudiant = None
+            min_perte = float('inf')
 
-        for etud in groups[grand_idx]:
-            perte_ancien = sum(affinities[etud][autre] for autre in groups[grand_idx] if autre != etud)
-            gain_nouveau = sum(affinities[etud][autre] for autre in groups[petit_idx])
-            perte_nette = perte_ancien - gain_nouveau
-            if perte_nette < min_perte:
-                min_perte = perte_nette
-                meilleur_etudiant = etud
+            for etud in groups[grand_idx]:
+                perte_ancien = sum(affinities[etud][autre] for autre in groups[grand_idx] if autre != etud)
+                gain_nouveau = sum(affinities[etud][autre] for autre in groups[petit_idx])
+                perte_nette = perte_ancien - gain_nouveau
+                if perte_nette < min_perte:
+                    min_perte = perte_nette
+                    meilleur_etudiant = etud
 
-        # Move the student
-        groups[grand_idx].remove(meilleur_etudiant)
-        groups[petit_idx].append(meilleur_etudiant)
+            # Move the student
+            groups[grand_idx].remove(meilleur_etudiant)
+            groups[petit_idx].append(meilleur_etudiant)
 
-        # Update lists of too big/small groups
-        if len(groups[grand_idx]) <= group_size:
-            groupes_trop_grands.pop(0)
-        if len(groups[petit_idx]) >= group_size:
-            groupes_trop_petits.pop(0)
+            # Update lists of too big/small groups
+            if len(groups[grand_idx]) <= group_size:
+                groupes_trop_grands.pop(0)
+            if len(groups[petit_idx]) >= group_size:
+                groupes_trop_petits.pop(0)
 
-    # Map back to student IDs
-    result_groups = []
-    for g in groups:
-        result_groups.append([reverse_map[idx] for idx in g])
+    return groups
 
-    return result_groups, best_score
+
+def _balanced_fit(data, seed: int, capacities: list[int]):
+    """
+    One seeded constrained k-means restart on the feature rows.
+    """
+    _, features = data
+    return balanced_k_means(features, capacities, random_state=seed)
+
+
+def _balanced_score(data, labels) -> float:
+    affinities, _ = data
+    return labelling_score(affinities, labels)
 
 
+def balanced_groups(affinities: np.ndarray, group_size: int, restarts: int = 3, workers: int = 1) -> list[list[int]]:
+    """
+    Capacity-constrained k-means on normalized affinity rows. Group sizes are fixed up
+    front (at most group_size, differing by at most one), so no rebalance is needed.
+
+    Args:
+        affinities: Dense symmetric affinity matrix
+        group_size: Maximum number of students per group
+        restarts: Number of seeded restarts; the highest-affinity one is kept
+        workers: Worker processes for the restarts (1 runs them serially)
 
-def create_groups_and_name(election_id: int, result_groups: list[list[int]]):
+    Returns:
+        list[list[int]]: Groups as lists of row indices
+    """
+    capacities = group_capacities(len(affinities), group_size)
+    with stage('features'):
+        features = affinity_features(affinities)
+
+    seeds = [42 + seed for seed in range(restarts)]
+    with stage('restarts'):
+        _, _, labels = run_restarts(
+            _balanced_fit, _balanced_score, (affinities, features), seeds, args=(capacities,), workers=workers
+        )
+    return [np.flatnonzero(labels == g).tolist() for g in range(len(capacities))]
+
+
+def spectral_groups(affinity, group_size: int, restarts: int = 1, workers: int = 1) -> list[list[int]]:
+    """
+    Graph partitioning on the sparse vote graph: recursive spectral bisection into
+    groups of at most group_size whose sizes differ by at most one. Works on the
+    sparse matrix directly, so memory grows with the number of votes, not n².
+
+    The eigensolver is seeded, so a run is deterministic; restarts and workers are
+    accepted for the common engine signature and not used.
+
+    Args:
+        affinity: Sparse (or dense) symmetric affinity matrix
+        group_size: Maximum number of students per group
+
+    Returns:
+        list[list[int]]: Groups as lists of row indices
     """
-    Persist groups and generate names using OpenAI.
+    capacities = group_capacities(affinity.shape[0], group_size)
+    with stage('graph'):
+        adjacency = vote_graph(affinity)
+    with stage('bisection'):
+        labels = recursive_bisection(adjacency, capacities)
+    return [np.flatnonzero(labels == g).tolist() for g in range(len(capacities))]
+
+
+def _louvain_fit(adjacency, seed: int, capacities: list[int]):
+    """
+    One seeded Louvain run (node visiting order) followed by packing into groups.
+    """
+    communities = louvain_communities(adjacency, seed=seed)
+    pieces = community_pieces(adjacency, communities, max(capacities), seed=seed)
+    return pack_pieces(adjacency, pieces, capacities)
+
+
+def louvain_groups(affinity, group_size: int, restarts: int = 3, workers: int = 1) -> list[list[int]]:
+    """
+    Community detection on the sparse vote graph: Louvain modularity communities,
+    larger ones split along their own graph, then packed into groups of at most
+    group_size whose sizes differ by at most one. Friend cliques found as
+    communities are kept together instead of being cut by a Euclidean boundary.
+
+    Args:
+        affinity: Sparse (or dense) symmetric affinity matrix
+        group_size: Maximum number of students per group
+        restarts: Number of seeded Louvain runs; the highest-affinity one is kept
+        workers: Worker processes for the restarts (1 runs them serially)
+
+    Returns:
+        list[list[int]]: Groups as lists of row indices
+    """
+    capacities = group_capacities(affinity.shape[0], group_size)
+    adjacency = vote_graph(affinity)
+
+    seeds = [42 + seed for seed in range(restarts)]
+    with stage('restarts'):
+        _, _, labels = run_restarts(
+            _louvain_fit, labelling_score, adjacency, seeds, args=(capacities,), workers=workers
+        )
+    return [np.flatnonzero(labels == g).tolist() for g in range(len(capacities))]
+
+
+def exact_groups(affinities: np.ndarray, group_size: int, restarts: int = 3, workers: int = 1,
+                 time_limit: float = EXACT_TIME_LIMIT):
+    """
+    Provably best grouping for small classes by branch and bound; within the
+    default 5 s the optimum is proven up to about 16-20 students.
+
+    The first incumbent is the best of the swap-polished kmeans and balanced
+    solutions whose group sizes match. The search gets SEARCH_SHARE of the
+    time the warm start left; when it cannot prove the optimum in that time,
+    what is left of the time limit is spent annealing from the best grouping
+    found, so larger classes still get a strong grouping. Its optimality gap is then
+    reported from the search's bound, which is loose beyond about 20 students
+    and overstates the true distance to the optimum.
+
+    Args:
+        affinities: Dense symmetric affinity matrix
+        group_size: Maximum number of students per group
+        restarts: Restarts of the warm-start engines
+        workers: Worker processes for the warm-start restarts
+        time_limit: Wall-clock cap of the warm start, search and polish in seconds
+                    (the warm start always completes; a warm start that uses it all
+                    leaves the search a few nodes and no polish)
+
+    Returns:
+        tuple: (groups as lists of row indices, solver stats from exact_partition)
+    """
+    deadline = time.perf_counter() + time_limit
+    n = len(affinities)
+    capacities = group_capacities(n, group_size)
+
+    with stage('warm_start'):
+        candidates = [labels_from_groups(engine(affinities, group_size, restarts=restarts, workers=workers), n)
+                      for engine in (kmeans_groups, balanced_groups)]
+        # kmeans' rebalance can leave sizes that differ by more than one; those do not fit the search
+        candidates = [labels for labels in candidates
+                      if sorted(np.bincount(labels, minlength=len(capacities))) == sorted(capacities)]
+        candidates = [refine_by_swaps(affinities, labels, time_budget=max(deadline - time.perf_counter(), 0.0))[0]
+                      for labels in candidates]
+        warm_start = max(candidates, key=lambda labels: labelling_score(affinities, labels))
+
+    with stage('search'):
+        remaining = max(deadline - time.perf_counter(), 0.0)
+        labels, stats = exact_partition(affinities, capacities, time_limit=SEARCH_SHARE * remaining,
+                                        warm_start=warm_start)
+
+    budget = deadline - time.perf_counter()
+    if not stats['optimal'] and budget > 0:
+        with stage('polish'):
+            polished, _ = anneal(affinities, labels, budget_ms=1000 * budget)
+            score = labelling_score(affinities, polished)
+            if score > stats['score']:
+                upper_bound = max(stats['upper_bound'], score)
+                labels = polished
+                stats = {**stats, 'score': score, 'upper_bound': upper_bound,
+                         'gap': (upper_bound - score) / upper_bound if upper_bound > 0 else 0.0}
+    return [np.flatnonzero(labels == g).tolist() for g in range(len(capacities))], stats
+
+
+def annealing_groups(affinity, group_size: int, restarts: int = 1, workers: int = 1,
+                     budget_ms: float = ANNEALING_BUDGET_MS):
+    """
+    Anytime engine: simulated annealing with swap moves from a seeded random
+    balanced partition, stopped after budget_ms milliseconds. A larger budget
+    buys a better grouping; the best partition seen is always returned.
+
+    Args:
+        affinity: Sparse (or dense) symmetric affinity matrix
+        group_size: Maximum number of students per group
+        restarts: Not used; the budget is spent on a single annealing walk
+        workers: Not used
+        budget_ms: Wall-clock budget in milliseconds
+
+    Returns:
+        tuple: (groups as lists of row indices, annealing stats from anneal)
+    """
+    capacities = group_capacities(affinity.shape[0], group_size)
+    start = np.random.default_rng(42).permutation(np.repeat(np.arange(len(capacities)), capacities))
+    with stage('annealing'):
+        labels, stats = anneal(affinity, start, budget_ms=budget_ms)
+    return [np.flatnonzero(labels == g).tolist() for g in range(len(capacities))], stats
+
+
+# Engines that take the sparse affinity matrix instead of dense rows
+spectral_groups.sparse_input = True
+louvain_groups.sparse_input = True
+annealing_groups.sparse_input = True
+
+
+# Selectable grouping engines: name -> function(affinities, group_size, restarts, workers) -> index groups
+GROUPING_ENGINES = {
+    'kmeans': kmeans_groups,
+    'balanced': balanced_groups,
+    'spectral': spectral_groups,
+    'louvain': louvain_groups,
+    'exact': exact_groups,
+    'annealing': annealing_groups,
+}
+
+
+def run_grouping_engine(election_id: int, student_ids: list[int], group_size: int, engine: str = 'kmeans',
+                        **options) -> dict:
+    """
+    Read the election's affinity matrix from its snapshot and run one grouping engine on it.
+
+    Args:
+        election_id: int
+        student_ids: Students to group
+        group_size: Maximum number of students per group
+        engine: Key of GROUPING_ENGINES
+        **options: Engine options such as restarts and workers, plus refine/refine_budget
+
+    Returns:
+        dict: {'engine', 'groups' (student ID lists), 'score' (intra-group affinity),
+               'wall_time' (engine seconds, excluding vote loading), ...}
+    """
+    affinity_matrix, _ = election_matrices(election_id, student_ids)
+    return run_engine(affinity_matrix, student_ids, group_size, engine, **options)
+
+
+def run_engine(affinity_matrix, student_ids: list[int], group_size: int, engine: str = 'kmeans',
+               refine: bool = False, refine_budget: float = None, **options) -> dict:
+    """
+    Run one grouping engine on an already built affinity matrix, optionally
+    followed by the swap-based refinement stage.
+
+    Args:
+        affinity_matrix: Sparse symmetric affinity matrix (rows follow student_ids)
+        student_ids: Students to group
+        group_size: Maximum number of students per group
+        engine: Key of GROUPING_ENGINES
+        refine: Run refine_by_swaps on the engine's groups
+        refine_budget: Time budget of the refinement stage in seconds (None = until no swap helps)
+        **options: Engine options such as restarts and workers
+
+    Returns:
+        dict: Same report as run_grouping_engine, plus 'labels' (group index per student),
+              'refinement' (refine_by_swaps stats, or None) and 'solver' (engine stats such
+              as the exact engine's optimality gap, or None)
+    """
+    if engine not in GROUPING_ENGINES:
+        raise ValueError(f"Unknown grouping engine '{engine}'. Available: {', '.join(GROUPING_ENGINES)}")
+
+    # The KMeans engines cluster on dense affinity rows; graph engines keep the sparse matrix
+    engine_fn = GROUPING_ENGINES[engine]
+    affinities = affinity_matrix if getattr(engine_fn, 'sparse_input', False) else affinity_matrix.toarray()
+
+    start = time.perf_counter()
+    # Engines return index groups, or (index groups, solver stats) like the exact engine
+    result = engine_fn(affinities, group_size, **options)
+    index_groups, solver = result if isinstance(result, tuple) else (result, None)
+    index_groups = [g for g in index_groups if g]
+    labels = labels_from_groups(index_groups, len(student_ids))
+
+    refinement = None
+    if refine:
+        with stage('refinement'):
+            labels, refinement = refine_by_swaps(affinity_matrix, labels, time_budget=refine_budget)
+    wall_time = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'groups': [np.asarray(student_ids)[labels == g].tolist() for g in range(len(index_groups))],
+        'labels': labels,
+        'score': total_affinity(affinity_matrix, labels),
+        'wall_time': wall_time,
+        'refinement': refinement,
+        'solver': solver
+    }
+
+
+def compare_engines(election_id: int, student_ids: list[int], group_size: int, engines: list[str] = None,
+                    **options) -> list[dict]:
+    """
+    Run several engines on the same election without persisting anything.
+
+    Returns:
+        list[dict]: One run_grouping_engine report per engine
+    """
+    return [
+        run_grouping_engine(election_id, student_ids, group_size, engine, **options)
+        for engine in (engines or GROUPING_ENGINES)
+    ]
+
+
+def run_k_means(election_id: int, student_ids: list[int], group_size: int):
+    """
+    Run KMeans clustering on affinity matrix derived from votes.
+
+    Returns:
+        result_groups (list[list[int]]): student ID groups
+        global_score (float): affinity score of the returned groups
+    """
+    report = run_grouping_engine(election_id, student_ids, group_size, engine='kmeans')
+    return report['groups'], report['score']
+
+
+def _name_groups(groups: list[list[int]]) -> list[str]:
+    """
+    Names of student ID groups, from the group-name cache or OpenAI, falling
+    back to member initials. First names are loaded with one IN query.
+    """
+    first_names_by_id = get_first_names_by_ids([sid for members in groups for sid in members])
+
+    # Generate group names from first names
+    first_names_per_group = [
+        [first_names_by_id[sid] for sid in group_members if first_names_by_id.get(sid)]
+        for group_members in groups
+    ]
+
+    with stage('naming'):
+        try:
+            # Cached names are reused; the rest are named in one concurrent batch,
+            # each falling back to initials on its own
+            names = generate_group_names_cached(first_names_per_group)
+        except Exception:
+            names = [OpenAIService.initials_for(first_names) for first_names in first_names_per_group]
+    return names
+
+
+def create_groups_and_name(election_id: int, result_groups: list[list[int]], baseline: bytes = None) -> list[int]:
+    """
+    Persist groups and generate names using OpenAI, reusing names from the
+    group-name cache where the initials were seen before.
     If OpenAIService is unavailable, fallback to concatenating
     first letters of first names capitalized.
 
+    Old groups are cleared and the new ones inserted in bulk within a single
+    transaction; member first names are loaded with one IN query.
+
     Args:
         election_id: int
         result_groups: List of student ID groups
-    """
-    # Delete old groups and members first
-    old_groups = Group.query.filter_by(election_id=election_id).all()
-    for group in old_groups:
-        GroupMember.query.filter_by(group_id=group.id).delete()
-        db.session.delete(group)
-    db.session.commit()
-
-    try:
-        group_namer = OpenAIService()
-        # Optionally verify API connectivity or key here
-        api_available = True
-    except Exception:
-        group_namer = None
-        api_available = False
-
-    for group_members in result_groups:
-        if not group_members:
-            continue
+        baseline: Serialized vote matrix the groups were computed from, stored in
+                  the same transaction for later incremental runs
 
-        group = Group(election_id=election_id)
-        db.session.add(group)
-        db.session.flush()  # get group.id
+    Returns:
+        list[int]: IDs of the new groups, aligned with the non-empty entries of result_groups
+    """
+    groups = [members for members in result_groups if members]
+    names = _name_groups(groups)
 
-        for student_id in group_members:
-            db.session.add(GroupMember(group_id=group.id, student_id=student_id))
+    # Replace old groups and members in one transaction
+    with stage('persisting'):
+        clear_groups_for_election(election_id)
+        group_ids = bulk_create_groups(election_id, groups, names)
+        if baseline is not None:
+            save_grouping_baseline(election_id, baseline)
+        db.session.commit()
+    return group_ids
 
-        # Generate group name from first names
-        first_names = [Student.query.get(sid).first_name for sid in group_members if Student.query.get(sid) and Student.query.get(sid).first_name]
 
-        if api_available and group_namer:
-            try:
-                group_name = group_namer.generate_group_name_from_initials(first_names)
-            except Exception:
-                group_name = ''.join(fn[0].upper() for fn in first_names if fn)
-        else:
-            group_name = ''.join(fn[0].upper() for fn in first_names if fn)
+def current_assignment(election_id: int, student_ids: list[int], group_size: int):
+    """
+    The election's persisted groups as a label vector over the roster, if an
+    incremental run can start from them: every roster student is in exactly one
+    group, nobody else is, and no group is larger than group_size. Swaps keep
+    the group sizes, so the groups of any earlier run with this size qualify.
 
-        group.group_name = group_name
+    Args:
+        election_id: int
+        student_ids: Roster, in matrix row order
+        group_size: Maximum number of students per group
 
-    db.session.commit()
+    Returns:
+        tuple: (group IDs, group label per student indexing the group IDs), or None
+    """
+    groups = get_groups_with_members(election_id)
+    position = {student_id: i for i, student_id in enumerate(student_ids)}
+    labels = np.full(len(student_ids), -1, dtype=np.int64)
+    for label, entry in enumerate(groups):
+        for student in entry['members']:
+            if student.id not in position or labels[position[student.id]] >= 0:
+                return None
+            labels[position[student.id]] = label
+
+    if not groups or (labels < 0).any():
+        return None
+    if np.bincount(labels, minlength=len(groups)).max() > group_size:
+        return None
+    return [entry['group'].id for entry in groups], labels
 
 
 def groups_with_votes_between_members(election_id: int, student_to_group: dict[int, int]) -> set[int]:
     """
     Identify groups where at least one member voted for another member.
+    Votes are read from the election's affinity snapshot.
 
     Args:
         election_id: int
@@ -200,19 +555,12 @@ def groups_with_votes_between_members(election_id: int, student_to_group: dict[i
     Returns:
         Set of group ids that should be highlighted
     """
-    votes = StudentVote.query.filter_by(election_id=election_id).all()
-    group_to_students = defaultdict(set)
-    for student_id, group_label in student_to_group.items():
-        group_to_students[group_label].add(student_id)
-
-    highlight_groups = set()
-    for vote in votes:
-        voter_group = student_to_group.get(vote.voter_id)
-        candidate_group = student_to_group.get(vote.candidate_id)
-        if voter_group is not None and candidate_group is not None:
-            if voter_group == candidate_group and vote.score > 0:
-                highlight_groups.add(voter_group)
-    return highlight_groups
+    if not student_to_group:
+        return set()
+    student_ids, votes, _ = load_vote_snapshot(election_id)
+    group_ids, labels = np.unique(list(student_to_group.values()), return_inverse=True)
+    vote_matrix = roster_vote_matrix(student_ids, votes, list(student_to_group))
+    return {group_ids[label].item() for label in groups_with_internal_votes(vote_matrix, labels)}
 
 
 def student_to_groups(student_to_group: dict[int, int]) -> list[list[int]]:
@@ -222,15 +570,89 @@ def student_to_groups(student_to_group: dict[int, int]) -> list[list[int]]:
     return list(groups.values())
 
 
-def run_full_grouping(election_id: int, student_ids: list[int], group_size: int):
+class GroupingResult(tuple):
+    """
+    The (student_to_group, global_score, groups_to_highlight, total_satisfaction,
+    avg_satisfaction) tuple returned by run_full_grouping, with the run's
+    instrumentation report attached as .report.
+    """
+
+    def __new__(cls, values, report: dict = None):
+        result = super().__new__(cls, values)
+        result.report = report
+        return result
+
+
+def run_full_grouping(election_id: int, student_ids: list[int], group_size: int, engine: str = 'kmeans',
+                      progress=None, instrumentation: GroupingInstrumentation = None, profile: bool = False,
+                      trace_memory: bool = False, incremental: bool = False,
+                      stability: float = STABILITY_PENALTY, **engine_options):
     """
     Full workflow: cluster, persist, generate names, and identify highlight groups.
 
+    With incremental=True the existing groups are kept as the starting point:
+    only students whose affinities changed since the last run look for better
+    swaps, each moved student costs `stability`, and only the membership rows
+    and names of the groups that changed are written. Without usable groups
+    (none yet, another roster or group size) a full run is done instead.
+
+    Every stage is timed; the report is logged as JSON on the 'app.grouping'
+    logger and attached to the result.
+
+    Args:
+        engine: Grouping engine to use (see GROUPING_ENGINES)
+        progress: Optional callback progress(stage, fraction) called as each stage starts
+        instrumentation: GroupingInstrumentation to record into (a new one by default)
+        profile: Capture a cProfile of the run (ignored when instrumentation is given)
+        trace_memory: Record peak memory per stage with tracemalloc (ignored when instrumentation is given)
+        incremental: Warm-start from the persisted groups instead of regrouping from scratch
+        stability: Penalty per student moved by an incremental run, in affinity units
+        **engine_options: Passed to the engine (e.g. restarts, workers)
+
     Returns:
-        tuple: (student_to_group mapping, global_score, groups_to_highlight set)
+        GroupingResult: (student_to_group mapping, global_score, groups_to_highlight set,
+                         total_satisfaction, avg_satisfaction), with .report
     """
-    # Run clustering (K-means) to get list of groups and score
-    result_groups, global_score = run_k_means(election_id, student_ids, group_size)
+    instrumentation = instrumentation or GroupingInstrumentation(profile=profile, trace_memory=trace_memory)
+    with instrumentation.run():
+        result = _run_full_grouping(election_id, student_ids, group_size, engine, progress, incremental,
+                                    stability, **engine_options)
+
+    report = instrumentation.log(election_id=election_id, engine=engine, students=len(student_ids),
+                                 group_size=group_size, incremental=incremental)
+    return GroupingResult(result, report)
+
+
+def _run_full_grouping(election_id: int, student_ids: list[int], group_size: int, engine: str, progress,
+                       incremental: bool = False, stability: float = STABILITY_PENALTY, **engine_options) -> tuple:
+    report_progress = progress or (lambda stage, fraction: None)
+
+    # Votes are read once, from the election's snapshot: affinity for the engine,
+    # raw votes for satisfaction and highlighting
+    report_progress('loading_votes', 0.05)
+    with stage('loading_votes'):
+        affinity_matrix, vote_matrix = election_matrices(election_id, student_ids)
+
+    if incremental:
+        with stage('loading_groups'):
+            assignment = current_assignment(election_id, student_ids, group_size)
+        if assignment is not None:
+            return _regroup_incrementally(election_id, student_ids, affinity_matrix, vote_matrix, *assignment,
+                                          report_progress, stability, engine_options.get('refine_budget'))
+
+    # Run the selected grouping engine to get list of groups and score, unless the
+    # same votes, roster and parameters were already grouped by this process
+    report_progress('clustering', 0.15)
+    with stage('clustering') as record:
+        cache_key = result_fingerprint(election_id, vote_matrix, student_ids, group_size, engine, **engine_options)
+        report = get_cached_result(cache_key)
+        record['cache_hit'] = report is not None
+        if report is None:
+            report = run_engine(affinity_matrix, student_ids, group_size, engine, **engine_options)
+            store_result(cache_key, report)
+        if report.get('solver'):
+            record['solver'] = report['solver']
+    result_groups, global_score = report['groups'], report['score']
 
     # Convert result_groups (list of lists) to student_to_group dict (student_id -> group_id)
     student_to_group = {}
@@ -240,37 +662,107 @@ def run_full_grouping(election_id: int, student_ids: list[int], group_size: int)
 
     # Convert back to list of groups for persisting and naming
     groups_for_persist = student_to_groups(student_to_group)
-    create_groups_and_name(election_id, groups_for_persist)
+    report_progress('persisting', 0.6)
+    group_ids = create_groups_and_name(election_id, groups_for_persist,
+                                       baseline=serialize_snapshot(student_ids, vote_matrix))
+
+    # Map student_id to the real group.id returned by the bulk insert
+    real_student_to_group = {
+        student_id: group_id
+        for group_id, members in zip(group_ids, groups_for_persist)
+        for student_id in members
+    }
 
-    # After persisting, re-fetch groups and map student_id to real group.id in DB
-    groups = Group.query.filter_by(election_id=election_id).all()
-    real_student_to_group = {}
-    for group in groups:
-        members = GroupMember.query.filter_by(group_id=group.id).all()
-        for m in members:
-            real_student_to_group[m.student_id] = group.id
+    report_progress('scoring', 0.9)
+    return (real_student_to_group, global_score,
+            *_score_groups(vote_matrix, report['labels'], group_ids, len(student_ids)))
 
-    # Fetch vote map for satisfiability
-    vote_map = votes_for_student(election_id, student_ids)
 
-    # Calculate satisfiability score
-    total_satisfaction, avg_satisfaction = calculate_satisfiability(real_student_to_group, vote_map)
+def _score_groups(vote_matrix, labels, group_ids: list[int], n_students: int) -> tuple:
+    """
+    Groups to highlight, total and average satisfaction of a persisted grouping.
+    """
+    with stage('scoring'):
+        # Calculate satisfiability score: points each student gave to their own group mates
+        satisfaction = student_satisfaction(vote_matrix, labels)
+        total_satisfaction = float(satisfaction.sum())
+        avg_satisfaction = total_satisfaction / n_students if n_students else 0
 
-    # Determine which groups to highlight based on voting relations
-    groups_to_highlight = groups_with_votes_between_members(election_id, real_student_to_group)
+        # Determine which groups to highlight based on voting relations
+        groups_to_highlight = {group_ids[label] for label in groups_with_internal_votes(vote_matrix, labels)}
 
-    return real_student_to_group, global_score, groups_to_highlight, total_satisfaction, avg_satisfaction
+    return groups_to_highlight, total_satisfaction, avg_satisfaction
+
+
+def _regroup_incrementally(election_id: int, student_ids: list[int], affinity_matrix, vote_matrix,
+                           group_ids: list[int], labels: np.ndarray, report_progress, stability: float,
+                           refine_budget: float = None) -> tuple:
+    """
+    Incremental body of run_full_grouping, starting from the persisted groups
+    (group_ids, labels) of current_assignment.
+    """
+    report_progress('clustering', 0.15)
+    with stage('clustering') as record:
+        # Without a baseline (groups from before incremental runs) every student may move
+        baseline = get_grouping_baseline(election_id)
+        if baseline is None:
+            affected = np.arange(len(student_ids))
+        else:
+            previous_votes = roster_vote_matrix(*deserialize_snapshot(baseline), student_ids)
+            _, affected = affinity_delta(previous_votes, vote_matrix)
+
+        start = labels
+        if len(affected):
+            labels, refinement = refine_by_swaps(affinity_matrix, labels, time_budget=refine_budget,
+                                                 movable=affected, stability=stability)
+            record['refinement'] = refinement
+        record['incremental'] = {'affected': int(len(affected)), 'moved': int((labels != start).sum())}
+
+    # Only the memberships of moved students and the names of their groups are written
+    report_progress('persisting', 0.6)
+    moved = np.flatnonzero(labels != start)
+    changed_groups = np.unique(np.concatenate([start[moved], labels[moved]])).tolist()
+    student_array = np.asarray(student_ids)
+    names = _name_groups([student_array[labels == label].tolist() for label in changed_groups]) if moved.size else []
+    with stage('persisting'):
+        move_group_members([(student_ids[i], group_ids[start[i]], group_ids[labels[i]]) for i in moved.tolist()])
+        rename_groups({group_ids[label]: name for label, name in zip(changed_groups, names)})
+        save_grouping_baseline(election_id, serialize_snapshot(student_ids, vote_matrix))
+        db.session.commit()
+
+    student_to_group = {student_id: group_ids[label] for student_id, label in zip(student_ids, labels.tolist())}
+    report_progress('scoring', 0.9)
+    return (student_to_group, total_affinity(affinity_matrix, labels),
+            *_score_groups(vote_matrix, labels, group_ids, len(student_ids)))
 
 def calculate_satisfiability(student_to_group: dict[int, int], vote_map: dict[int, dict[int, int]]):
-    total_satisfaction = 0
-    count_students = len(student_to_group)
+    """
+    Total and average satisfaction, where a student's satisfaction is the sum of
+    the scores they gave to members of their own group.
 
-    for student_id, group_id in student_to_group.items():
-        votes = vote_map.get(student_id, {})
-        group_mates = {sid for sid, gid in student_to_group.items() if gid == group_id and sid != student_id}
+    Args:
+        student_to_group: Mapping student_id -> group id
+        vote_map: Mapping voter_id -> {candidate_id -> score}
 
-        satisfaction = sum(score for cid, score in votes.items() if cid in group_mates)
-        total_satisfaction += satisfaction
+    Returns:
+        tuple: (total_satisfaction, avg_satisfaction_per_student)
+    """
+    count_students = len(student_to_group)
+    index = {sid: i for i, sid in enumerate(student_to_group)}
+    group_index = {}
+    labels = [group_index.setdefault(gid, len(group_index)) for gid in student_to_group.values()]
 
+    rows, cols, scores = [], [], []
+    for voter_id, votes in vote_map.items():
+        if voter_id not in index:
+            continue
+        for candidate_id, score in votes.items():
+            if candidate_id in index:
+                rows.append(index[voter_id])
+                cols.append(index[candidate_id])
+                scores.append(score)
+
+    vote_matrix = sparse.csr_matrix((scores, (rows, cols)), shape=(count_students, count_students))
+    total_satisfaction = float(student_satisfaction(vote_matrix, labels).sum()) if count_students else 0
     avg_satisfaction_per_student = total_satisfaction / count_students if count_students else 0
     return total_satisfaction, avg_satisfaction_per_student
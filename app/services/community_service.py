@@ -0,0 +1,170 @@
+import sys
+import os
+import heapq
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+
+from .scoring_service import indicator_matrix
+from .balanced_service import group_capacities
+from .graph_service import recursive_bisection
+
+# Local-moving passes per Louvain level, and levels of aggregation
+MAX_PASSES = 20
+MAX_LEVELS = 10
+
+
+def _local_moving(graph: sparse.csr_matrix, degrees: np.ndarray, total_weight: float, resolution: float,
+                  rng) -> tuple[np.ndarray, bool]:
+    """
+    Louvain phase one: move single nodes to the neighbouring community with the
+    largest modularity gain until no move helps. Each pass costs O(edges).
+
+    Returns:
+        tuple: (community per node, whether any node moved)
+    """
+    n = graph.shape[0]
+    indptr, indices, data = graph.indptr.tolist(), graph.indices.tolist(), graph.data.tolist()
+    degree = degrees.tolist()
+    community = list(range(n))
+    community_degree = list(degree)
+    moved_any = False
+
+    for _ in range(MAX_PASSES):
+        moved = False
+        for i in rng.permutation(n).tolist():
+            current, k_i = community[i], degree[i]
+            links = {}
+            for position in range(indptr[i], indptr[i + 1]):
+                j = indices[position]
+                if j != i:
+                    links[community[j]] = links.get(community[j], 0.0) + data[position]
+
+            # Gain of joining community c, up to a constant: k_i,c - γ Σ_tot(c) k_i / 2m
+            community_degree[current] -= k_i
+            factor = resolution * k_i / total_weight
+            best, best_gain = current, links.get(current, 0.0) - factor * community_degree[current]
+            for c, weight in links.items():
+                gain = weight - factor * community_degree[c]
+                if gain > best_gain + 1e-12:
+                    best, best_gain = c, gain
+            community_degree[best] += k_i
+
+            if best != current:
+                community[i] = best
+                moved = moved_any = True
+        if not moved:
+            break
+
+    return np.asarray(community, dtype=np.int64), moved_any
+
+
+def louvain_communities(adjacency: sparse.csr_matrix, resolution: float = 1.0, seed: int = 42) -> np.ndarray:
+    """
+    Modularity-maximizing communities of the vote graph (Louvain method):
+    alternate local node moves and aggregation of each community into one node
+    until no move improves modularity. Runs in roughly O(edges) per level.
+
+    Args:
+        adjacency (csr_matrix): Symmetric weighted adjacency without self loops
+        resolution (float): Higher values favour smaller communities
+        seed (int): Seed of the node visiting order
+
+    Returns:
+        np.ndarray: Community label (0..c-1) per student
+    """
+    rng = np.random.default_rng(seed)
+    membership = np.arange(adjacency.shape[0])
+    graph = sparse.csr_matrix(adjacency, dtype=np.float64)
+
+    for _ in range(MAX_LEVELS):
+        degrees = np.asarray(graph.sum(axis=1)).ravel()
+        total_weight = degrees.sum()
+        if total_weight == 0:
+            break
+
+        community, moved = _local_moving(graph, degrees, total_weight, resolution, rng)
+        if not moved:
+            break
+        _, community = np.unique(community, return_inverse=True)
+        membership = community[membership]
+
+        # Each community becomes one node; internal weight stays as a self loop
+        indicator = indicator_matrix(community)
+        graph = (indicator.T @ graph @ indicator).tocsr()
+
+    _, membership = np.unique(membership, return_inverse=True)
+    return membership
+
+
+def community_pieces(adjacency: sparse.csr_matrix, communities: np.ndarray, group_size: int,
+                     seed: int = 42) -> list[np.ndarray]:
+    """
+    Split every community larger than group_size into balanced pieces along its
+    own vote graph; smaller communities are kept whole.
+
+    Returns:
+        list[np.ndarray]: Pieces as arrays of student indices
+    """
+    order = np.argsort(communities, kind='stable')
+    bounds = np.flatnonzero(np.diff(communities[order])) + 1
+    pieces = []
+    for members in np.split(order, bounds):
+        if len(members) <= group_size:
+            pieces.append(members)
+            continue
+        capacities = group_capacities(len(members), group_size)
+        labels = recursive_bisection(adjacency[members][:, members], capacities, seed)
+        pieces.extend(members[labels == g] for g in range(len(capacities)))
+    return pieces
+
+
+def pack_pieces(adjacency: sparse.csr_matrix, pieces: list[np.ndarray], capacities: list[int]) -> np.ndarray:
+    """
+    Pack community pieces into groups of exactly the given sizes. Pieces are
+    placed largest first into the group they have the most votes with, or the
+    tightest group they fit in; a piece that fits nowhere is cut, its most
+    connected members filling the roomiest group.
+
+    Args:
+        adjacency (csr_matrix): Symmetric adjacency of the vote graph
+        pieces (list[np.ndarray]): Disjoint student index arrays covering every student
+        capacities (list[int]): Size of each group; must sum to the number of students
+
+    Returns:
+        np.ndarray: Group label per student
+    """
+    labels = np.full(adjacency.shape[0], -1, dtype=np.int64)
+    remaining = np.asarray(capacities, dtype=np.int64)
+    queue = [(-len(piece), position, piece) for position, piece in enumerate(pieces)]
+    heapq.heapify(queue)
+    counter = len(queue)
+
+    while queue:
+        _, _, piece = heapq.heappop(queue)
+        fits = np.flatnonzero(remaining >= len(piece))
+
+        if fits.size:
+            rows = adjacency[piece]
+            placed = labels[rows.indices] >= 0
+            links = np.bincount(labels[rows.indices][placed], weights=rows.data[placed], minlength=len(remaining))
+            if links[fits].max() > 0:
+                group = fits[np.argmax(links[fits])]
+            else:
+                group = fits[np.argmin(remaining[fits])]
+            labels[piece] = group
+            remaining[group] -= len(piece)
+            continue
+
+        group = int(np.argmax(remaining))
+        room = int(remaining[group])
+        internal = np.asarray(adjacency[piece][:, piece].sum(axis=1)).ravel()
+        ranked = piece[np.argsort(-internal, kind='stable')]
+        labels[ranked[:room]] = group
+        remaining[group] = 0
+        heapq.heappush(queue, (-(len(ranked) - room), counter, ranked[room:]))
+        counter += 1
+
+    return labels
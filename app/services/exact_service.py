@@ -0,0 +1,255 @@
+import sys
+import os
+import time
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from .scoring_service import total_affinity
+
+# Default wall-clock cap of one exact search, in seconds
+EXACT_TIME_LIMIT = 5.0
+
+# Above this many students the search is not attempted; the warm start is
+# returned with the gap to the root bound
+EXACT_STUDENT_LIMIT = 40
+
+# Maximum number of memoized partial partitions kept per search
+MEMO_LIMIT = 500_000
+
+# Scores closer than this are treated as equal
+EPSILON = 1e-9
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class _Search:
+    """
+    Depth-first branch and bound over group assignments. Students are placed
+    one at a time (strongest ties first) into an open group with a free slot or
+    into a newly opened group.
+
+    - Symmetry breaking: a student may only open the next unused group, so each
+      partition is generated once instead of once per group numbering.
+    - Bounds: a student still to be placed gains at most its best link to an
+      open group plus half of its strongest (largest group - 1) affinities to
+      the other unplaced students.
+    - Memo: the future of a partial partition depends only on the next student,
+      the members of the groups that still have room and the sizes left; a
+      state reached again with no better score is pruned.
+    """
+
+    def __init__(self, affinities: np.ndarray, capacities: list[int], deadline: float):
+        self.n = len(affinities)
+        self.k = len(capacities)
+        self.weights = affinities
+        self.largest = max(capacities)
+        self.deadline = deadline
+
+        self.sizes = sorted(set(capacities), reverse=True)
+        self.sizes_left = [Counter(capacities)[size] for size in self.sizes]
+        self.group_of = np.full(self.n, -1, dtype=np.int64)
+        self.link = np.zeros((self.n, self.k))
+        self.capacity = [0] * self.k
+        self.fill = [0] * self.k
+        self.members = [0] * self.k
+        self.opened = 0
+
+        # partner_bound[i][u, t]: half the sum of the t strongest affinities of
+        # student i + u to the other students i..n-1
+        self.partner_bound = [self._partner_bound(i) for i in range(self.n)]
+
+        self.best_score = -np.inf
+        self.best_labels = None
+        self.memo = {}
+        self.nodes = 0
+        self.pending = []
+
+    def _partner_bound(self, i: int) -> np.ndarray:
+        rest = self.weights[i:, i:].copy()
+        np.fill_diagonal(rest, -np.inf)
+        ranked = -np.sort(-rest, axis=1)[:, :self.largest - 1]
+        ranked[np.isneginf(ranked)] = 0.0
+        table = np.zeros((self.n - i, self.largest))
+        table[:, 1:1 + ranked.shape[1]] = 0.5 * np.cumsum(ranked, axis=1)
+        table[:, 1 + ranked.shape[1]:] = table[:, [ranked.shape[1]]]
+        return table
+
+    def bound(self, i: int) -> float:
+        """
+        Upper bound on what students i..n-1 can still add to the score: each of
+        them joins the option that suits it best, an open group (its ties to the
+        members plus half its strongest ties to as many unplaced students as the
+        group has slots left) or a new group of an unused size.
+        """
+        if i >= self.n:
+            return 0.0
+        partners = self.partner_bound[i]
+        options = []
+        free = [g for g in range(self.opened) if self.fill[g] < self.capacity[g]]
+        if free:
+            slots = np.array([self.capacity[g] - self.fill[g] - 1 for g in free])
+            options.append((self.link[i:, free] + partners[:, slots]).max(axis=1))
+        if self.opened < self.k:
+            largest_left = max(size for size, left in zip(self.sizes, self.sizes_left) if left)
+            options.append(partners[:, largest_left - 1])
+        return float(np.maximum.reduce(options).sum()) if options else 0.0
+
+    def _place(self, i: int, g: int) -> None:
+        self.group_of[i] = g
+        self.fill[g] += 1
+        self.members[g] |= 1 << i
+        self.link[:, g] += self.weights[:, i]
+
+    def _unplace(self, i: int, g: int) -> None:
+        self.group_of[i] = -1
+        self.fill[g] -= 1
+        self.members[g] &= ~(1 << i)
+        self.link[:, g] -= self.weights[:, i]
+
+    def _open(self, size_index: int) -> int:
+        g = self.opened
+        self.opened += 1
+        self.capacity[g] = self.sizes[size_index]
+        self.sizes_left[size_index] -= 1
+        return g
+
+    def _close(self, size_index: int) -> None:
+        self.opened -= 1
+        self.capacity[self.opened] = 0
+        self.sizes_left[size_index] += 1
+
+    def _state_key(self, i: int) -> tuple:
+        open_groups = sorted(
+            (self.members[g], self.capacity[g]) for g in range(self.opened) if self.fill[g] < self.capacity[g]
+        )
+        return i, tuple(open_groups), tuple(self.sizes_left)
+
+    def _children(self, i: int, score: float) -> list[tuple]:
+        """
+        Every placement of student i as (child bound, gain, group, size index to open).
+        """
+        children = []
+        for g in range(self.opened):
+            if self.fill[g] < self.capacity[g]:
+                gain = self.link[i, g]
+                self._place(i, g)
+                children.append((score + gain + self.bound(i + 1), gain, g, None))
+                self._unplace(i, g)
+        if self.opened < self.k:
+            for size_index, left in enumerate(self.sizes_left):
+                if left:
+                    g = self._open(size_index)
+                    self._place(i, g)
+                    children.append((score + self.bound(i + 1), 0.0, g, size_index))
+                    self._unplace(i, g)
+                    self._close(size_index)
+        # Most promising first, so good incumbents are found early
+        children.sort(key=lambda child: -child[0])
+        return children
+
+    def run(self, i: int = 0, score: float = 0.0) -> None:
+        if i == self.n:
+            if score > self.best_score + EPSILON:
+                self.best_score = score
+                self.best_labels = self.group_of.copy()
+            return
+
+        self.nodes += 1
+        key = self._state_key(i)
+        if self.memo.get(key, -np.inf) >= score - EPSILON:
+            return
+        if len(self.memo) < MEMO_LIMIT:
+            self.memo[key] = score
+
+        children = [child for child in self._children(i, score) if child[0] > self.best_score + EPSILON]
+        # On timeout the frames stay on self.pending: their children bound what was not explored
+        self.pending.append(children)
+        if self.nodes % 64 == 0 and time.perf_counter() > self.deadline:
+            raise _SearchTimeout()
+
+        while children:
+            child_bound, gain, g, size_index = children.pop(0)
+            if child_bound <= self.best_score + EPSILON:
+                break
+            if size_index is not None:
+                self._open(size_index)
+            self._place(i, g)
+            self.run(i + 1, score + gain)
+            self._unplace(i, g)
+            if size_index is not None:
+                self._close(size_index)
+        self.pending.pop()
+
+    def unexplored_bound(self) -> float:
+        return max((child[0] for children in self.pending for child in children), default=-np.inf)
+
+
+def exact_partition(affinities, capacities: list[int], time_limit: float = EXACT_TIME_LIMIT,
+                    warm_start=None) -> tuple[np.ndarray, dict]:
+    """
+    Highest-affinity partition into groups of exactly the given sizes, by branch
+    and bound. The search stops at the time limit and then returns the best
+    partition found so far together with an upper bound on the optimum.
+
+    Args:
+        affinities: Dense symmetric non-negative affinity matrix
+        capacities (list[int]): Size of each group; must sum to n
+        time_limit (float): Wall-clock cap in seconds
+        warm_start (array-like): Group label per student of a known partition with
+                                 the same sizes (e.g. from a KMeans engine); it becomes
+                                 the first incumbent, so weaker branches are pruned at once
+
+    Returns:
+        tuple: (labels, stats) where stats holds score, upper_bound, gap (relative,
+               0 when proven optimal), optimal, nodes and elapsed seconds
+    """
+    start = time.perf_counter()
+    weights = np.array(affinities, dtype=np.float64)
+    np.fill_diagonal(weights, 0.0)
+    n = len(weights)
+
+    # Strongly connected students first: their placements decide most of the score
+    order = np.argsort(-weights.sum(axis=1), kind='stable')
+    search = _Search(weights[np.ix_(order, order)], capacities, start + time_limit)
+    root_bound = search.bound(0)
+
+    if warm_start is not None:
+        warm_start = np.asarray(warm_start, dtype=np.int64)
+        search.best_score = total_affinity(weights, warm_start)
+        search.best_labels = warm_start[order]
+
+    optimal = False
+    if n <= EXACT_STUDENT_LIMIT:
+        try:
+            search.run()
+            optimal = True
+        except _SearchTimeout:
+            pass
+
+    if search.best_labels is None:
+        raise ValueError("No partition found; pass a warm start or raise the time limit")
+
+    labels = np.empty(n, dtype=np.int64)
+    labels[order] = search.best_labels
+    score = float(total_affinity(weights, labels))
+
+    if optimal:
+        upper_bound = score
+    elif n <= EXACT_STUDENT_LIMIT:
+        upper_bound = float(max(score, search.unexplored_bound()))
+    else:
+        upper_bound = float(max(score, root_bound))
+
+    return labels, {
+        'score': score,
+        'upper_bound': upper_bound,
+        'gap': (upper_bound - score) / upper_bound if upper_bound > EPSILON else 0.0,
+        'optimal': optimal,
+        'nodes': search.nodes,
+        'elapsed': time.perf_counter() - start
+    }
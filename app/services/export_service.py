@@ -0,0 +1,226 @@
+import sys
+import os
+import io
+import csv
+import json
+from datetime import date, datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from sqlalchemy import select, insert, func, DateTime, Date
+
+from app.extensions import db
+from app.models import Admin, Teacher, Student, Election, StudentVote, Group, GroupMember
+from app.models.election import election_students
+
+# Rows fetched per round trip while streaming
+EXPORT_CHUNK = 1000
+
+# Rows inserted per executemany while importing
+IMPORT_BATCH = 1000
+
+# Exportable tables in foreign-key order, so a dump can be restored front to back
+EXPORT_TABLES = {
+    table.name: table for table in (
+        Admin.__table__, Teacher.__table__, Student.__table__, Election.__table__,
+        election_students, StudentVote.__table__, Group.__table__, GroupMember.__table__
+    )
+}
+
+
+def _election_filter(table_name: str, election_id: int):
+    """
+    WHERE clause restricting a table to one election and the users it involves,
+    or None when the table has no rows belonging to an election (admins).
+    """
+    members = select(election_students.c.student_id).where(election_students.c.election_id == election_id)
+    filters = {
+        'teachers': Teacher.id.in_(select(Election.teacher_id).where(Election.id == election_id)),
+        'students': Student.id.in_(members),
+        'elections': Election.id == election_id,
+        'election_students': election_students.c.election_id == election_id,
+        'student_votes': StudentVote.election_id == election_id,
+        'groups': Group.election_id == election_id,
+        'group_members': GroupMember.group_id.in_(select(Group.id).where(Group.election_id == election_id)),
+    }
+    return filters.get(table_name)
+
+
+def resolve_tables(tables: list[str] = None) -> list[str]:
+    """
+    Validate requested table names and return them in foreign-key order.
+
+    Raises:
+        ValueError: If a name is not an exportable table
+    """
+    if not tables:
+        return list(EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown table(s) {', '.join(unknown)}. Available: {', '.join(EXPORT_TABLES)}")
+    # Keep foreign-key order whatever order was asked for
+    return [name for name in EXPORT_TABLES if name in tables]
+
+
+def iter_table_rows(table_name: str, election_id: int = None, chunk_size: int = EXPORT_CHUNK):
+    """
+    Stream the rows of one table as dicts, fetching chunk_size rows at a time
+    (yield_per) so memory stays flat whatever the table size.
+
+    Args:
+        table_name (str): Key of EXPORT_TABLES
+        election_id (int): Restrict to one election and its teacher/students
+        chunk_size (int): Rows per fetch
+
+    Yields:
+        dict: Column name -> value
+    """
+    table = EXPORT_TABLES[table_name]
+    statement = select(table).order_by(*table.primary_key.columns)
+    if election_id is not None:
+        where = _election_filter(table_name, election_id)
+        if where is None:
+            return
+        statement = statement.where(where)
+
+    result = db.session.execute(statement.execution_options(yield_per=chunk_size))
+    for partition in result.mappings().partitions():
+        for row in partition:
+            yield dict(row)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def iter_ndjson(tables: list[str] = None, election_id: int = None, chunk_size: int = EXPORT_CHUNK):
+    """
+    Stream a dump as NDJSON: one {"table": ..., "row": {...}} object per line.
+
+    Args:
+        tables (list[str]): Tables to export (default: all, in foreign-key order)
+        election_id (int): Restrict to one election
+        chunk_size (int): Rows per fetch
+
+    Yields:
+        str: One line of NDJSON
+    """
+    for table_name in resolve_tables(tables):
+        for row in iter_table_rows(table_name, election_id, chunk_size):
+            yield json.dumps({'table': table_name, 'row': row}, default=_json_default) + '\n'
+
+
+def iter_csv(table_name: str, election_id: int = None, chunk_size: int = EXPORT_CHUNK):
+    """
+    Stream one table as CSV, header first.
+
+    Args:
+        table_name (str): Key of EXPORT_TABLES
+        election_id (int): Restrict to one election
+        chunk_size (int): Rows per fetch
+
+    Yields:
+        str: A chunk of CSV text
+    """
+    resolve_tables([table_name])
+    columns = [column.name for column in EXPORT_TABLES[table_name].columns]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+
+    for count, row in enumerate(iter_table_rows(table_name, election_id, chunk_size), start=1):
+        writer.writerow({k: v.isoformat() if isinstance(v, (datetime, date)) else v for k, v in row.items()})
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _row_converter(table):
+    """
+    Function turning the JSON values of a row back into column types (ISO dates).
+    """
+    temporal = {
+        column.name: (datetime.fromisoformat if isinstance(column.type, DateTime) else date.fromisoformat)
+        for column in table.columns if isinstance(column.type, (DateTime, Date))
+    }
+
+    def convert(row):
+        for name, parse in temporal.items():
+            if isinstance(row.get(name), str):
+                row[name] = parse(row[name])
+        return row
+    return convert
+
+
+def sequence_reset(table):
+    """
+    Statement moving a table's PostgreSQL ID sequence to its largest ID, so the
+    next ordinary insert does not reuse an imported primary key.
+    """
+    return select(func.setval(
+        func.pg_get_serial_sequence(table.name, 'id'),
+        select(func.max(table.c.id)).scalar_subquery()
+    ))
+
+
+def import_ndjson(lines, batch_size: int = IMPORT_BATCH) -> dict[str, int]:
+    """
+    Restore an NDJSON dump produced by iter_ndjson into an empty database.
+    Rows are inserted with one executemany per batch, keeping their primary
+    keys, and the whole import is committed once (rolled back on error).
+    Explicit keys do not advance PostgreSQL sequences, so those of the imported
+    tables are moved past the imported IDs; SQLite needs nothing.
+
+    Args:
+        lines (iterable of str): NDJSON lines
+        batch_size (int): Rows per INSERT batch
+
+    Returns:
+        dict[str, int]: Number of rows imported per table
+    """
+    counts = {}
+    pending = {}
+    converters = {}
+
+    def flush(table_name):
+        rows = pending.pop(table_name, [])
+        if rows:
+            db.session.execute(insert(EXPORT_TABLES[table_name]), rows)
+
+    try:
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            table_name = record['table']
+            if table_name not in EXPORT_TABLES:
+                raise ValueError(f"Unknown table '{table_name}' in dump")
+
+            # Parent tables come first in a dump; flush them before their children
+            for other in list(pending):
+                if other != table_name:
+                    flush(other)
+
+            convert = converters.setdefault(table_name, _row_converter(EXPORT_TABLES[table_name]))
+            pending.setdefault(table_name, []).append(convert(record['row']))
+            counts[table_name] = counts.get(table_name, 0) + 1
+            if len(pending[table_name]) >= batch_size:
+                flush(table_name)
+
+        for table_name in list(pending):
+            flush(table_name)
+        if db.session.get_bind().dialect.name == 'postgresql':
+            for table_name in counts:
+                if 'id' in EXPORT_TABLES[table_name].c:
+                    db.session.execute(sequence_reset(EXPORT_TABLES[table_name]))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return counts
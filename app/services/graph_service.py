@@ -0,0 +1,167 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh, ArpackNoConvergence
+
+from .refinement_service import refine_by_swaps
+
+# Subgraphs up to this size are embedded with a dense eigensolver, which is
+# faster and more robust than ARPACK on small matrices
+DENSE_EIGEN_LIMIT = 200
+
+# Subgraphs up to this size are refined with pairwise swaps once partitioned;
+# the swap gain table is block × groups-in-block, so this bounds its memory
+REFINE_BLOCK = 1000
+
+
+def vote_graph(affinity) -> sparse.csr_matrix:
+    """
+    Symmetric sparse adjacency of the vote graph, without self loops.
+
+    Args:
+        affinity: Symmetric non-negative affinity matrix, dense or sparse
+
+    Returns:
+        csr_matrix: n×n weighted adjacency
+    """
+    adjacency = sparse.csr_matrix(affinity, dtype=np.float64)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+def fiedler_vector(adjacency: sparse.csr_matrix, seed: int = 42) -> np.ndarray:
+    """
+    Second eigenvector of the degree-regularized normalized adjacency
+    (D + τ)^-1/2 A (D + τ)^-1/2, scaled back by (D + τ)^-1/2. Sorting students
+    by it places tightly connected students next to each other. τ is the mean
+    degree; it keeps low-degree students from dominating the embedding.
+
+    Args:
+        adjacency (csr_matrix): Connected symmetric adjacency
+        seed (int): Seed of the ARPACK start vector
+
+    Returns:
+        np.ndarray: One coordinate per student
+    """
+    n = adjacency.shape[0]
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    scale = 1.0 / np.sqrt(degrees + max(degrees.mean(), 1e-9))
+    normalized = sparse.diags(scale) @ adjacency @ sparse.diags(scale)
+
+    if n <= DENSE_EIGEN_LIMIT:
+        _, vectors = np.linalg.eigh(normalized.toarray())
+    else:
+        v0 = np.random.default_rng(seed).random(n)
+        try:
+            _, vectors = eigsh(normalized, k=2, which='LA', v0=v0, tol=1e-6)
+        except ArpackNoConvergence as e:
+            if e.eigenvectors.shape[1] < 2:
+                return np.zeros(n)
+            vectors = e.eigenvectors
+        vectors = vectors[:, np.argsort(_rayleigh(normalized, vectors))]
+    return scale * vectors[:, -2]
+
+
+def _rayleigh(matrix, vectors) -> np.ndarray:
+    return np.einsum('ij,ij->j', vectors, matrix @ vectors)
+
+
+def split_order(adjacency: sparse.csr_matrix, left_size: int, seed: int = 42) -> np.ndarray:
+    """
+    Order the students of a subgraph so that its first left_size entries form
+    the left side of a balanced bisection.
+
+    Whole connected components are packed into the left side largest first;
+    the single component that has to be cut is ordered by its Fiedler vector,
+    so the cut falls where that component is most loosely connected.
+
+    Args:
+        adjacency (csr_matrix): Symmetric adjacency of the subgraph
+        left_size (int): Number of students on the left side
+        seed (int): Seed for the eigensolver
+
+    Returns:
+        np.ndarray: Permutation of range(n)
+    """
+    n_components, component = connected_components(adjacency, directed=False)
+    if n_components == 1:
+        return np.argsort(fiedler_vector(adjacency, seed), kind='stable')
+
+    sizes = np.bincount(component)
+    left, rest, remaining = [], [], left_size
+    for c in np.argsort(-sizes, kind='stable'):
+        if sizes[c] <= remaining:
+            left.append(c)
+            remaining -= sizes[c]
+        else:
+            rest.append(c)
+
+    # Every component left over is larger than the remaining room, so at most
+    # the first of them is cut; rest is already sorted largest first
+    order = [np.flatnonzero(np.isin(component, left))]
+    if rest:
+        cut = np.flatnonzero(component == rest[0])
+        if remaining:
+            sub = adjacency[cut][:, cut]
+            cut = cut[np.argsort(fiedler_vector(sub, seed), kind='stable')]
+        order.append(cut)
+        order.append(np.flatnonzero(np.isin(component, rest[1:])))
+    return np.concatenate(order)
+
+
+def recursive_bisection(adjacency: sparse.csr_matrix, capacities: list[int], seed: int = 42,
+                        refine_block: int = REFINE_BLOCK) -> np.ndarray:
+    """
+    Partition the vote graph into groups of exactly the given sizes by recursive
+    spectral bisection: each subgraph is split in two along its Fiedler order,
+    the left part receiving the first half of its groups.
+
+    Once a subgraph has at most refine_block students, it is partitioned down to
+    its groups and polished with pairwise swaps between those groups, which
+    repairs cliques that a straight cut went through.
+
+    Above refine_block students, memory follows the number of votes: sparse
+    subgraphs and one vector per subgraph. Dense work is capped at one
+    (refine_block × groups in the block) swap gain table and, for subgraphs of
+    up to DENSE_EIGEN_LIMIT students, one dense eigenproblem of at most
+    200×200; a class of up to refine_block students therefore does get a dense
+    n×k gain table.
+
+    Args:
+        adjacency (csr_matrix): Symmetric adjacency of the vote graph
+        capacities (list[int]): Size of each group; must sum to n
+        seed (int): Seed for the eigensolver
+        refine_block (int): Largest subgraph refined as a whole (0 = no refinement)
+
+    Returns:
+        np.ndarray: Group label per student
+    """
+    n = adjacency.shape[0]
+    labels = np.empty(n, dtype=np.int64)
+    stack = [(np.arange(n), 0, len(capacities))]
+
+    while stack:
+        nodes, first, last = stack.pop()
+        if last - first == 1:
+            labels[nodes] = first
+            continue
+
+        if len(nodes) <= refine_block:
+            sub = adjacency[nodes][:, nodes]
+            local, _ = refine_by_swaps(sub, recursive_bisection(sub, capacities[first:last], seed, refine_block=0))
+            labels[nodes] = first + local
+            continue
+
+        middle = (first + last) // 2
+        left_size = int(sum(capacities[first:middle]))
+        order = split_order(adjacency[nodes][:, nodes], left_size, seed)
+        stack.append((nodes[order[:left_size]], first, middle))
+        stack.append((nodes[order[left_size:]], middle, last))
+
+    return labels
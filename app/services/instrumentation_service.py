@@ -0,0 +1,201 @@
+import sys
+import os
+import io
+import json
+import time
+import logging
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.query_counter import count_queries
+
+logger = logging.getLogger('app.grouping')
+
+# Instrumentation of the grouping run executing in the current thread/context
+_active = ContextVar('grouping_instrumentation', default=None)
+
+# Callables listener(record) notified whenever any instrumented stage ends
+_stage_listeners = []
+
+# Held by a run capturing cProfile or tracemalloc: tracemalloc is process-wide,
+# so two captures at once (grouping jobs share a thread pool) would mix their
+# peaks and the first to finish would stop tracing under the other
+_capture_lock = threading.Lock()
+
+
+def add_stage_listener(listener) -> None:
+    """
+    Subscribe to every finished stage of every instrumented grouping run.
+
+    Args:
+        listener: Callable receiving the stage record dict
+                  ({'stage', 'seconds', 'queries', 'peak_mb'?})
+    """
+    if listener not in _stage_listeners:
+        _stage_listeners.append(listener)
+
+
+def remove_stage_listener(listener) -> None:
+    if listener in _stage_listeners:
+        _stage_listeners.remove(listener)
+
+
+class GroupingInstrumentation:
+    """
+    Per-stage timers for one grouping run, with optional cProfile and
+    tracemalloc capture. Stages opened inside another stage are recorded
+    with a dotted name, e.g. 'clustering.rebalance'.
+
+    Captures run one at a time: a run that profiles or traces memory waits
+    for any other capturing run to finish. Plain timed runs are not held up,
+    but their allocations still count towards a concurrent memory capture.
+    """
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False, profile_limit: int = 25):
+        """
+        Args:
+            profile (bool): Run cProfile over the whole run and report the top functions
+            trace_memory (bool): Record peak traced Python/NumPy memory per stage
+            profile_limit (int): Number of functions kept in the profile report
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_limit = profile_limit
+        self.stages = []
+        self.total_seconds = None
+        self.peak_mb = None
+        self._profiler = None
+        self._stack = []
+
+    @contextmanager
+    def run(self):
+        """
+        Make this the active instrumentation for the block, so stage() calls in
+        the engines reach it, and start the optional profilers around it
+        (waiting for another run's capture to end first).
+        """
+        capturing = self.profile or self.trace_memory
+        with _capture_lock if capturing else nullcontext():
+            token = _active.set(self)
+            started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            if self.profile:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+
+            start = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self.total_seconds = round(time.perf_counter() - start, 6)
+                if self._profiler is not None:
+                    self._profiler.disable()
+                if self.trace_memory:
+                    self.peak_mb = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+                if started_tracing:
+                    tracemalloc.stop()
+                _active.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time one stage of the run, counting its SQL statements.
+
+        Args:
+            name (str): Stage name
+        """
+        parent = self._stack[-1] if self._stack else None
+        record = {'stage': f"{parent['stage']}.{name}" if parent else name}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # reset_peak() restarts the peak for this stage; the enclosing
+            # stage keeps what it had seen so far in its own record
+            if parent is not None:
+                parent['_peak'] = max(parent.get('_peak', 0), tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            with count_queries() as queries:
+                yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            record['queries'] = queries.count
+            self._stack.pop()
+            if tracing:
+                peak = max(record.pop('_peak', 0), tracemalloc.get_traced_memory()[1])
+                record['peak_mb'] = round(peak / 2 ** 20, 3)
+                if parent is not None:
+                    parent['_peak'] = max(parent.get('_peak', 0), peak)
+            self.stages.append(record)
+            for listener in list(_stage_listeners):
+                listener(record)
+
+    def profile_stats(self) -> list[dict]:
+        """
+        Top functions of the cProfile capture by cumulative time.
+
+        Returns:
+            list[dict]: {'function', 'calls', 'total_seconds', 'cumulative_seconds'} per function
+        """
+        if self._profiler is None:
+            return []
+        stats = pstats.Stats(self._profiler, stream=io.StringIO()).sort_stats('cumulative')
+        rows = []
+        for func in stats.fcn_list[:self.profile_limit]:
+            calls, _, total, cumulative, _ = stats.stats[func]
+            filename, line, function = func
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{line}({function})",
+                'calls': calls,
+                'total_seconds': round(total, 6),
+                'cumulative_seconds': round(cumulative, 6)
+            })
+        return rows
+
+    def report(self) -> dict:
+        """
+        Stages in completion order (inner stages before the stage that contains them),
+        total wall time and, when enabled, peak memory and profile.
+        """
+        report = {'total_seconds': self.total_seconds, 'stages': list(self.stages)}
+        if self.trace_memory:
+            report['peak_mb'] = self.peak_mb
+        if self.profile:
+            report['profile'] = self.profile_stats()
+        return report
+
+    def log(self, **context) -> dict:
+        """
+        Log the report as one JSON line on the 'app.grouping' logger.
+
+        Args:
+            **context: Extra fields identifying the run, e.g. election_id and engine
+
+        Returns:
+            dict: The logged record
+        """
+        record = {'event': 'grouping_instrumentation', **context, **self.report()}
+        logger.info(json.dumps(record, default=str))
+        return record
+
+
+def stage(name: str):
+    """
+    Time a stage on the active grouping instrumentation, if any. Engines and
+    services call this unconditionally; outside an instrumented run it does nothing.
+
+    Example:
+        with stage('rebalance'):
+            ...
+    """
+    instrumentation = _active.get()
+    return instrumentation.stage(name) if instrumentation is not None else nullcontext()
@@ -0,0 +1,215 @@
+import sys
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from flask import current_app
+
+from app.dao import (
+    add_job,
+    get_job_by_id,
+    get_active_job_for_election,
+    update_job
+)
+from app.extensions import db
+from app.models import GroupingJob
+
+# In-process worker pool shared by all requests, created on first use
+_executor = None
+
+# Guards pool creation and the check-then-insert that merges duplicate submissions
+_lock = threading.Lock()
+
+# Futures of the unfinished jobs started by this process, by job ID
+_futures = {}
+
+# Engine and options requested for each job in _futures
+_requests = {}
+
+
+class GroupingJobConflict(Exception):
+    """
+    Raised when a grouping is requested while the election already has an
+    active job with another engine or other options; .job is that job.
+    """
+
+    def __init__(self, job: GroupingJob):
+        super().__init__(f"Grouping job #{job.id} is already {job.status} with engine '{job.engine}'.")
+        self.job = job
+
+
+def grouping_engine_names() -> list[str]:
+    """
+    Names of the available grouping engines (imports the clustering stack on first use).
+    """
+    from .clustering_service import GROUPING_ENGINES
+    return list(GROUPING_ENGINES)
+
+
+def _get_executor(app) -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get('GROUPING_JOB_WORKERS', 2),
+            thread_name_prefix='grouping-job'
+        )
+    return _executor
+
+
+def _is_stale(job: GroupingJob, app) -> bool:
+    """
+    An active job that this process is not running and that has not reported
+    progress for GROUPING_JOB_STALE_SECONDS was abandoned (e.g. by a restart).
+    """
+    if job.id in _futures:
+        return False
+    stale_after = timedelta(seconds=app.config.get('GROUPING_JOB_STALE_SECONDS', 1800))
+    last_update = job.updated_at or job.created_at
+    return last_update is not None and datetime.utcnow() - last_update > stale_after
+
+
+def enqueue_grouping_job(election_id: int, student_ids: list[int], group_size: int, engine: str = 'kmeans',
+                         **engine_options) -> GroupingJob:
+    """
+    Queue a run_full_grouping run on the background worker pool and return at once.
+    If the election already has a queued or running job with the same engine and
+    options, that job is returned instead of starting a new one; with another
+    engine or options GroupingJobConflict is raised, so the caller never gets
+    the results of a run it did not ask for. (For an active job of another
+    process only the engine can be compared.)
+
+    Args:
+        election_id (int): Election to group
+        student_ids (list[int]): Students to group
+        group_size (int): Maximum number of students per group
+        engine (str): Grouping engine
+        **engine_options: Passed to run_full_grouping (restarts, workers, refine, profile, trace_memory...)
+
+    Returns:
+        GroupingJob: The new job, or the running job it was merged into
+
+    Raises:
+        GroupingJobConflict: The active job runs another engine or other options
+    """
+    app = current_app._get_current_object()
+
+    with _lock:
+        active = get_active_job_for_election(election_id)
+        if active and not _is_stale(active, app):
+            running_options = _requests.get(active.id, (active.engine, engine_options))
+            if running_options != (engine, engine_options):
+                raise GroupingJobConflict(active)
+            return active
+        if active:
+            update_job(active.id, status='failed', error='Job was abandoned before completing.')
+
+        job = add_job(GroupingJob(election_id=election_id, status='queued', stage='queued',
+                                  progress=0.0, engine=engine))
+        future = _get_executor(app).submit(
+            _run_job, app, job.id, election_id, list(student_ids), group_size, engine, engine_options
+        )
+        _futures[job.id] = future
+        _requests[job.id] = (engine, engine_options)
+        # Registered after the insert, so a job that already finished is still forgotten
+        future.add_done_callback(lambda _, job_id=job.id: _forget_job(job_id))
+
+    return job
+
+
+def _forget_job(job_id: int) -> None:
+    """
+    Drop a finished job's future (and the result or exception it holds).
+    """
+    _futures.pop(job_id, None)
+    _requests.pop(job_id, None)
+
+
+def _run_job(app, job_id: int, election_id: int, student_ids: list[int], group_size: int, engine: str,
+             engine_options: dict):
+    """
+    Worker body: run the grouping inside an app context and record progress and outcome.
+    """
+    # The clustering stack (NumPy, SciPy, scikit-learn) is loaded by the first job, not at app start
+    from .clustering_service import run_full_grouping
+
+    with app.app_context():
+        try:
+            update_job(job_id, status='running', stage='starting', progress=0.0)
+
+            def progress(stage, fraction):
+                update_job(job_id, stage=stage, progress=fraction)
+
+            grouping = run_full_grouping(
+                election_id, student_ids, group_size, engine=engine, progress=progress, **engine_options
+            )
+            student_to_group, score, groups_to_highlight, total_satisfaction, avg_satisfaction = grouping
+            result = {
+                'engine': engine,
+                'score': float(score),
+                'total_satisfaction': float(total_satisfaction),
+                'avg_satisfaction': float(avg_satisfaction),
+                'group_count': len(set(student_to_group.values())),
+                'groups_to_highlight': sorted(groups_to_highlight),
+                'instrumentation': grouping.report
+            }
+            update_job(job_id, status='finished', stage='done', progress=1.0, result=json.dumps(result))
+        except Exception as e:
+            db.session.rollback()
+            update_job(job_id, status='failed', error=str(e))
+        finally:
+            db.session.remove()
+
+
+def wait_for_job(job_id: int, timeout: float = None) -> None:
+    """
+    Block until a job started by this process has completed (used by tests and scripts).
+
+    Args:
+        job_id (int): Job ID
+        timeout (float): Seconds to wait before raising TimeoutError
+    """
+    future = _futures.get(job_id)
+    if future is not None:
+        future.result(timeout=timeout)
+        # The done callback may still be pending in the worker thread
+        _forget_job(job_id)
+
+
+def job_status(job: GroupingJob) -> dict:
+    """
+    Serialize a job for the status endpoint.
+
+    Args:
+        job (GroupingJob): The job
+
+    Returns:
+        dict: Job ID, election, status, stage, progress, engine, result scores and error
+    """
+    return {
+        'job_id': job.id,
+        'election_id': job.election_id,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job.progress,
+        'engine': job.engine,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error
+    }
+
+
+def get_job_status(job_id: int) -> dict:
+    """
+    Fetch a job's status by ID.
+
+    Args:
+        job_id (int): Job ID
+
+    Returns:
+        dict: job_status() of the job, or None if it does not exist
+    """
+    job = get_job_by_id(job_id)
+    return job_status(job) if job else None
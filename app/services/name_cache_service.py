@@ -0,0 +1,114 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from flask import current_app
+from app.extensions import db
+from app.dao import get_cached_names, store_cached_names, evict_cached_names
+from .openai_service import OpenAIService
+
+# Process-wide cache counters, reported by name_cache_stats()
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+
+def _count(**increments):
+    with _stats_lock:
+        for key, value in increments.items():
+            _stats[key] += value
+
+
+def name_cache_stats() -> dict:
+    """
+    Hit/miss counters of the group-name cache since the process started.
+
+    Returns:
+        dict: hits, misses, stored, evicted and hit_rate
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def reset_name_cache_stats():
+    """
+    Reset the cache counters to zero.
+    """
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def name_signature(first_names: list[str], prompt_version: int = OpenAIService.PROMPT_VERSION) -> str:
+    """
+    Cache key of a group: the prompt version and the group's initials in sorted
+    order, so the same members listed differently share one entry.
+
+    Args:
+        first_names (list of str): First names of the group members
+        prompt_version (int): Version of the naming prompt
+
+    Returns:
+        str: Signature such as "1:ABC"
+    """
+    return f"{prompt_version}:{''.join(sorted(OpenAIService.initials_for(first_names)))}"
+
+
+def generate_group_names_cached(first_names_per_group: list[list[str]], group_namer: OpenAIService = None) -> list[str]:
+    """
+    Name groups, reusing cached names and calling the naming API only for
+    the signatures not seen before. Generated names are stored; fallbacks equal
+    to the plain initials are not, so a failed call is retried next time.
+
+    Args:
+        first_names_per_group (list of list of str): First names of each group's members
+        group_namer (OpenAIService): Namer used on cache misses; created if omitted
+
+    Returns:
+        list of str: One name per group, in the same order
+    """
+    group_namer = group_namer or OpenAIService()
+    if not current_app.config.get('NAME_CACHE_ENABLED', True):
+        return group_namer.generate_group_names(first_names_per_group)
+
+    version = group_namer.PROMPT_VERSION
+    signatures = [name_signature(names, version) if names else None for names in first_names_per_group]
+    cached = get_cached_names([s for s in signatures if s])
+
+    # One API call per distinct missing signature
+    missing = {}
+    for signature, names in zip(signatures, first_names_per_group):
+        if signature and signature not in cached and signature not in missing:
+            missing[signature] = names
+    generated = dict(zip(missing, group_namer.generate_group_names(list(missing.values()))))
+
+    hits = sum(1 for s in signatures if s in cached)
+    _count(hits=hits, misses=sum(1 for s in signatures if s) - hits)
+
+    new_entries = {
+        signature: (version, OpenAIService.initials_for(missing[signature]), name)
+        for signature, name in generated.items()
+        if name and name != OpenAIService.initials_for(missing[signature])
+    }
+    try:
+        stored = store_cached_names(new_entries)
+        evicted = evict_cached_names(current_app.config.get('NAME_CACHE_MAX_ENTRIES'),
+                                     current_app.config.get('NAME_CACHE_TTL_SECONDS'))
+        db.session.commit()
+        _count(stored=stored, evicted=evicted)
+    except Exception as e:
+        # Caching is best effort (e.g. a concurrent run inserted the same signature)
+        db.session.rollback()
+        print(f"Group name cache not updated: {e}")
+
+    names = []
+    for signature, first_names in zip(signatures, first_names_per_group):
+        if signature is None:
+            names.append(group_namer.generate_group_name_from_initials(first_names))
+        else:
+            names.append(cached.get(signature) or generated[signature])
+    return names
@@ -1,17 +1,37 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from openai import OpenAI, OpenAIError
-
 class OpenAIService:
     """Handles group name generation using OpenAI chat completions"""
 
-    def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
+    # Bump whenever the prompt or model changes so cached names are not reused
+    PROMPT_VERSION = 1
+
+    def __init__(self, api_key=None, base_url=None, timeout=None, max_workers=None, max_retries=1):
+        """
+        Args:
+            api_key (str): API key; defaults to OPENAI_API_KEY
+            base_url (str): API base URL; defaults to OPENAI_BASE_URL or the public API
+            timeout (float): Per-call timeout in seconds; defaults to OPENAI_TIMEOUT or 10
+            max_workers (int): Concurrent calls in generate_group_names; defaults to OPENAI_NAMING_WORKERS or 8
+            max_retries (int): Retries per call before falling back to initials
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.timeout = float(timeout or os.getenv("OPENAI_TIMEOUT", 10))
+        self.max_workers = int(max_workers or os.getenv("OPENAI_NAMING_WORKERS", 8))
         if self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
+            # The SDK is only imported when names are actually requested from the API
+            from openai import OpenAI
+
+            self.client = OpenAI(
+                api_key=self.api_key,
+                base_url=base_url or os.getenv("OPENAI_BASE_URL") or None,
+                timeout=self.timeout,
+                max_retries=max_retries
+            )
             self.model = "gpt-4o-mini"
 
         self.system_prompt = (
@@ -20,6 +40,35 @@ class OpenAIService:
             "Return ONLY the group name as a plain text response, with no additional explanation or punctuation."
         )
 
+    @staticmethod
+    def initials_for(first_names):
+        """
+        Combined uppercase initials of a list of first names.
+
+        Args:
+            first_names (list of str): List of first names.
+
+        Returns:
+            str: Initials, e.g. "ABC"
+        """
+        return ''.join(name[0].upper() for name in first_names if name)
+
+    def _request_name(self, initials):
+        """
+        Ask the chat completion API for a name; raises on API errors.
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": initials}
+            ],
+            temperature=0.7,
+            max_tokens=15,
+            n=1
+        )
+        return response.choices[0].message.content.strip()
+
     def generate_group_name_from_initials(self, first_names):
         """
         Generate a creative group name based on the first letters of each first name.
@@ -34,24 +83,16 @@ class OpenAIService:
         if not first_names:
             return "Unnamed Group"
 
-        initials = ''.join(name[0].upper() for name in first_names if name)
+        initials = self.initials_for(first_names)
 
         if not self.api_key:
             # No API key; fallback to initials only
             return initials if initials else "Unnamed Group"
 
+        from openai import OpenAIError
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": initials}
-                ],
-                temperature=0.7,
-                max_tokens=15,
-                n=1
-            )
-            group_name = response.choices[0].message.content.strip()
+            group_name = self._request_name(initials)
             print(f"Generated group name: {group_name}")  # Debug output
             return group_name if group_name else initials
         except OpenAIError as oe:
@@ -60,3 +101,25 @@ class OpenAIService:
         except Exception as e:
             print(f"Error generating group name: {e}")
             return initials
+
+    def generate_group_names(self, first_names_per_group):
+        """
+        Name all groups of an election at once. Calls run concurrently on a bounded
+        thread pool, each limited by the client timeout; a group whose call fails
+        or times out falls back to its own initials without affecting the others.
+
+        Args:
+            first_names_per_group (list of list of str): First names of each group's members.
+
+        Returns:
+            list of str: One name per group, in the same order.
+        """
+        if not first_names_per_group:
+            return []
+
+        if not self.api_key:
+            return [self.generate_group_name_from_initials(names) for names in first_names_per_group]
+
+        workers = min(self.max_workers, len(first_names_per_group))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='group-naming') as pool:
+            return list(pool.map(self.generate_group_name_from_initials, first_names_per_group))
@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+
+from .scoring_service import gain_table, total_affinity
+
+# Smallest gain considered an improvement (guards against float noise loops)
+MIN_GAIN = 1e-9
+
+
+def refine_by_swaps(affinity, labels, time_budget: float = None, max_passes: int = None, movable=None,
+                    stability: float = 0.0):
+    """
+    Improve a partition with pairwise swaps between groups. Swaps never change
+    group sizes, so a valid partition stays valid.
+
+    A gain table G[i, g] (affinity of student i to group g) is kept up to date:
+    applying a swap only touches the graph neighbours of the two students, and
+    evaluating a swap of i with every member of a group b costs O(|b|).
+    Only groups where i has a neighbour are tried as destinations.
+
+    For incremental re-grouping, movable restricts the students that look for
+    a swap (their partners may be anyone), and stability charges every student
+    away from its starting group, so a swap has to gain more than the churn it
+    causes. Since partners then never look for swaps themselves, a movable
+    student also tries swaps that only help the partner, with every group tied
+    to its own.
+
+    Args:
+        affinity: Symmetric affinity matrix, dense or sparse
+        labels (array-like): Starting group label per student
+        time_budget (float): Stop after this many seconds (None = no limit)
+        max_passes (int): Stop after this many passes over all students (None = until no swap helps)
+        movable (array-like): Indices of the students that initiate swaps (None = everyone)
+        stability (float): Penalty, in affinity units, per student outside its starting group
+
+    Returns:
+        tuple: (refined labels, stats dict with score_before, score_after, improvement,
+                moves, moved_students, passes, elapsed and improvement_per_second)
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget is not None else None
+
+    adjacency = sparse.csr_matrix(affinity, dtype=np.float64)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    indptr, indices, data = adjacency.indptr, adjacency.indices, adjacency.data
+
+    labels = np.array(labels, dtype=np.int64)
+    origin = labels.copy()
+    candidates = range(len(labels)) if movable is None else np.unique(np.asarray(movable, dtype=np.int64)).tolist()
+    n_groups = int(labels.max()) + 1 if len(labels) else 0
+    gains = gain_table(adjacency, labels, n_groups)
+    members = [np.flatnonzero(labels == g).tolist() for g in range(n_groups)]
+
+    score_before = total_affinity(adjacency, labels)
+    improvement = 0.0
+    moves = 0
+    passes = 0
+    out_of_time = False
+
+    while not out_of_time and (max_passes is None or passes < max_passes):
+        passes += 1
+        improved = False
+
+        for i in candidates:
+            if deadline is not None and time.perf_counter() > deadline:
+                out_of_time = True
+                break
+
+            row = slice(indptr[i], indptr[i + 1])
+            a = labels[i]
+            if movable is None:
+                # Every student initiates, so a swap that only helps the partner is
+                # found from the partner's side; i only tries groups it is tied to
+                if indptr[i] == indptr[i + 1]:
+                    continue
+                destinations = labels[indices[row]]
+            else:
+                # Partners never initiate: also try the groups of students tied to
+                # i's group, whose members may gain by swapping in
+                tied = [indices[indptr[k]:indptr[k + 1]] for k in members[a]]
+                destinations = labels[np.concatenate(tied)]
+            neighbour_weight = dict(zip(indices[row].tolist(), data[row].tolist()))
+
+            best_delta, best_gain, best_j = MIN_GAIN, 0.0, None
+            for b in np.unique(destinations).tolist():
+                if b == a:
+                    continue
+                # Stability term of i: +stability back home, -stability leaving home
+                own_stability = stability * (int(origin[i] == b) - int(origin[i] == a))
+                if movable is None and gains[i, b] - gains[i, a] + own_stability <= 0:
+                    continue
+                others = np.asarray(members[b])
+                pair_weight = np.array([neighbour_weight.get(j, 0.0) for j in members[b]])
+                affinity_gains = (gains[i, b] - gains[i, a]) + (gains[others, a] - gains[others, b]) - 2 * pair_weight
+                other_stability = stability * ((origin[others] == a).astype(np.float64) - (origin[others] == b))
+                deltas = affinity_gains + own_stability + other_stability
+                k = int(np.argmax(deltas))
+                if deltas[k] > best_delta:
+                    best_delta, best_gain, best_j = deltas[k], affinity_gains[k], members[b][k]
+
+            if best_j is None:
+                continue
+
+            j, b = best_j, labels[best_j]
+            _swap(i, j, a, b, labels, members, gains, indptr, indices, data)
+            improvement += best_gain
+            moves += 1
+            improved = True
+
+        if not improved:
+            break
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        'score_before': score_before,
+        'score_after': float(score_before + improvement),
+        'improvement': float(improvement),
+        'moves': moves,
+        'moved_students': int((labels != origin).sum()),
+        'passes': passes,
+        'elapsed': elapsed,
+        'improvement_per_second': float(improvement / elapsed) if elapsed > 0 else 0.0
+    }
+    return labels, stats
+
+
+def _swap(i, j, a, b, labels, members, gains, indptr, indices, data):
+    """
+    Exchange student i (group a) with student j (group b) and update the
+    gain columns of a and b for the neighbours of i and j.
+    """
+    row_i = slice(indptr[i], indptr[i + 1])
+    gains[indices[row_i], a] -= data[row_i]
+    gains[indices[row_i], b] += data[row_i]
+
+    row_j = slice(indptr[j], indptr[j + 1])
+    gains[indices[row_j], b] -= data[row_j]
+    gains[indices[row_j], a] += data[row_j]
+
+    labels[i], labels[j] = b, a
+    members[a][members[a].index(i)] = j
+    members[b][members[b].index(j)] = i
@@ -0,0 +1,92 @@
+import sys
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from threadpoolctl import threadpool_limits
+
+# Data shared with every pool worker, set once by the pool initializer
+# instead of being pickled again for each restart
+_worker_data = {}
+
+
+def _init_worker(data):
+    """
+    Pool initializer: keep the shared data and pin native thread pools
+    (BLAS/OpenMP) to one thread so the workers do not oversubscribe the CPU.
+    """
+    threadpool_limits(limits=1)
+    _worker_data['data'] = data
+
+
+def _run_restart(fit, scorer, seed, args):
+    """
+    Run one seeded restart inside a pool worker.
+    """
+    data = _worker_data['data']
+    labels = fit(data, seed, *args)
+    return seed, scorer(data, labels), labels
+
+
+def pick_best(results):
+    """
+    Choose the best restart deterministically: highest score, and on a tie the
+    restart that comes first in seed order, exactly as a serial loop with a
+    strict `>` comparison would.
+
+    Args:
+        results (list[tuple]): (seed, score, labels) in seed order
+
+    Returns:
+        tuple: The winning (seed, score, labels)
+    """
+    best = None
+    for result in results:
+        if best is None or result[1] > best[1]:
+            best = result
+    return best
+
+
+def run_restarts(fit, scorer, data, seeds, args=(), workers: int = 1):
+    """
+    Run seeded restarts of a clustering routine, serially or in a process pool,
+    and return the best one. Parallel and serial runs give identical results for
+    the same seeds because every restart is seeded and the winner is picked in
+    seed order.
+
+    Args:
+        fit (callable): Top-level function fit(data, seed, *args) -> labels
+        scorer (callable): Top-level function scorer(data, labels) -> float
+        data: Picklable input shared by all restarts (e.g. the affinity matrix)
+        seeds (list[int]): One random seed per restart
+        args (tuple): Extra positional arguments for fit
+        workers (int): Number of worker processes; 1 or less runs serially
+
+    Returns:
+        tuple: (seed, score, labels) of the best restart
+
+    Raises:
+        ValueError: If seeds is empty (e.g. GROUPING_RESTARTS=0)
+    """
+    seeds = list(seeds)
+    if not seeds:
+        raise ValueError("Grouping needs at least one restart; set GROUPING_RESTARTS to 1 or more")
+    workers = min(workers or 1, len(seeds))
+
+    if workers <= 1:
+        results = []
+        for seed in seeds:
+            labels = fit(data, seed, *args)
+            results.append((seed, scorer(data, labels), labels))
+        return pick_best(results)
+
+    # 'spawn' avoids forking a process that holds DB connections and OpenMP threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(_run_restart, fit, scorer, seed, args) for seed in seeds]
+        results = [future.result() for future in futures]
+
+    return pick_best(results)
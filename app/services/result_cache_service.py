@@ -0,0 +1,130 @@
+import sys
+import os
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+from flask import current_app, has_app_context
+
+# Default number of grouping results kept per process (GROUPING_RESULT_CACHE_SIZE)
+DEFAULT_CACHE_SIZE = 64
+
+# Engine options that do not change the result and are left out of the key
+IGNORED_OPTIONS = ('workers',)
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+
+def _max_size() -> int:
+    if has_app_context():
+        return int(current_app.config.get('GROUPING_RESULT_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+    return DEFAULT_CACHE_SIZE
+
+
+def result_fingerprint(election_id: int, vote_matrix, student_ids: list[int], group_size: int,
+                       engine: str, **options) -> tuple:
+    """
+    Cache key of a grouping run. The votes are hashed from the roster's vote
+    matrix, so any vote change, roster change (membership or order), group size,
+    engine or option change gives a different key.
+
+    Args:
+        election_id (int): The election ID
+        vote_matrix: Raw vote matrix whose rows/columns follow student_ids
+        student_ids (list[int]): Roster in matrix order
+        group_size (int): Maximum number of students per group
+        engine (str): Grouping engine name
+        **options: Engine options (restarts, refine, ...)
+
+    Returns:
+        tuple: (election_id, digest)
+    """
+    votes = sparse.csr_matrix(vote_matrix)
+    votes.sort_indices()
+    digest = hashlib.sha256()
+    digest.update(np.asarray(student_ids, dtype=np.int64).tobytes())
+    for array in (votes.indptr.astype(np.int64), votes.indices.astype(np.int64), votes.data.astype(np.float64)):
+        digest.update(array.tobytes())
+    params = sorted((k, v) for k, v in options.items() if k not in IGNORED_OPTIONS)
+    digest.update(repr((int(group_size), engine, params)).encode())
+    return election_id, digest.hexdigest()
+
+
+def get_cached_result(key):
+    """
+    Look up a grouping report and count the hit or miss.
+
+    Returns:
+        dict: A copy of the cached report, or None
+    """
+    with _lock:
+        report = _entries.get(key)
+        if report is None:
+            _stats['misses'] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats['hits'] += 1
+    return copy.deepcopy(report)
+
+
+def store_result(key, report: dict):
+    """
+    Store a grouping report, evicting the least recently used entries beyond
+    GROUPING_RESULT_CACHE_SIZE (0 disables the cache).
+    """
+    max_size = _max_size()
+    if max_size <= 0:
+        return
+    report = copy.deepcopy(report)
+    with _lock:
+        _entries[key] = report
+        _entries.move_to_end(key)
+        while len(_entries) > max_size:
+            _entries.popitem(last=False)
+            _stats['evictions'] += 1
+
+
+def invalidate_election(election_id: int) -> int:
+    """
+    Drop every cached result of an election (e.g. after a vote write).
+
+    Returns:
+        int: Number of entries removed
+    """
+    with _lock:
+        keys = [key for key in _entries if key[0] == election_id]
+        for key in keys:
+            del _entries[key]
+        _stats['invalidations'] += len(keys)
+    return len(keys)
+
+
+def result_cache_stats() -> dict:
+    """
+    Counters of the grouping-result cache since the process started.
+
+    Returns:
+        dict: hits, misses, evictions, invalidations, size and hit_rate
+    """
+    with _lock:
+        stats = dict(_stats, size=len(_entries))
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+
+def clear_result_cache():
+    """
+    Empty the cache and reset its counters.
+    """
+    with _lock:
+        _entries.clear()
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,169 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+
+# Number of candidate partitions scored together in batch_total_affinity;
+# bounds the (batch × non-zeros) comparison buffer
+BATCH_CHUNK = 256
+
+
+def indicator_matrix(labels, n_groups: int = None) -> sparse.csr_matrix:
+    """
+    One-hot group indicator H where H[i, g] = 1 when student i is in group g.
+
+    Args:
+        labels (array-like): Group label per student (0..k-1)
+        n_groups (int): Number of groups; defaults to max(labels) + 1
+
+    Returns:
+        csr_matrix: n×k indicator matrix
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    n = len(labels)
+    if n_groups is None:
+        n_groups = int(labels.max()) + 1 if n else 0
+    return sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n_groups))
+
+
+def _diagonal(matrix) -> np.ndarray:
+    if sparse.issparse(matrix):
+        return np.asarray(matrix.diagonal(), dtype=np.float64)
+    return np.diagonal(np.asarray(matrix)).astype(np.float64)
+
+
+def _own_group_sums(matrix, labels: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    For every student i, the sum of matrix[i, j] over the other members j of i's group.
+    Computed as ((M @ H) ∘ H) summed per row, minus the diagonal term; for sparse
+    input the product stays sparse, so the cost follows the number of votes.
+    """
+    indicator = indicator_matrix(labels, n_groups)
+    per_group = matrix @ indicator
+    if sparse.issparse(per_group):
+        own = np.asarray(per_group.multiply(indicator).sum(axis=1)).ravel()
+    else:
+        own = np.asarray(per_group)[np.arange(len(labels)), labels]
+    return own.astype(np.float64) - _diagonal(matrix)
+
+
+def group_scores(affinity, labels, n_groups: int = None) -> np.ndarray:
+    """
+    Intra-group affinity per group, counting each pair of members once.
+
+    Args:
+        affinity: Symmetric affinity matrix, dense or sparse
+        labels (array-like): Group label per student
+        n_groups (int): Number of groups; defaults to max(labels) + 1
+
+    Returns:
+        np.ndarray: Score of each group
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    if n_groups is None:
+        n_groups = int(labels.max()) + 1 if len(labels) else 0
+    within = _own_group_sums(affinity, labels, n_groups)
+    return np.bincount(labels, weights=within, minlength=n_groups) / 2
+
+
+def total_affinity(affinity, labels) -> float:
+    """
+    Total intra-group affinity of a partition (sum over pairs i < j in the same group).
+    """
+    return float(group_scores(affinity, labels).sum())
+
+
+def student_satisfaction(votes, labels) -> np.ndarray:
+    """
+    Per-student satisfaction: the points each student gave to members of their own group.
+
+    Args:
+        votes: Raw (non-symmetric) vote matrix, dense or sparse
+        labels (array-like): Group label per student
+
+    Returns:
+        np.ndarray: Satisfaction of each student
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    n_groups = int(labels.max()) + 1 if len(labels) else 0
+    return _own_group_sums(votes, labels, n_groups)
+
+
+def groups_with_internal_votes(votes, labels) -> set[int]:
+    """
+    Labels of the groups in which at least one member gave a positive score
+    to another member.
+
+    Args:
+        votes: Raw vote matrix, dense or sparse
+        labels (array-like): Group label per student
+
+    Returns:
+        set[int]: Group labels with an internal vote
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    edges = sparse.coo_matrix(votes)
+    internal = (labels[edges.row] == labels[edges.col]) & (edges.row != edges.col) & (edges.data > 0)
+    return set(np.unique(labels[edges.row[internal]]).tolist())
+
+
+def batch_total_affinity(affinity, label_matrix) -> np.ndarray:
+    """
+    Score many candidate partitions of the same students at once.
+    Each edge of the affinity graph is tested against every partition in one
+    vectorized comparison, so the cost is O(partitions × non-zeros).
+
+    Args:
+        affinity: Symmetric affinity matrix, dense or sparse
+        label_matrix (array-like): m×n matrix, one label vector per row
+
+    Returns:
+        np.ndarray: Total intra-group affinity of each of the m partitions
+    """
+    label_matrix = np.atleast_2d(np.asarray(label_matrix, dtype=np.int64))
+    edges = sparse.coo_matrix(affinity)
+    off_diagonal = edges.row < edges.col
+    rows, cols, weights = edges.row[off_diagonal], edges.col[off_diagonal], edges.data[off_diagonal]
+
+    scores = np.empty(len(label_matrix), dtype=np.float64)
+    for start in range(0, len(label_matrix), BATCH_CHUNK):
+        chunk = label_matrix[start:start + BATCH_CHUNK]
+        same_group = chunk[:, rows] == chunk[:, cols]
+        scores[start:start + BATCH_CHUNK] = same_group @ weights
+    return scores
+
+
+def labels_from_groups(groups: list[list[int]], n: int = None) -> np.ndarray:
+    """
+    Convert groups given as lists of row indices into a label vector.
+    """
+    if n is None:
+        n = sum(len(g) for g in groups)
+    labels = np.empty(n, dtype=np.int64)
+    for label, members in enumerate(groups):
+        labels[members] = label
+    return labels
+
+
+def gain_table(affinity, labels, n_groups: int = None) -> np.ndarray:
+    """
+    Affinity of every student to every group: G[i, g] = sum of affinity[i, j]
+    over the members j of g, excluding i itself.
+
+    Args:
+        affinity: Symmetric affinity matrix, dense or sparse
+        labels (array-like): Group label per student
+        n_groups (int): Number of groups; defaults to max(labels) + 1
+
+    Returns:
+        np.ndarray: Dense n×k gain table
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    indicator = indicator_matrix(labels, n_groups)
+    gains = affinity @ indicator
+    gains = gains.toarray() if sparse.issparse(gains) else np.array(gains, dtype=np.float64)
+    gains[np.arange(len(labels)), labels] -= _diagonal(affinity)
+    return gains
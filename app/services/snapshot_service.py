@@ -0,0 +1,195 @@
+import sys
+import os
+import io
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.dao import get_snapshot_state, get_snapshot_data_at, insert_snapshot, update_snapshot
+from .affinity_service import load_vote_arrays, build_vote_matrix, build_affinity_matrix, _positions
+
+
+def serialize_snapshot(student_ids: np.ndarray, votes: sparse.csr_matrix) -> bytes:
+    """
+    Pack a vote matrix and its student ID index into a compressed .npz blob.
+    """
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        student_ids=np.asarray(student_ids, dtype=np.int64),
+        indptr=votes.indptr.astype(np.int64),
+        indices=votes.indices.astype(np.int32),
+        data=votes.data.astype(np.float64)
+    )
+    return buffer.getvalue()
+
+
+def deserialize_snapshot(blob: bytes):
+    """
+    Inverse of serialize_snapshot.
+
+    Returns:
+        tuple: (student_ids array, csr_matrix of votes)
+    """
+    with np.load(io.BytesIO(blob)) as archive:
+        student_ids = archive['student_ids']
+        n = len(student_ids)
+        votes = sparse.csr_matrix((archive['data'], archive['indices'], archive['indptr']), shape=(n, n))
+    return student_ids, votes
+
+
+def snapshot_from_arrays(voter_ids, candidate_ids, scores):
+    """
+    Build a snapshot from vote columns: the index is every student appearing
+    in a vote, sorted by ID, and the last vote of a repeated pair wins.
+
+    Returns:
+        tuple: (student_ids array, csr_matrix of votes)
+    """
+    voter_ids = np.asarray(voter_ids, dtype=np.int64)
+    candidate_ids = np.asarray(candidate_ids, dtype=np.int64)
+    student_ids = np.unique(np.concatenate([voter_ids, candidate_ids]))
+    return student_ids, build_vote_matrix(voter_ids, candidate_ids, scores, student_ids)
+
+
+def apply_vote_delta(election_id: int, version: int, voter_id: int, scores: dict, replace_ballot: bool = True) -> bool:
+    """
+    Patch an election's snapshot with one vote write, in the writer's
+    transaction and without scanning student_votes. Call it after
+    bump_vote_version: the counter row is locked until commit, so a snapshot
+    at version - 1 holds exactly the writes before this one. Any other
+    snapshot is left alone and the next reader rebuilds it. Does not commit.
+
+    Args:
+        election_id (int): The election ID
+        version (int): Vote-write count returned by bump_vote_version
+        voter_id (int): Student whose votes were written
+        scores (dict): Mapping candidate_id -> score of the votes now stored
+        replace_ballot (bool): The write replaced the voter's whole ballot,
+                               rather than only the candidates in scores
+
+    Returns:
+        bool: True if the snapshot was patched to the new version
+    """
+    blob = get_snapshot_data_at(election_id, version - 1)
+    if blob is None:
+        return False
+
+    student_ids, votes = deserialize_snapshot(blob)
+    edges = votes.tocoo()
+    voters, candidates = student_ids[edges.row], student_ids[edges.col]
+    keep = voters != voter_id
+    if not replace_ballot:
+        keep |= ~np.isin(candidates, np.fromiter(scores, dtype=np.int64, count=len(scores)))
+    kept = list(scores.items())
+    student_ids, votes = snapshot_from_arrays(
+        np.concatenate([voters[keep], np.full(len(kept), voter_id, dtype=np.int64)]),
+        np.concatenate([candidates[keep], np.array([c for c, _ in kept], dtype=np.int64)]),
+        np.concatenate([edges.data[keep], np.array([s for _, s in kept], dtype=np.float64)])
+    )
+    return update_snapshot(election_id, serialize_snapshot(student_ids, votes), version, version - 1)
+
+
+def load_vote_snapshot(election_id: int):
+    """
+    Read an election's vote snapshot. The vote writers patch it in their own
+    transaction (apply_vote_delta), so it is normally current. When there is
+    none, or it is behind the election's VoteVersion (first read, a write that
+    found it outdated, or a DAO-level write that does not patch it), it is
+    rebuilt from the student_votes rows and stored (this commits the new snapshot).
+
+    The vote count is read before the rows, so a rebuild racing a vote write
+    stores a blob holding at least the writes up to its version; a write that
+    lands in between leaves the count ahead and the next reader rebuilds again.
+
+    Args:
+        election_id (int): The election ID
+
+    Returns:
+        tuple: (student_ids array, csr_matrix of votes, vote-write count)
+    """
+    vote_version, snapshot_version, blob = get_snapshot_state(election_id)
+    if blob is not None and snapshot_version == vote_version:
+        return (*deserialize_snapshot(blob), vote_version)
+
+    student_ids, votes = snapshot_from_arrays(*load_vote_arrays(election_id))
+    data = serialize_snapshot(student_ids, votes)
+    try:
+        if snapshot_version is None:
+            insert_snapshot(election_id, data, vote_version)
+        else:
+            # Loses quietly to a reader that stored a rebuild first
+            update_snapshot(election_id, data, vote_version, snapshot_version)
+        db.session.commit()
+    except IntegrityError:
+        # Another reader inserted the first snapshot; it is checked again on the next read
+        db.session.rollback()
+    return student_ids, votes, vote_version
+
+
+def roster_vote_matrix(student_ids, votes, roster: list[int]) -> sparse.csr_matrix:
+    """
+    Re-index a snapshot's vote matrix onto a roster: rows/columns follow
+    `roster`, and votes involving other students are dropped.
+    """
+    roster = np.asarray(roster, dtype=np.int64)
+    edges = votes.tocoo()
+    rows, valid_rows = _positions(roster, student_ids[edges.row])
+    cols, valid_cols = _positions(roster, student_ids[edges.col])
+    keep = valid_rows & valid_cols
+    return sparse.csr_matrix((edges.data[keep], (rows[keep], cols[keep])), shape=(len(roster), len(roster)))
+
+
+def affinity_delta(previous_votes: sparse.csr_matrix, votes: sparse.csr_matrix):
+    """
+    Change of the affinity matrix between two vote matrices of the same roster,
+    and the students it touches: voters and candidates of every added, removed
+    or rescored vote, plus both sides of a pair whose mutual bonus changed.
+
+    Args:
+        previous_votes (csr_matrix): Votes of an earlier run, indexed like votes
+        votes (csr_matrix): Current votes
+
+    Returns:
+        tuple: (affinity delta csr_matrix, sorted indices of the affected students)
+    """
+    delta = (build_affinity_matrix(votes) - build_affinity_matrix(previous_votes)).tocsr()
+    delta.eliminate_zeros()
+    return delta, np.unique(delta.tocoo().row)
+
+
+def election_matrices(election_id: int, roster: list[int]):
+    """
+    Affinity and raw vote matrices of an election, read from its snapshot.
+    Same result as affinity_service.affinity_for_election without scanning the votes.
+
+    Args:
+        election_id (int): The election ID
+        roster (list[int]): Row/column order of the matrices
+
+    Returns:
+        tuple: (affinity csr_matrix, vote csr_matrix)
+    """
+    student_ids, votes, _ = load_vote_snapshot(election_id)
+    vote_matrix = roster_vote_matrix(student_ids, votes, roster)
+    return build_affinity_matrix(vote_matrix), vote_matrix
+
+
+def votes_map_for_election(election_id: int) -> dict[int, dict[int, float]]:
+    """
+    Mapping voter_id -> {candidate_id -> score} read from the election's snapshot.
+    """
+    student_ids, votes, _ = load_vote_snapshot(election_id)
+    votes_map = {}
+    for row in range(votes.shape[0]):
+        start, end = votes.indptr[row], votes.indptr[row + 1]
+        if start < end:
+            votes_map[int(student_ids[row])] = {
+                int(student_ids[col]): int(score) if float(score).is_integer() else float(score)
+                for col, score in zip(votes.indices[start:end], votes.data[start:end])
+            }
+    return votes_map
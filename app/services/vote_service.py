@@ -5,6 +5,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.
 
 from app.extensions import db
 from app.models import StudentVote
+from app.dao import clear_ballot, bulk_insert_votes, bump_vote_version
+
+# The result-cache and snapshot services need NumPy/SciPy, so the vote writers
+# import them on first use to keep this module (and app startup) light
 
 def cast_vote(election_id: int, voter_id: int, candidate_id: int, score: int) -> StudentVote:
     """
@@ -26,6 +30,9 @@ def cast_vote(election_id: int, voter_id: int, candidate_id: int, score: int) ->
         candidate_id=candidate_id
     ).first()
 
+    from .result_cache_service import invalidate_election
+    from .snapshot_service import apply_vote_delta
+
     if vote:
         vote.score = score  # update existing vote
     else:
@@ -37,7 +44,11 @@ def cast_vote(election_id: int, voter_id: int, candidate_id: int, score: int) ->
         )
         db.session.add(vote)
 
+    # Counts the write and patches the election's snapshot in the same transaction
+    version = bump_vote_version(election_id)
+    apply_vote_delta(election_id, version, voter_id, {candidate_id: score}, replace_ballot=False)
     db.session.commit()
+    invalidate_election(election_id)
     return vote
 
 def get_votes_by_student(election_id: int, voter_id: int) -> list:
@@ -84,6 +95,21 @@ def get_all_votes_for_election(election_id: int) -> list:
     """
     return StudentVote.query.filter_by(election_id=election_id).all()
 
+def get_votes_map(election_id: int) -> dict[int, dict[int, int]]:
+    """
+    All votes of an election as voter_id -> {candidate_id -> score}, read from
+    the election's affinity snapshot rather than from StudentVote rows.
+
+    Args:
+        election_id (int): The election ID
+
+    Returns:
+        dict: Mapping voter_id -> {candidate_id -> score}
+    """
+    from .snapshot_service import votes_map_for_election
+
+    return votes_map_for_election(election_id)
+
 def delete_votes_by_student(election_id: int, voter_id: int) -> int:
     """
     Deletes all votes cast by a student in a given election.
@@ -95,14 +121,42 @@ def delete_votes_by_student(election_id: int, voter_id: int) -> int:
     Returns:
         int: Number of deleted vote records
     """
-    votes = StudentVote.query.filter_by(
-        election_id=election_id,
-        voter_id=voter_id
-    ).all()
-
-    count = len(votes)
-    for vote in votes:
-        db.session.delete(vote)
+    from .result_cache_service import invalidate_election
+    from .snapshot_service import apply_vote_delta
 
+    count = clear_ballot(election_id, voter_id)
+    apply_vote_delta(election_id, bump_vote_version(election_id), voter_id, {})
     db.session.commit()
-    return count
\ No newline at end of file
+    invalidate_election(election_id)
+    return count
+
+def submit_ballot(election_id: int, voter_id: int, scores: dict[int, int]) -> int:
+    """
+    Replace a student's whole ballot atomically: one set-based DELETE of the
+    previous votes and one bulk INSERT of the new ones, committed together with
+    the bump of the election's vote-write count and the patch of its snapshot
+    (one SELECT and one UPDATE of the blob, no scan of student_votes).
+    Candidates scored 0 or less are not stored.
+
+    Args:
+        election_id (int): The election ID
+        voter_id (int): The voter's student ID
+        scores (dict[int, int]): Mapping candidate_id -> score
+
+    Returns:
+        int: Number of votes stored
+    """
+    from .result_cache_service import invalidate_election
+    from .snapshot_service import apply_vote_delta
+
+    positive = {candidate_id: score for candidate_id, score in scores.items() if score > 0}
+    try:
+        clear_ballot(election_id, voter_id)
+        count = bulk_insert_votes(election_id, voter_id, positive)
+        apply_vote_delta(election_id, bump_vote_version(election_id), voter_id, positive)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_election(election_id)
+    return count
@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.services.affinity_service import build_vote_matrix, build_affinity_matrix
+from app.services.clustering_service import get_preferences
+
+# The dict-of-dicts path is O(n²) in Python; skip it above this cohort size
+LEGACY_LIMIT = 2000
+
+
+def synthetic_votes(n_students: int, votes_per_student: int, seed: int = 0):
+    """
+    Generate random ballots: each student gives 1-10 points to a few classmates.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(votes_per_student, n_students - 1)
+    voters = np.repeat(np.arange(n_students), k)
+    offsets = rng.integers(1, n_students, size=n_students * k)
+    candidates = (voters + offsets) % n_students
+    scores = rng.integers(1, 11, size=n_students * k).astype(np.float64)
+    return voters, candidates, scores
+
+
+def time_sparse(student_ids, voters, candidates, scores):
+    start = time.perf_counter()
+    affinity = build_affinity_matrix(build_vote_matrix(voters, candidates, scores, student_ids))
+    return time.perf_counter() - start, affinity
+
+
+def time_legacy(student_ids, voters, candidates, scores):
+    """
+    Replays the previous pipeline: dict-of-dicts preferences then a dense cell-by-cell copy.
+    """
+    start = time.perf_counter()
+    vote_map = {sid: {} for sid in student_ids}
+    for v, c, s in zip(voters.tolist(), candidates.tolist(), scores.tolist()):
+        vote_map[v][c] = s
+    score_map = get_preferences(0, vote_map)
+
+    n = len(student_ids)
+    affinities = np.zeros((n, n))
+    for sid, prefs in score_map.items():
+        for cid, score in prefs.items():
+            affinities[sid][cid] = score
+    affinities = (affinities + affinities.T) / 2
+    return time.perf_counter() - start, affinities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the affinity-matrix builder.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000, 10000, 20000])
+    parser.add_argument('--votes-per-student', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'votes':>9} {'sparse (ms)':>12} {'legacy (ms)':>12} {'speedup':>8}")
+    for n in args.sizes:
+        student_ids = np.arange(n)
+        voters, candidates, scores = synthetic_votes(n, args.votes_per_student)
+        sparse_time, affinity = time_sparse(student_ids, voters, candidates, scores)
+
+        if n <= LEGACY_LIMIT:
+            legacy_time, dense = time_legacy(student_ids, voters, candidates, scores)
+            assert np.allclose(affinity.toarray(), dense)
+            legacy_ms = f"{legacy_time * 1000:12.1f}"
+            speedup = f"{legacy_time / sparse_time:7.0f}x"
+        else:
+            legacy_ms = f"{'skipped':>12}"
+            speedup = f"{'-':>8}"
+
+        print(f"{n:>9} {len(voters):>9} {sparse_time * 1000:12.1f} {legacy_ms} {speedup}")
+
+
+if __name__ == '__main__':
+    main()
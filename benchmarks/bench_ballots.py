@@ -0,0 +1,126 @@
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import date
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Teacher, Student, Election
+from app.services.vote_service import cast_vote, delete_votes_by_student, submit_ballot
+from app.query_counter import count_queries
+
+
+def legacy_submit(election_id, voter_id, scores):
+    """
+    The previous ballot path: delete vote by vote, then one SELECT + commit per candidate.
+    """
+    delete_votes_by_student(election_id, voter_id)
+    for candidate_id, score in scores.items():
+        if score > 0:
+            cast_vote(election_id, voter_id, candidate_id, score)
+
+
+def seed(n_students):
+    teacher = Teacher(unique_id='bench_teacher', email='bench@teacher.com', first_name='Bench',
+                      last_name='Teacher', password_hash='x')
+    db.session.add(teacher)
+    db.session.flush()
+
+    students = [Student(unique_id=f"b{i:06d}", email=f"b{i}@bench.com", first_name=f"S{i}",
+                        password_hash='x') for i in range(n_students)]
+    db.session.add_all(students)
+    db.session.flush()
+    election = Election(title='Ballot bench', start_date=date(2025, 1, 1), end_date=date(2025, 12, 31),
+                        students_per_group=4, teacher_id=teacher.id, students=students)
+    db.session.add(election)
+    db.session.commit()
+    return election.id, [s.id for s in students]
+
+
+def run(app, submit, election_id, ballots, threads):
+    """
+    Submit every ballot from `threads` concurrent workers; return latencies, errors and wall time.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    queue = list(ballots)
+
+    def worker():
+        with app.app_context():
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    voter_id, scores = queue.pop()
+                start = time.perf_counter()
+                try:
+                    submit(election_id, voter_id, scores)
+                    elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                except Exception as e:
+                    db.session.rollback()
+                    with lock:
+                        errors.append(repr(e))
+            db.session.remove()
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return np.array(latencies), errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent ballot submission.")
+    parser.add_argument('--students', type=int, default=300)
+    parser.add_argument('--choices', type=int, default=30, help="classmates scored per ballot")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'ballots.db')}"
+        # Wait for the writer lock instead of failing at once under contention
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        election_id, student_ids = seed(args.students)
+
+    rng = random.Random(0)
+    ballots = []
+    for voter_id in student_ids:
+        others = [s for s in student_ids if s != voter_id]
+        chosen = rng.sample(others, min(args.choices, len(others)))
+        ballots.append((voter_id, {c: rng.randint(1, 3) for c in chosen}))
+
+    with app.app_context():
+        with count_queries() as legacy_q:
+            legacy_submit(election_id, *ballots[0])
+        with count_queries() as bulk_q:
+            submit_ballot(election_id, *ballots[0])
+    print(f"queries per ballot: legacy {legacy_q.count}, submit_ballot {bulk_q.count}")
+
+    print(f"{'path':>14} {'threads':>8} {'ballots/s':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'errors':>7}")
+    for threads in args.threads:
+        for label, submit in (('legacy', legacy_submit), ('submit_ballot', submit_ballot)):
+            latencies, errors, wall = run(app, submit, election_id, ballots, threads)
+            p50, p95 = (np.percentile(latencies, [50, 95]) * 1000) if len(latencies) else (0, 0)
+            print(f"{label:>14} {threads:>8} {len(latencies) / wall:>10.1f} {p50:>9.1f} {p95:>9.1f} {len(errors):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import sys
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Group names fall back to initials; the benchmark never calls the naming API
+os.environ.pop('OPENAI_API_KEY', None)
+
+from app import create_app
+from app.config import Config
+from app.query_counter import count_queries
+from app.scripts.generate_dataset import generate_dataset
+from app.services.clustering_service import (
+    run_engine, create_groups_and_name, calculate_satisfiability, run_full_grouping
+)
+from app.services.snapshot_service import election_matrices, votes_map_for_election
+from app.services.result_cache_service import clear_result_cache
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline_grouping.json')
+
+# Allowed drift before a metric counts as a regression. Timings are noisy and
+# machine dependent, so they get a wide margin; quality metrics must not drop.
+TOLERANCES = {
+    'seconds': 0.5,       # +50 % wall time
+    'peak_mb': 0.25,      # +25 % peak traced memory
+    'queries': 0.0,       # any extra query
+    'score': 0.01,        # -1 % intra-group affinity
+    'avg_satisfaction': 0.01,
+}
+
+
+def measure(fn, *args, **kwargs):
+    """
+    Run fn once and record wall time, peak Python/NumPy memory and SQL query count.
+
+    Returns:
+        tuple: (result, metrics dict)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    with count_queries() as queries:
+        result = fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'seconds': round(seconds, 4), 'peak_mb': round(peak / 2 ** 20, 2), 'queries': queries.count}
+
+
+def run_case(n_students: int, group_size: int, engine: str, restarts: int) -> dict:
+    """
+    Generate an election and time each pipeline stage, then the full pipeline.
+    """
+    dataset = generate_dataset(n_students, group_size=group_size, votes_per_student=min(10, n_students - 1),
+                               clique_size=group_size, popularity_skew=0.5, mutual_share=0.3, seed=n_students)
+    election_id, student_ids = dataset['election_id'], dataset['student_ids']
+    stages = {}
+
+    (affinity, _), stages['affinity'] = measure(election_matrices, election_id, student_ids)
+    report, stages['engine'] = measure(run_engine, affinity, student_ids, group_size, engine, restarts=restarts)
+    _, stages['persist'] = measure(create_groups_and_name, election_id, report['groups'])
+
+    student_to_group = {sid: g for g, members in enumerate(report['groups']) for sid in members}
+    votes_map = votes_map_for_election(election_id)
+    _, stages['satisfaction'] = measure(calculate_satisfiability, student_to_group, votes_map)
+
+    clear_result_cache()
+    full, stages['full'] = measure(run_full_grouping, election_id, student_ids, group_size, engine=engine,
+                                   restarts=restarts)
+    _, score, _, _, avg_satisfaction = full
+
+    return {
+        'stages': stages,
+        'score': round(float(score), 4),
+        'avg_satisfaction': round(float(avg_satisfaction), 4),
+        'votes': dataset['votes']
+    }
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """
+    List every metric that got worse than the baseline beyond its tolerance.
+    """
+    regressions = []
+    for case, current in results.items():
+        expected = baseline.get(case)
+        if expected is None:
+            continue
+        checks = [(f"{stage}.{metric}", current['stages'][stage][metric], expected['stages'][stage][metric], metric)
+                  for stage in current['stages'] if stage in expected['stages']
+                  for metric in ('seconds', 'peak_mb', 'queries')]
+        checks += [(metric, current[metric], expected[metric], metric) for metric in ('score', 'avg_satisfaction')]
+
+        for label, value, reference, metric in checks:
+            tolerance = TOLERANCES[metric]
+            if metric in ('score', 'avg_satisfaction'):
+                worse = value < reference * (1 - tolerance) - 1e-9
+            elif metric == 'seconds':
+                # Ignore sub-10 ms stages, whose timing is mostly noise
+                worse = value > reference * (1 + tolerance) and value - reference > 0.01
+            else:
+                worse = value > reference * (1 + tolerance)
+            if worse:
+                regressions.append(f"{case} {label}: {reference} -> {value}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the grouping pipeline across cohort sizes and engines.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[30, 200, 500],
+                        help="cohort sizes; kmeans takes about a minute at 1000 and the dense engines need "
+                             "~n² x 8 bytes, so 20000 wants ~3 GB per copy")
+    parser.add_argument('--group-sizes', type=int, nargs='+', default=[3, 5])
+    parser.add_argument('--engines', nargs='+', default=['kmeans', 'balanced'])
+    parser.add_argument('--large-sizes', type=int, nargs='*', default=[20000],
+                        help="cohort sizes run only with --large-engines (spectral takes about 3 minutes at 20000)")
+    parser.add_argument('--large-group-size', type=int, default=5)
+    parser.add_argument('--large-engines', nargs='+', default=['spectral'],
+                        help="engines working on the sparse matrix, fit for the large sizes")
+    parser.add_argument('--restarts', type=int, default=3)
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="overwrite the baseline with these results")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'grouping.db')}"
+
+    app = create_app(BenchConfig)
+    results = {}
+    print(f"{'case':>28} {'engine s':>9} {'full s':>8} {'peak MB':>8} {'queries':>8} {'score':>10} {'avg sat':>8}")
+    cases = [(n, group_size, engine) for n in args.sizes for group_size in args.group_sizes for engine in args.engines]
+    cases += [(n, args.large_group_size, engine) for n in args.large_sizes for engine in args.large_engines]
+    with app.app_context():
+        for n, group_size, engine in cases:
+            case = f"{engine}/n={n}/g={group_size}"
+            result = run_case(n, group_size, engine, args.restarts)
+            results[case] = result
+            full = result['stages']['full']
+            print(f"{case:>28} {result['stages']['engine']['seconds']:>9.3f} {full['seconds']:>8.3f} "
+                  f"{full['peak_mb']:>8.1f} {full['queries']:>8} {result['score']:>10.1f} "
+                  f"{result['avg_satisfaction']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from app.extensions import db
+import app.models  # noqa: F401  registers every table on db.metadata
+from app.scripts.migrate_indexes import INDEXED_MODELS, migrate_indexes
+
+# The hot-path lookups, with the DAO/service each one stands for
+QUERIES = {
+    'ballot (get_votes_by_student)':
+        "SELECT id, candidate_id, score FROM student_votes WHERE election_id = :e AND voter_id = :s",
+    'received (votes_for_candidate)':
+        "SELECT voter_id, score FROM student_votes WHERE election_id = :e AND candidate_id = :s",
+    'election (load_vote_arrays)':
+        "SELECT voter_id, candidate_id, score FROM student_votes WHERE election_id = :e ORDER BY id",
+    'groups (get_groups_by_election)':
+        "SELECT id, group_name FROM groups WHERE election_id = :e",
+}
+
+
+def build_database(path, elections, students, votes_per_student, groups_per_election):
+    """
+    Create the schema without the new indexes and fill it with synthetic votes.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for model in INDEXED_MODELS:
+            for index in model.__table__.indexes:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    rng = np.random.default_rng(0)
+    raw = engine.raw_connection()
+    cursor = raw.cursor()
+    for election in range(1, elections + 1):
+        rows = []
+        for voter in range(1, students + 1):
+            candidates = rng.choice(students, size=votes_per_student, replace=False) + 1
+            scores = rng.integers(1, 6, size=votes_per_student)
+            rows.extend((election, voter, int(c), int(s)) for c, s in zip(candidates, scores))
+        cursor.executemany(
+            "INSERT INTO student_votes (election_id, voter_id, candidate_id, score) VALUES (?, ?, ?, ?)", rows
+        )
+        cursor.executemany(
+            "INSERT INTO groups (election_id, group_name) VALUES (?, ?)",
+            [(election, f"G{g}") for g in range(groups_per_election)]
+        )
+    raw.commit()
+    raw.close()
+    return engine
+
+
+def time_queries(engine, elections, students, repeats):
+    rng = np.random.default_rng(1)
+    timings = {}
+    with engine.connect() as connection:
+        for label, sql in QUERIES.items():
+            statement = text(sql)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                params = {'e': int(rng.integers(1, elections + 1)), 's': int(rng.integers(1, students + 1))}
+                connection.execute(statement, params).fetchall()
+            timings[label] = (time.perf_counter() - start) / repeats * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vote/group lookups before and after the index migration.")
+    parser.add_argument('--elections', type=int, default=200)
+    parser.add_argument('--students', type=int, default=250)
+    parser.add_argument('--votes-per-student', type=int, default=20)
+    parser.add_argument('--groups', type=int, default=60, help="groups per election")
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'indexes.db')
+    start = time.perf_counter()
+    engine = build_database(path, args.elections, args.students, args.votes_per_student, args.groups)
+    total = args.elections * args.students * args.votes_per_student
+    print(f"built {total:,} votes in {time.perf_counter() - start:.1f}s")
+
+    before = time_queries(engine, args.elections, args.students, args.repeats)
+    start = time.perf_counter()
+    report = migrate_indexes(engine)
+    print(f"migration: {len(report['indexes_created'])} indexes in {time.perf_counter() - start:.1f}s, "
+          f"{report['duplicates_removed']} duplicates removed")
+    after = time_queries(engine, args.elections, args.students, args.repeats)
+
+    print(f"{'query':>32} {'before (ms)':>12} {'after (ms)':>11} {'speedup':>8}")
+    for label in QUERIES:
+        print(f"{label:>32} {before[label]:>12.2f} {after[label]:>11.3f} {before[label] / after[label]:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.services.affinity_service import build_vote_matrix, build_affinity_matrix
+from app.services.balanced_service import group_capacities
+from app.services.refinement_service import refine_by_swaps
+from benchmarks.bench_affinity import synthetic_votes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refinement gain per time budget, to tune GROUPING_REFINE_BUDGET.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 1000, 5000])
+    parser.add_argument('--group-size', type=int, default=4)
+    parser.add_argument('--budgets', type=float, nargs='+', default=[0.1, 0.5, 2.0])
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'budget (s)':>10} {'before':>10} {'after':>10} {'moves':>7} {'gain/s':>10}")
+    for n in args.sizes:
+        voters, candidates, scores = synthetic_votes(n, 10)
+        affinity = build_affinity_matrix(build_vote_matrix(voters, candidates, scores, np.arange(n)))
+        # Start from an arbitrary valid partition with the engine's group sizes
+        capacities = group_capacities(n, args.group_size)
+        start_labels = np.random.default_rng(0).permutation(np.repeat(np.arange(len(capacities)), capacities))
+
+        for budget in args.budgets:
+            _, stats = refine_by_swaps(affinity, start_labels, time_budget=budget)
+            print(f"{n:>9} {budget:>10.1f} {stats['score_before']:>10.1f} {stats['score_after']:>10.1f} "
+                  f"{stats['moves']:>7} {stats['improvement_per_second']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
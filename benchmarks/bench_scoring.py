@@ -0,0 +1,47 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from app.services.affinity_service import build_vote_matrix, build_affinity_matrix
+from app.services.scoring_service import batch_total_affinity, total_affinity, student_satisfaction
+from benchmarks.bench_affinity import synthetic_votes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark partition scoring throughput.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000, 20000])
+    parser.add_argument('--group-size', type=int, default=4)
+    parser.add_argument('--partitions', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'students':>9} {'single (ms)':>12} {'satisfaction (ms)':>18} {'batch partitions/s':>19}")
+    for n in args.sizes:
+        voters, candidates, scores = synthetic_votes(n, 10)
+        votes = build_vote_matrix(voters, candidates, scores, np.arange(n))
+        affinity = build_affinity_matrix(votes)
+        base = np.arange(n) // args.group_size
+        partitions = np.array([rng.permutation(base) for _ in range(args.partitions)])
+
+        start = time.perf_counter()
+        total_affinity(affinity, partitions[0])
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        student_satisfaction(votes, partitions[0])
+        satisfaction = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_total_affinity(affinity, partitions)
+        batch = time.perf_counter() - start
+
+        print(f"{n:>9} {single * 1000:12.2f} {satisfaction * 1000:18.2f} {args.partitions / batch:19.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import argparse
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Packages that should only be imported once grouping or naming is used
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'openai')
+
+# What a worker boot does: build the app with every blueprint registered
+STARTUP_STATEMENT = "from app import create_app; create_app()"
+
+
+def import_profile(statement: str = STARTUP_STATEMENT, env: dict = None) -> dict:
+    """
+    Run a statement in a fresh interpreter under `python -X importtime` and
+    collect the cumulative import time of every module.
+
+    Args:
+        statement (str): Python code to run
+        env (dict): Extra environment variables
+
+    Returns:
+        tuple: (mapping module name -> cumulative import time in microseconds,
+                total import time of the statement in microseconds)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, env={**os.environ, **(env or {})}, capture_output=True, text=True, check=True
+    )
+    profile, total = {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+        # Nested imports are indented; the unindented ones add up to the total
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return profile, total
+
+
+def top_level(profile: dict) -> dict:
+    """
+    Cumulative time per top-level package (e.g. all of sklearn.* under sklearn).
+    """
+    totals = {}
+    for name, cumulative in profile.items():
+        package = name.split('.')[0]
+        totals[package] = max(totals.get(package, 0), cumulative)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app startup import time (python -X importtime).")
+    parser.add_argument('--statement', default=STARTUP_STATEMENT)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    scenarios = {
+        'startup': args.statement,
+        'first grouping': args.statement + "; import app.services.clustering_service",
+    }
+    for label, statement in scenarios.items():
+        profile, total = import_profile(statement, env={'AUTO_CREATE_SCHEMA': 'false'})
+        totals = top_level(profile)
+        loaded = [m for m in HEAVY_MODULES if m in totals]
+        print(f"== {label}: {total / 1000:.0f} ms of imports, heavy modules: {', '.join(loaded) or 'none'}")
+        for package, cumulative in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{package:>24} {cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
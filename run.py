@@ -7,7 +7,8 @@ from dotenv import load_dotenv
 from app.services.admin_service import create_admin
 from app.services.teacher_service import create_teacher
 from app.services.student_service import create_student
-from flask import jsonify
+from flask import jsonify, request, Response, stream_with_context
+from app.services.export_service import iter_ndjson, iter_csv, resolve_tables
 load_dotenv()
 
 from flask import redirect
@@ -62,33 +63,30 @@ def main():
 
     @app.route('/dump_all_data')
     def dump_all_data():
+        """
+        Stream a dump of the database without loading it in memory.
+        Query parameters: format=ndjson|csv, tables=students,elections,... (csv: one table),
+        election_id=<id> to restrict the dump to one election.
+        """
+        fmt = request.args.get('format', 'ndjson')
+        election_id = request.args.get('election_id', type=int)
         try:
-            admins = [serialize_model(a) for a in Admin.query.all()]
-            teachers = [serialize_model(t) for t in Teacher.query.all()]
-            students = [serialize_model(s) for s in Student.query.all()]
-            elections = [serialize_model(e) for e in Election.query.all()]
-            votes = [serialize_model(v) for v in StudentVote.query.all()]
-            groups = [serialize_model(g) for g in Group.query.all()]
-            group_members = [serialize_model(m) for m in GroupMember.query.all()]
+            tables = resolve_tables([t for t in request.args.get('tables', '').split(',') if t])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-            return jsonify({
-                "admins": admins,
-                "teachers": teachers,
-                "students": students,
-                "elections": elections,
-                "votes": votes,
-                "groups": groups,
-                "group_members": group_members
-            })
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+        if fmt == 'ndjson':
+            body, mimetype = iter_ndjson(tables, election_id), 'application/x-ndjson'
+        elif fmt == 'csv' and len(tables) == 1:
+            body, mimetype = iter_csv(tables[0], election_id), 'text/csv'
+        elif fmt == 'csv':
+            return jsonify({"error": "CSV export needs exactly one table (?tables=<name>)."}), 400
+        else:
+            return jsonify({"error": f"Unknown format '{fmt}'."}), 400
+        return Response(stream_with_context(body), mimetype=mimetype)
 
     return app
 
-def serialize_model(model):
-    """Serialize SQLAlchemy model instance into dict"""
-    return {c.name: getattr(model, c.name) for c in model.__table__.columns}
-
 if __name__ == '__main__':
     app = main()
     debug_mode = os.getenv('FLASK_ENV') == 'development'
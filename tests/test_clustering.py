@@ -98,7 +98,521 @@ def test_clustering_groups(app, seed_votes):
     group_labels = set(student_to_group.values())
     expected_groups = len(student_ids) // group_size
     assert len(group_labels) >= expected_groups
-    assert score > 0
+
+    # The score is the affinity inside the returned groups, so random ballots can
+    # score 0 (see test_kmeans_zero_score_on_look_alike_ballots)
+    from app.services.snapshot_service import election_matrices
+    affinity, _ = election_matrices(election_id, student_ids)
+    affinity = affinity.toarray()
+    expected = sum(affinity[i][j] for i, a in enumerate(student_ids) for j, b in enumerate(student_ids)
+                   if i < j and student_to_group[a] == student_to_group[b])
+    assert score == pytest.approx(expected)
+    assert score >= 0
 
     assert total_satisfaction >= 0
     assert 0 <= avg_satisfaction <= total_satisfaction
+
+
+def test_affinity_matrix_matches_preferences():
+    from app.services.affinity_service import build_vote_matrix, build_affinity_matrix
+    from app.services.clustering_service import get_preferences
+
+    student_ids = [10, 11, 12, 13]
+    votes = [(10, 11, 3), (11, 10, 2), (10, 12, 1), (13, 10, 5), (13, 99, 4), (12, 13, 0)]
+
+    vote_map = {sid: {} for sid in student_ids}
+    for voter, candidate, score in votes:
+        if voter in vote_map and candidate in student_ids:
+            vote_map[voter][candidate] = score
+    score_map = get_preferences(0, vote_map)
+
+    voters, candidates, scores = zip(*votes)
+    affinity = build_affinity_matrix(build_vote_matrix(voters, candidates, scores, student_ids)).toarray()
+
+    for i, sid in enumerate(student_ids):
+        for j, cid in enumerate(student_ids):
+            expected = (score_map[sid][cid] + score_map[cid][sid]) / 2
+            assert affinity[i][j] == expected
+
+    # Mutual 10 <-> 11 votes are boosted by 1.5 before symmetrization
+    assert affinity[0][1] == (3 * 1.5 + 2 * 1.5) / 2
+
+
+def test_vote_matrix_keeps_last_duplicate_vote():
+    from app.services.affinity_service import build_vote_matrix
+
+    matrix = build_vote_matrix([1, 1], [2, 2], [4, 7], [1, 2])
+    assert matrix[0, 1] == 7
+    assert matrix.nnz == 1
+
+
+def test_balanced_engine_respects_group_size(app, seed_votes):
+    from app.services import compare_engines
+
+    election_id, student_ids = seed_votes
+    reports = compare_engines(election_id, student_ids, 4, engines=['kmeans', 'balanced'])
+
+    assert [r['engine'] for r in reports] == ['kmeans', 'balanced']
+    balanced = reports[1]
+    assert sorted(len(g) for g in balanced['groups']) == [3, 3]
+    assert sorted(sid for g in balanced['groups'] for sid in g) == sorted(student_ids)
+    for report in reports:
+        assert report['score'] >= 0
+        assert report['wall_time'] >= 0
+
+
+def test_capacitated_assign_fills_every_group():
+    import numpy as np
+    from app.services import balanced_service
+
+    rng = np.random.default_rng(0)
+    cost = rng.random((25, 4))
+    capacities = balanced_service.group_capacities(25, 7)
+    assert capacities == [7, 6, 6, 6]
+
+    exact = balanced_service.capacitated_assign(cost, capacities)
+    assert np.bincount(exact, minlength=4).tolist() == capacities
+
+    limit = balanced_service.EXACT_ASSIGNMENT_LIMIT
+    balanced_service.EXACT_ASSIGNMENT_LIMIT = 0
+    try:
+        greedy = balanced_service.capacitated_assign(cost, capacities)
+    finally:
+        balanced_service.EXACT_ASSIGNMENT_LIMIT = limit
+    assert np.bincount(greedy, minlength=4).tolist() == capacities
+    # The exact assignment can never cost more than the greedy one
+    assert cost[np.arange(25), exact].sum() <= cost[np.arange(25), greedy].sum() + 1e-9
+
+
+def test_parallel_restarts_match_serial():
+    import numpy as np
+    from app.services.clustering_service import kmeans_groups, balanced_groups
+
+    rng = np.random.default_rng(7)
+    votes = rng.integers(0, 4, size=(24, 24)).astype(float)
+    affinities = (votes + votes.T) / 2
+
+    for engine in (kmeans_groups, balanced_groups):
+        serial = engine(affinities, 4, restarts=4, workers=1)
+        parallel = engine(affinities, 4, restarts=4, workers=2)
+        assert serial == parallel
+
+    with pytest.raises(ValueError, match="GROUPING_RESTARTS"):
+        kmeans_groups(affinities, 4, restarts=0)
+
+
+def test_scoring_matches_pairwise_loops():
+    import numpy as np
+    from scipy import sparse
+    from app.services.scoring_service import (
+        group_scores, total_affinity, student_satisfaction, batch_total_affinity
+    )
+    from app.services.clustering_service import calculate_satisfiability
+
+    rng = np.random.default_rng(3)
+    votes = rng.integers(0, 5, size=(12, 12)) * (rng.random((12, 12)) < 0.4)
+    affinity = (votes + votes.T) / 2
+    labels = np.array([0, 1, 2, 0, 1, 2, 0, 1, 2, 0, 1, 2])
+
+    expected_groups = np.zeros(3)
+    for i in range(12):
+        for j in range(i + 1, 12):
+            if labels[i] == labels[j]:
+                expected_groups[labels[i]] += affinity[i][j]
+
+    for matrix in (affinity, sparse.csr_matrix(affinity)):
+        assert np.allclose(group_scores(matrix, labels), expected_groups)
+        assert np.isclose(total_affinity(matrix, labels), expected_groups.sum())
+
+    candidates = np.array([labels, rng.permutation(labels), np.zeros(12, dtype=int)])
+    expected_batch = [total_affinity(affinity, row) for row in candidates]
+    assert np.allclose(batch_total_affinity(sparse.csr_matrix(affinity), candidates), expected_batch)
+
+    satisfaction = student_satisfaction(sparse.csr_matrix(votes), labels)
+    for i in range(12):
+        assert satisfaction[i] == sum(votes[i][j] for j in range(12) if j != i and labels[j] == labels[i])
+
+    student_to_group = {100 + i: 500 + int(lbl) for i, lbl in enumerate(labels)}
+    vote_map = {100 + i: {100 + j: int(votes[i][j]) for j in range(12) if votes[i][j]} for i in range(12)}
+    total, avg = calculate_satisfiability(student_to_group, vote_map)
+    assert total == satisfaction.sum()
+    assert avg == total / 12
+
+
+def test_swap_refinement_keeps_sizes_and_improves():
+    import numpy as np
+    from scipy import sparse
+    from app.services.refinement_service import refine_by_swaps
+    from app.services.scoring_service import total_affinity
+
+    rng = np.random.default_rng(11)
+    votes = rng.integers(1, 6, size=(30, 30)) * (rng.random((30, 30)) < 0.15)
+    affinity = sparse.csr_matrix((votes + votes.T) / 2)
+    labels = np.arange(30) % 8
+
+    refined, stats = refine_by_swaps(affinity, labels, time_budget=5)
+
+    assert np.array_equal(np.bincount(refined), np.bincount(labels))
+    assert stats['score_before'] == total_affinity(affinity, labels)
+    assert np.isclose(stats['score_after'], total_affinity(affinity, refined))
+    assert stats['score_after'] >= stats['score_before']
+    assert stats['improvement_per_second'] >= 0
+
+    # A budget of one pass is honoured
+    _, one_pass = refine_by_swaps(affinity, labels, max_passes=1)
+    assert one_pass['passes'] == 1
+
+    # Limited to movable students, a swap that only helps the partner is still made:
+    # student 0 lost its tie to group 0, while student 3 is tied to its other members
+    local = np.zeros((6, 6))
+    for i, j, weight in ((3, 1, 2.0), (3, 2, 2.0), (3, 4, 1.0)):
+        local[i, j] = local[j, i] = weight
+    refined, stats = refine_by_swaps(local, [0, 0, 0, 1, 1, 1], movable=[0, 1], stability=1.0)
+    assert refined.tolist() == [1, 0, 0, 0, 1, 1]
+    assert stats['moved_students'] == 2 and stats['improvement'] == 3.0
+
+
+def test_create_groups_and_name_bulk_replaces_groups(app, seed_votes):
+    from app.models import Group, GroupMember
+    from app.services import create_groups_and_name
+
+    election_id, student_ids = seed_votes
+    first_ids = create_groups_and_name(election_id, [student_ids[:3], [], student_ids[3:]])
+    assert len(first_ids) == 2
+
+    second_ids = create_groups_and_name(election_id, [student_ids[:2], student_ids[2:4], student_ids[4:]])
+    assert len(second_ids) == 3
+
+    groups = Group.query.filter_by(election_id=election_id).all()
+    assert sorted(g.id for g in groups) == sorted(second_ids)
+    members = GroupMember.query.filter(GroupMember.group_id.in_(second_ids)).all()
+    assert {m.student_id: m.group_id for m in members} == {
+        sid: gid for gid, members in zip(second_ids, [student_ids[:2], student_ids[2:4], student_ids[4:]])
+        for sid in members
+    }
+    assert GroupMember.query.count() == len(student_ids)
+
+
+def test_run_full_grouping_reuses_cached_result(app, seed_votes):
+    from app.services import result_cache_stats, clear_result_cache
+    from app.services.vote_service import cast_vote
+
+    election_id, student_ids = seed_votes
+    clear_result_cache()
+
+    first = run_full_grouping(election_id, student_ids, 2)
+    second = run_full_grouping(election_id, student_ids, 2)
+    assert result_cache_stats()['hits'] == 1
+    assert second[1] == first[1] and second[3:] == first[3:]
+    assert sorted(map(sorted, _groups(second[0]))) == sorted(map(sorted, _groups(first[0])))
+
+    # Roster, parameter and vote changes all miss
+    run_full_grouping(election_id, student_ids[:4], 2)
+    run_full_grouping(election_id, student_ids, 3)
+    cast_vote(election_id, student_ids[0], student_ids[5], 9)
+    run_full_grouping(election_id, student_ids, 2)
+
+    stats = result_cache_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 4
+    assert stats['invalidations'] == 3
+    assert stats['hit_rate'] == pytest.approx(0.2)
+
+
+def _groups(student_to_group):
+    groups = {}
+    for student_id, group_id in student_to_group.items():
+        groups.setdefault(group_id, []).append(student_id)
+    return list(groups.values())
+
+
+def test_run_full_grouping_reports_stage_timings(app, seed_votes, caplog):
+    import json
+    import logging
+    from app.services import add_stage_listener, remove_stage_listener, clear_result_cache
+
+    election_id, student_ids = seed_votes
+    clear_result_cache()
+    seen = []
+    add_stage_listener(seen.append)
+    try:
+        with caplog.at_level(logging.INFO, logger='app.grouping'):
+            result = run_full_grouping(election_id, student_ids, 2, profile=True, trace_memory=True)
+    finally:
+        remove_stage_listener(seen.append)
+
+    # Still unpacks like the plain 5-tuple
+    student_to_group, score, _, _, _ = result
+    assert len(student_to_group) == len(student_ids) and score == result[1]
+
+    report = result.report
+    stages = {record['stage']: record for record in report['stages']}
+    assert set(stages) == {'loading_votes', 'clustering.restarts', 'clustering.rebalance', 'clustering',
+                           'naming', 'persisting', 'scoring'}
+    assert stages['clustering']['cache_hit'] is False
+    assert stages['clustering']['seconds'] >= stages['clustering.restarts']['seconds']
+    assert stages['clustering']['peak_mb'] >= stages['clustering.restarts']['peak_mb']
+    assert stages['persisting']['queries'] > 0
+    assert report['total_seconds'] >= sum(stages[s]['seconds'] for s in ('loading_votes', 'clustering', 'scoring'))
+    assert report['profile'] and {'function', 'calls', 'cumulative_seconds'} <= set(report['profile'][0])
+    assert [record['stage'] for record in seen] == [record['stage'] for record in report['stages']]
+
+    logged = json.loads(caplog.records[-1].getMessage())
+    assert logged['event'] == 'grouping_instrumentation' and logged['election_id'] == election_id
+
+    # Without capture options only timers are recorded; a cached run skips the engine stages
+    cached = run_full_grouping(election_id, student_ids, 2).report
+    assert 'profile' not in cached and 'peak_mb' not in cached
+    assert [record['stage'] for record in cached['stages']][:2] == ['loading_votes', 'clustering']
+    assert cached['stages'][1]['cache_hit'] is True
+
+
+def _planted_cliques(seed: int = 5):
+    """
+    8 planted cliques of 5 plus a few weak cross-clique votes and 5 students without votes.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    rng = np.random.default_rng(seed)
+    n = 45
+    cliques = rng.permutation(40).reshape(8, 5)
+    rows, cols, weights = [], [], []
+    for clique in cliques:
+        for i in clique:
+            for j in clique:
+                if i != j:
+                    rows.append(i)
+                    cols.append(j)
+                    weights.append(3.0)
+    for i, j in rng.integers(0, 40, size=(10, 2)):
+        if i != j:
+            rows += [i, j]
+            cols += [j, i]
+            weights += [0.5, 0.5]
+    return sparse.csr_matrix((weights, (rows, cols)), shape=(n, n)), cliques
+
+
+def test_spectral_engine_recovers_cliques_on_sparse_graph():
+    import numpy as np
+    from app.services.clustering_service import run_engine
+    from app.services.balanced_service import group_capacities
+    from app.services.graph_service import recursive_bisection, vote_graph
+
+    affinity, cliques = _planted_cliques()
+    n = affinity.shape[0]
+    capacities = group_capacities(n, 5)
+    plain = recursive_bisection(vote_graph(affinity), capacities, refine_block=0)
+    assert np.bincount(plain).tolist() == capacities
+
+    report = run_engine(affinity, list(range(100, 100 + n)), 5, 'spectral')
+    assert sorted(len(g) for g in report['groups']) == sorted(capacities)
+    assert sorted(sid for g in report['groups'] for sid in g) == list(range(100, 100 + n))
+
+    # With the swap refinement every planted clique ends up whole
+    found = {frozenset(g) for g in report['groups']}
+    assert all(frozenset(100 + c for c in clique.tolist()) in found for clique in cliques)
+
+
+def test_louvain_engine_keeps_communities_together(app, seed_votes):
+    import numpy as np
+    from app.services.clustering_service import run_engine
+    from app.services.community_service import louvain_communities, pack_pieces
+    from app.services.graph_service import vote_graph
+
+    affinity, cliques = _planted_cliques(9)
+    adjacency = vote_graph(affinity)
+    communities = louvain_communities(adjacency)
+    for clique in cliques:
+        assert len(set(communities[clique])) == 1
+    assert len(set(communities[cliques[:, 0]])) == 8
+
+    report = run_engine(affinity, list(range(45)), 5, 'louvain', restarts=2)
+    assert {frozenset(clique.tolist()) for clique in cliques} <= {frozenset(g) for g in report['groups']}
+
+    # A piece that fits nowhere is cut, keeping exact group sizes
+    labels = pack_pieces(adjacency[:9, :9], [np.arange(0, 4), np.arange(4, 8), np.arange(8, 9)], [3, 3, 3])
+    assert np.bincount(labels).tolist() == [3, 3, 3]
+
+    # Same entry point as the KMeans engine
+    election_id, student_ids = seed_votes
+    student_to_group, score, _, _, _ = run_full_grouping(election_id, student_ids, 2, engine='louvain')
+    assert sorted(student_to_group) == sorted(student_ids)
+    assert sorted(np.unique(list(student_to_group.values()), return_counts=True)[1]) == [2, 2, 2]
+
+
+def test_exact_engine_proves_optimum_and_reports_gap_on_timeout(monkeypatch):
+    import time
+    import itertools
+    import numpy as np
+    from scipy import sparse
+    from app.services import clustering_service
+    from app.services.clustering_service import run_engine
+    from app.services.exact_service import exact_partition
+    from app.services.scoring_service import total_affinity
+
+    rng = np.random.default_rng(2)
+    votes = rng.integers(0, 4, size=(9, 9)) * (rng.random((9, 9)) < 0.5)
+    affinity = (votes + votes.T) / 2.0
+    np.fill_diagonal(affinity, 0)
+
+    # Brute force over every split of 9 students into three groups of 3
+    best = 0.0
+    for first in itertools.combinations(range(1, 9), 2):
+        rest = [s for s in range(1, 9) if s not in first]
+        for second in itertools.combinations(rest[1:], 2):
+            labels = np.zeros(9, dtype=int)
+            labels[list((rest[0],) + second)] = 1
+            labels[[s for s in rest if s != rest[0] and s not in second]] = 2
+            best = max(best, total_affinity(affinity, labels))
+
+    report = run_engine(sparse.csr_matrix(affinity), list(range(9)), 3, 'exact', restarts=1)
+    assert report['solver']['optimal'] and report['solver']['gap'] == 0.0
+    assert report['score'] == pytest.approx(best)
+    assert sorted(len(g) for g in report['groups']) == [3, 3, 3]
+
+    # A search stopped at once keeps the warm start and bounds the distance to the optimum
+    big_votes = rng.integers(0, 4, size=(30, 30)) * (rng.random((30, 30)) < 0.3)
+    big = (big_votes + big_votes.T) / 2.0
+    warm = np.arange(30) % 6
+    labels, stats = exact_partition(big, [5] * 6, time_limit=0.0, warm_start=warm)
+    assert not stats['optimal']
+    assert stats['score'] >= total_affinity(big, warm)
+    assert stats['upper_bound'] >= stats['score'] and 0 < stats['gap'] <= 1
+    assert np.bincount(labels).tolist() == [5] * 6
+
+    # The engine anneals a search it could not finish, staying within its time limit
+    report = run_engine(sparse.csr_matrix(big), list(range(30)), 5, 'exact', restarts=1, time_limit=1.0)
+    assert not report['solver']['optimal'] and report['wall_time'] < 2.0
+    assert report['score'] == pytest.approx(report['solver']['score'])
+    assert report['score'] >= total_affinity(big, warm)
+    assert 0 < report['solver']['gap'] <= 1
+
+    # A slow warm start shortens the search and polish instead of pushing past the limit
+    balanced_groups = clustering_service.balanced_groups
+
+    def slow_balanced(*args, **kwargs):
+        time.sleep(0.8)
+        return balanced_groups(*args, **kwargs)
+
+    monkeypatch.setattr(clustering_service, 'balanced_groups', slow_balanced)
+    report = run_engine(sparse.csr_matrix(big), list(range(30)), 5, 'exact', restarts=1, time_limit=1.0)
+    assert report['wall_time'] < 1.2
+    assert sorted(len(g) for g in report['groups']) == [5] * 6
+
+
+def test_annealing_engine_keeps_sizes_and_respects_budget():
+    import time
+    import numpy as np
+    from app.services.clustering_service import run_engine
+    from app.services.annealing_service import anneal
+    from app.services.scoring_service import total_affinity
+
+    affinity, _ = _planted_cliques()
+    start = np.random.default_rng(0).permutation(np.arange(45) % 9)
+    began = time.perf_counter()
+    labels, stats = anneal(affinity, start, budget_ms=200)
+    assert time.perf_counter() - began < 1.0
+    assert np.bincount(labels).tolist() == [5] * 9
+    assert stats['score_after'] == pytest.approx(total_affinity(affinity, labels))
+    assert stats['score_after'] >= stats['score_before'] == pytest.approx(total_affinity(affinity, start))
+
+    report = run_engine(affinity, list(range(45)), 5, 'annealing', budget_ms=300)
+    assert sorted(len(g) for g in report['groups']) == [5] * 9
+    assert report['solver']['score_after'] > report['solver']['score_before']
+
+
+def test_incremental_grouping_moves_only_affected_students(app, seed_votes):
+    from app.models import Group, GroupMember
+    from app.services import clear_result_cache
+    from app.services.vote_service import cast_vote
+
+    election_id, student_ids = seed_votes
+    clear_result_cache()
+    first, _, _, _, _ = run_full_grouping(election_id, student_ids, 2)
+    group_ids = {group.id for group in Group.query.all()}
+
+    # Unchanged votes: nothing moves and the groups are kept as they are
+    unchanged = run_full_grouping(election_id, student_ids, 2, incremental=True)
+    assert unchanged[0] == first
+    assert unchanged.report['stages'][2]['incremental'] == {'affected': 0, 'moved': 0}
+
+    # A strong mutual vote between two separated students pulls them together in place
+    a, b = next((a, b) for a in student_ids for b in student_ids if first[a] != first[b])
+    cast_vote(election_id, a, b, 9)
+    cast_vote(election_id, b, a, 9)
+    result = run_full_grouping(election_id, student_ids, 2, incremental=True)
+    after = result[0]
+    assert after[a] == after[b]
+    assert {group.id for group in Group.query.all()} == group_ids
+    moved = {sid for sid in student_ids if after[sid] != first[sid]}
+    assert moved and len(moved) == result.report['stages'][2]['incremental']['moved'] == 2
+    assert {m.student_id: m.group_id for m in GroupMember.query.all()} == after
+
+    # Groups larger than the requested size cannot be kept: a full run replaces them
+    run_full_grouping(election_id, student_ids, 3)
+    regrouped = run_full_grouping(election_id, student_ids, 2, incremental=True)
+    assert len(set(regrouped[0].values())) == 3
+    assert 'incremental' not in {key for record in regrouped.report['stages'] for key in record}
+
+
+
+def test_profiled_runs_capture_one_at_a_time():
+    import threading
+    import tracemalloc
+    from app.services.instrumentation_service import GroupingInstrumentation
+
+    first_started, release_first, second_started = threading.Event(), threading.Event(), threading.Event()
+    tracing_at_first_end = []
+
+    def first():
+        with GroupingInstrumentation(trace_memory=True).run():
+            first_started.set()
+            release_first.wait(5)
+            tracing_at_first_end.append(tracemalloc.is_tracing())
+
+    def second():
+        with GroupingInstrumentation(trace_memory=True, profile=True).run():
+            second_started.set()
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    threads[0].start()
+    assert first_started.wait(5)
+    threads[1].start()
+    # The second capture waits instead of sharing (and later stopping) the first one's tracing
+    assert not second_started.wait(0.3)
+    release_first.set()
+    for thread in threads:
+        thread.join(5)
+    assert second_started.is_set() and tracing_at_first_end == [True]
+    assert not tracemalloc.is_tracing()
+
+def test_kmeans_zero_score_on_look_alike_ballots():
+    import numpy as np
+    from app.services.affinity_service import build_vote_matrix, build_affinity_matrix
+    from app.services.clustering_service import run_engine
+
+    # Students 1 and 3, 2 and 6, 4 and 5 vote alike but not for each other: KMeans
+    # on the affinity rows pairs them for every seed, and the groups hold no affinity
+    ballots = np.array([
+        [0, 0, 0, 3, 1, 2],
+        [0, 0, 3, 1, 2, 0],
+        [0, 0, 0, 3, 1, 2],
+        [1, 0, 3, 0, 0, 2],
+        [0, 2, 3, 0, 0, 1],
+        [2, 0, 0, 1, 3, 0],
+    ])
+    student_ids = [1, 2, 3, 4, 5, 6]
+    voters, candidates = np.nonzero(ballots)
+    affinity = build_affinity_matrix(build_vote_matrix(
+        [student_ids[i] for i in voters], [student_ids[j] for j in candidates], ballots[voters, candidates], student_ids
+    ))
+
+    kmeans = run_engine(affinity, student_ids, 2, 'kmeans')
+    assert sorted(map(sorted, kmeans['groups'])) == [[1, 3], [2, 6], [4, 5]]
+    assert kmeans['score'] == 0
+
+    # The engines that optimise the groups' own affinity find the best pairing,
+    # and refinement lifts the KMeans groups off zero
+    assert run_engine(affinity, student_ids, 2, 'balanced')['score'] == 10.5
+    assert run_engine(affinity, student_ids, 2, 'exact')['score'] == 10.5
+    assert run_engine(affinity, student_ids, 2, 'kmeans', refine=True)['score'] > 0
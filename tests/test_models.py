@@ -136,3 +136,32 @@ def test_student_vote_model(session):
     fetched = StudentVote.query.filter_by(voter_id=s1.id).first()
     assert fetched is not None
     assert fetched.score == 3
+
+def test_election_delete_removes_vote_version(session):
+    from app.models import VoteVersion, AffinitySnapshot
+
+    t = Teacher(unique_id="teach002", email="t2@e.com")
+    t.set_password("t")
+    session.add(t)
+    session.commit()
+
+    election = Election(
+        title="Cascade Test",
+        start_date=datetime.date(2025, 1, 1),
+        end_date=datetime.date(2025, 1, 10),
+        teacher_id=t.id,
+        students_per_group=2
+    )
+    session.add(election)
+    session.commit()
+    session.add_all([
+        VoteVersion(election_id=election.id, version=3),
+        AffinitySnapshot(election_id=election.id, version=3, data=b"blob")
+    ])
+    session.commit()
+    assert election.vote_version.version == 3 and election.affinity_snapshot.version == 3
+
+    session.delete(election)
+    session.commit()
+    assert VoteVersion.query.count() == 0
+    assert AffinitySnapshot.query.count() == 0
@@ -94,3 +94,166 @@ def test_student_dashboard_access(client, seed_users):
 def test_invalid_login(client):
     res = login(client, email="fake@user.com", password="wrong", role="admin")
     assert b"Invalid credentials" in res.data
+
+@pytest.fixture
+def seed_election(seed_users):
+    """
+    Create an election owned by the seeded teacher with six voting students.
+    """
+    import datetime
+    from app.models import Election, StudentVote
+
+    teacher = Teacher.query.filter_by(email=seed_users["teacher"]["email"]).first()
+    students = []
+    for i in range(6):
+        s = Student(unique_id=f"grouped{i:03d}", email=f"grouped{i}@test.com", first_name=f"Name{i}")
+        s.set_password("pass")
+        students.append(s)
+    db.session.add_all(students)
+    db.session.commit()
+
+    election = Election(
+        title="Job Election",
+        start_date=datetime.date(2025, 1, 1),
+        end_date=datetime.date(2025, 12, 31),
+        students_per_group=2,
+        teacher_id=teacher.id,
+        students=students
+    )
+    db.session.add(election)
+    db.session.commit()
+
+    for i, voter in enumerate(students):
+        partner = students[i ^ 1]
+        db.session.add(StudentVote(election_id=election.id, voter_id=voter.id, candidate_id=partner.id, score=5))
+    db.session.commit()
+    return election.id
+
+def test_generate_groups_runs_as_background_job(client, seed_users, seed_election):
+    from app.services import wait_for_job
+    from app.models import Group
+
+    login(client, **seed_users["teacher"], role="teacher")
+    res = client.get(f'/teacher/election/{seed_election}/generate-groups?format=json')
+    assert res.status_code == 202
+    job_id = res.get_json()['job_id']
+
+    wait_for_job(job_id, timeout=60)
+    status = client.get(f'/teacher/jobs/{job_id}').get_json()
+    assert status['status'] == 'finished'
+
+    # Finished jobs do not keep their futures alive
+    from app.services import job_service
+    assert job_id not in job_service._futures
+    assert status['progress'] == 1.0
+    assert status['result']['group_count'] == 3
+    assert Group.query.filter_by(election_id=seed_election).count() == 3
+
+def test_duplicate_generate_requests_merge_into_running_job(client, seed_users, seed_election):
+    from app.models import GroupingJob
+
+    running = GroupingJob(election_id=seed_election, status='running', stage='clustering', progress=0.2)
+    db.session.add(running)
+    db.session.commit()
+
+    login(client, **seed_users["teacher"], role="teacher")
+    res = client.get(f'/teacher/election/{seed_election}/generate-groups?format=json')
+    assert res.get_json()['job_id'] == running.id
+    assert GroupingJob.query.filter_by(election_id=seed_election).count() == 1
+
+    # A request for another engine is refused instead of returning the kmeans job's results
+    res = client.get(f'/teacher/election/{seed_election}/generate-groups?format=json&engine=balanced')
+    assert res.status_code == 409
+    assert res.get_json()['job_id'] == running.id and res.get_json()['engine'] == 'kmeans'
+    assert GroupingJob.query.filter_by(election_id=seed_election).count() == 1
+
+def test_group_views_use_constant_number_of_queries(client, seed_users, seed_election):
+    from app.models import Election
+    from app.dao import clear_groups_for_election, bulk_create_groups
+    from app.query_counter import count_queries
+
+    student_ids = [s.id for s in db.session.get(Election, seed_election).students]
+
+    def counts_for(groups):
+        clear_groups_for_election(seed_election)
+        bulk_create_groups(seed_election, groups, [f"G{i}" for i in range(len(groups))])
+        db.session.commit()
+        with count_queries() as teacher_view:
+            res = client.get(f'/teacher/election/{seed_election}/groups')
+            assert res.status_code == 200
+        assert int(res.headers['X-Query-Count']) == teacher_view.count
+        return teacher_view.count
+
+    login(client, **seed_users["teacher"], role="teacher")
+    # The first view builds the election's affinity snapshot
+    client.get(f'/teacher/election/{seed_election}/groups')
+    one_group = counts_for([student_ids])
+    three_groups = counts_for([student_ids[0:2], student_ids[2:4], student_ids[4:6]])
+    assert one_group == three_groups <= 6
+
+    client.get('/auth/logout')
+    login(client, email="grouped0@test.com", password="pass", role="student")
+    with count_queries() as student_view:
+        res = client.get(f'/student/election/{seed_election}/results')
+    assert res.status_code == 200
+    assert b"grouped5@test.com" in res.data
+    assert student_view.count <= 6
+
+def test_app_startup_defers_heavy_imports(tmp_path):
+    from benchmarks.bench_startup import import_profile, HEAVY_MODULES
+
+    database = tmp_path / "startup.db"
+    profile, total = import_profile(env={
+        'AUTO_CREATE_SCHEMA': 'false',
+        'DATABASE_URL': f"sqlite:///{database}"
+    })
+
+    assert not [m for m in profile if m.split('.')[0] in HEAVY_MODULES]
+    assert 'app.services.clustering_service' not in profile
+    assert total > 0
+    # Schema creation is left to `flask init-db`
+    assert not database.exists()
+
+def test_services_resolve_lazy_attributes():
+    import app.services as services
+
+    assert 'kmeans' in services.GROUPING_ENGINES
+    assert 'run_full_grouping' in dir(services)
+    with pytest.raises(AttributeError):
+        services.not_a_service
+
+def test_metrics_endpoint_reports_requests_and_queries(tmp_path):
+    from app.config import Config
+    from app.metrics import clear_metrics, REQUEST_DURATION, SLOW_QUERIES
+
+    class MetricsConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'metrics.db'}"
+        METRICS_ENABLED = True
+        METRICS_SLOW_QUERY_SECONDS = 0.0
+
+    metrics_app = create_app(MetricsConfig)
+    clear_metrics()
+    client = metrics_app.test_client()
+    with metrics_app.app_context():
+        student = Student(unique_id="student001", email="student@test.com")
+        student.set_password("studypass")
+        db.session.add(student)
+        db.session.commit()
+
+    login(client, "student@test.com", "wrong", "student")
+    assert REQUEST_DURATION.count(method='POST', endpoint='auth.login', status=200) == 1
+    assert SLOW_QUERIES.value(endpoint='auth.login') > 0
+
+    res = client.get('/metrics')
+    assert res.status_code == 200
+    assert res.mimetype == 'text/plain'
+    body = res.get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="POST",endpoint="auth.login",status="200"} 1' in body
+    assert 'http_request_db_queries_bucket{endpoint="auth.login",le="+Inf"} 1' in body
+    assert 'db_slow_queries_total{endpoint="auth.login"}' in body
+
+    # Only local scrapers, and nothing is registered when metrics are disabled
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.1.2.3'}).status_code == 403
+    assert create_app(Config).test_client().get('/metrics').status_code == 404
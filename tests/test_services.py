@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import uuid
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -51,6 +52,7 @@ def test_admin_service(session):
 
 import sys
 import os
+import json
 import uuid
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -165,3 +167,308 @@ def test_create_and_fetch_election(session):
 
     elections_by_teacher = list_elections_by_teacher(teacher.id)
     assert len(elections_by_teacher) == 1
+
+
+@pytest.fixture
+def stub_openai_server():
+    """
+    Local HTTP server standing in for the chat completions API.
+    Replies "Team <initials>", or HTTP 500 when the initials are "ZZ".
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            initials = body['messages'][-1]['content']
+            requests_seen.append(initials)
+            if initials == 'ZZ':
+                self.send_response(500)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{"error": {"message": "boom"}}')
+                return
+            payload = {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": body['model'],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"Team {initials}"}}]
+            }
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1", requests_seen
+    server.shutdown()
+
+def test_batch_group_naming_against_stub_server(stub_openai_server):
+    from app.services.openai_service import OpenAIService
+
+    base_url, requests_seen = stub_openai_server
+    namer = OpenAIService(api_key="test-key", base_url=base_url, timeout=5, max_workers=4, max_retries=0)
+
+    names = namer.generate_group_names([["Alice", "Bob"], ["Zoe", "Zack"], [], ["carl", "Dina", "Eve"]])
+
+    assert names == ["Team AB", "ZZ", "Unnamed Group", "Team CDE"]
+    assert sorted(requests_seen) == ["AB", "CDE", "ZZ"]
+
+def test_batch_group_naming_without_api_key(monkeypatch):
+    from app.services.openai_service import OpenAIService
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert OpenAIService().generate_group_names([["Ann", "Ben"], ["Cy"]]) == ["AB", "C"]
+
+def test_group_name_cache_reuses_names(app, stub_openai_server):
+    from app.models import GroupNameCache
+    from app.services.openai_service import OpenAIService
+    from app.services.name_cache_service import (
+        generate_group_names_cached, name_cache_stats, reset_name_cache_stats, name_signature
+    )
+
+    base_url, requests_seen = stub_openai_server
+    namer = OpenAIService(api_key="test-key", base_url=base_url, timeout=5, max_retries=0)
+    reset_name_cache_stats()
+
+    first = generate_group_names_cached([["Alice", "Bob"], ["Zoe", "Zack"], ["Bea", "Al"]], namer)
+    assert first == ["Team AB", "ZZ", "Team AB"]
+    # Same sorted initials share one call; the failed "ZZ" fallback is not cached
+    assert sorted(requests_seen) == ["AB", "ZZ"]
+    assert GroupNameCache.query.count() == 1
+
+    second = generate_group_names_cached([["Bob", "Anna"], ["Zed", "Zia"]], namer)
+    assert second == ["Team AB", "ZZ"]
+    assert sorted(requests_seen) == ["AB", "ZZ", "ZZ"]
+
+    stats = name_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4 and stats["stored"] == 1
+    assert GroupNameCache.query.filter_by(signature=name_signature(["Al", "Bo"])).one().hits == 1
+
+    # A new prompt version does not reuse older names
+    assert name_signature(["Al", "Bo"], prompt_version=2) != name_signature(["Al", "Bo"])
+
+def test_group_name_cache_eviction(app):
+    from datetime import timedelta
+    from app.models import GroupNameCache
+    from app.dao import store_cached_names, evict_cached_names
+
+    store_cached_names({f"1:{c}": (1, c, f"Team {c}") for c in "ABCD"})
+    db.session.commit()
+    GroupNameCache.query.filter_by(signature="1:A").one().last_used_at -= timedelta(days=2)
+    GroupNameCache.query.filter_by(signature="1:B").one().last_used_at -= timedelta(hours=1)
+    db.session.commit()
+
+    assert evict_cached_names(ttl_seconds=24 * 3600) == 1
+    assert evict_cached_names(max_entries=2) == 1
+    db.session.commit()
+    assert sorted(e.signature for e in GroupNameCache.query) == ["1:C", "1:D"]
+
+def test_submit_ballot_replaces_votes_in_one_transaction(session):
+    from app.models import StudentVote, AffinitySnapshot, VoteVersion
+    from app.services.vote_service import submit_ballot, cast_vote
+    from app.services.snapshot_service import load_vote_snapshot
+    from app.query_counter import count_queries
+
+    students = [create_student_with_id(generate_unique_id("b"), f"ballot{i}@test.com", "pw") for i in range(4)]
+    voter, a, b, c = (s.id for s in students)
+    cast_vote(1, voter, a, 5)
+    cast_vote(1, voter, b, 2)
+    cast_vote(2, voter, a, 7)  # another election is left alone
+
+    load_vote_snapshot(1)
+
+    with count_queries() as counter:
+        stored = submit_ballot(1, voter, {b: 3, c: 4, a: 0})
+    assert stored == 2
+    # DELETE + INSERT, the one-row vote-count upsert, and one SELECT + UPDATE
+    # patching the snapshot blob; student_votes is not scanned
+    assert counter.count <= 5
+    assert db.session.get(AffinitySnapshot, 1).version == db.session.get(VoteVersion, 1).version
+
+    ballot = {v.candidate_id: v.score for v in StudentVote.query.filter_by(election_id=1, voter_id=voter)}
+    assert ballot == {b: 3, c: 4}
+    assert StudentVote.query.filter_by(election_id=2, voter_id=voter).count() == 1
+
+def test_persisting_groups_uses_constant_number_of_statements(session, monkeypatch):
+    from app.models import Group, GroupMember
+    from app.services import clustering_service
+    from app.services.instrumentation_service import GroupingInstrumentation
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    students = [create_student_with_id(generate_unique_id("p"), f"persist{i}@test.com", "pw") for i in range(40)]
+    student_ids = [s.id for s in students]
+
+    def persist_queries(groups):
+        instrumentation = GroupingInstrumentation()
+        with instrumentation.run():
+            group_ids = clustering_service.create_groups_and_name(1, groups)
+        assert [sorted(m.student_id for m in GroupMember.query.filter_by(group_id=gid))
+                for gid in group_ids] == groups
+        return next(s['queries'] for s in instrumentation.stages if s['stage'] == 'persisting')
+
+    two_groups = persist_queries([student_ids[:20], student_ids[20:]])
+    twenty_groups = persist_queries([student_ids[i:i + 2] for i in range(0, 40, 2)])
+    assert two_groups == twenty_groups <= 6
+    assert Group.query.filter_by(election_id=1).count() == 20
+
+def test_migrate_indexes_dedupes_votes_and_is_idempotent(session):
+    from sqlalchemy import text, inspect
+    from app.models import StudentVote
+    from app.scripts.migrate_indexes import migrate_indexes
+
+    # Simulate a database created before the indexes existed
+    with db.engine.begin() as connection:
+        for name in ('uq_student_votes_ballot', 'ix_student_votes_election_candidate', 'ix_groups_election_id'):
+            connection.execute(text(f"DROP INDEX {name}"))
+        connection.execute(text(
+            "INSERT INTO student_votes (election_id, voter_id, candidate_id, score) "
+            "VALUES (1, 1, 2, 3), (1, 1, 2, 5), (1, 2, 1, 4)"
+        ))
+
+    report = migrate_indexes()
+    assert report['duplicates_removed'] == 1
+    assert sorted(report['indexes_created']) == [
+        'ix_groups_election_id', 'ix_student_votes_election_candidate', 'uq_student_votes_ballot'
+    ]
+    assert {v.score for v in StudentVote.query.filter_by(voter_id=1)} == {5}
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('student_votes')}
+    assert 'uq_student_votes_ballot' in index_names
+
+    assert migrate_indexes() == {'duplicates_removed': 0, 'indexes_created': []}
+
+def test_affinity_snapshot_tracks_vote_writes(session, monkeypatch):
+    from app.models import AffinitySnapshot, VoteVersion
+    from app.services.vote_service import cast_vote, submit_ballot, delete_votes_by_student
+    from app.services.affinity_service import affinity_for_election
+    from app.services.snapshot_service import load_vote_snapshot, election_matrices, votes_map_for_election
+    import app.services.snapshot_service as snapshot_service
+
+    ids = [create_student_with_id(generate_unique_id("s"), f"snap{i}@test.com", "pw").id for i in range(5)]
+    submit_ballot(7, ids[0], {ids[1]: 3, ids[2]: 1})
+    cast_vote(7, ids[1], ids[0], 2)
+
+    # First read builds the snapshot from the rows, at the current vote count
+    _, _, version = load_vote_snapshot(7)
+    assert version == 2 and db.session.get(AffinitySnapshot, 7).version == 2
+
+    # Each write patches the snapshot in its own transaction, so reads do not rebuild it
+    cast_vote(7, ids[3], ids[4], 5)
+    submit_ballot(7, ids[0], {ids[2]: 4, ids[3]: 2})
+    delete_votes_by_student(7, ids[1])
+    cast_vote(7, ids[0], ids[3], 1)
+    assert db.session.get(VoteVersion, 7).version == 6
+    assert db.session.get(AffinitySnapshot, 7).version == 6
+    monkeypatch.setattr(snapshot_service, "load_vote_arrays", None)
+    assert votes_map_for_election(7) == {ids[0]: {ids[2]: 4, ids[3]: 1}, ids[3]: {ids[4]: 5}}
+    monkeypatch.undo()
+
+    roster = ids[::-1]
+    affinity, votes = election_matrices(7, roster)
+    expected_affinity, expected_votes = affinity_for_election(7, roster)
+    assert (affinity != expected_affinity).nnz == 0
+    assert (votes != expected_votes).nnz == 0
+
+    # A vote committed while a reader rebuilds is missing from the stored blob,
+    # but the blob is tagged with the count read before the rows, so it is rebuilt
+    db.session.delete(db.session.get(AffinitySnapshot, 7))
+    db.session.commit()
+    load_vote_arrays = snapshot_service.load_vote_arrays
+
+    def racing_load(election_id):
+        arrays = load_vote_arrays(election_id)
+        cast_vote(7, ids[4], ids[0], 1)
+        return arrays
+
+    monkeypatch.setattr(snapshot_service, "load_vote_arrays", racing_load)
+    assert ids[4] not in votes_map_for_election(7)
+    monkeypatch.setattr(snapshot_service, "load_vote_arrays", load_vote_arrays)
+    assert votes_map_for_election(7)[ids[4]] == {ids[0]: 1}
+
+def test_streaming_export_and_import_round_trip(session):
+    import csv
+    from app.models import Election, StudentVote, Student, Teacher
+    from sqlalchemy.dialects import postgresql
+    from app.services.export_service import iter_ndjson, iter_csv, import_ndjson, sequence_reset
+
+    teacher = create_teacher_with_id(generate_unique_id("t"), "export@test.com", "pw", "Tea", "Cher", "Art")
+    students = [create_student_with_id(generate_unique_id("s"), f"export{i}@test.com", "pw", f"S{i}") for i in range(4)]
+    elections = []
+    for title, members in (("First", students[:3]), ("Second", students[2:])):
+        election = Election(title=title, end_date=datetime(2025, 6, 1), teacher_id=teacher.id, students=members)
+        db.session.add(election)
+        elections.append(election)
+    db.session.commit()
+    for voter, candidate in ((0, 1), (1, 2), (2, 0)):
+        db.session.add(StudentVote(election_id=elections[0].id, voter_id=students[voter].id,
+                                   candidate_id=students[candidate].id, score=voter + 1))
+    db.session.add(StudentVote(election_id=elections[1].id, voter_id=students[3].id,
+                               candidate_id=students[2].id, score=4))
+    db.session.commit()
+
+    # Per-election dump: its teacher, members, election and votes only
+    scoped = [json.loads(line) for line in iter_ndjson(election_id=elections[1].id, chunk_size=2)]
+    by_table = {}
+    for record in scoped:
+        by_table.setdefault(record['table'], []).append(record['row'])
+    assert sorted(r['email'] for r in by_table['students']) == ["export2@test.com", "export3@test.com"]
+    assert [r['score'] for r in by_table['student_votes']] == [4]
+    assert 'admins' not in by_table
+
+    rows = list(csv.DictReader("".join(iter_csv('student_votes', chunk_size=2)).splitlines()))
+    assert [int(r['score']) for r in rows] == [1, 2, 3, 4]
+
+    with pytest.raises(ValueError):
+        list(iter_ndjson(tables=['passwords']))
+
+    # Full dump restores into an empty schema with the same rows
+    dump = list(iter_ndjson(chunk_size=2))
+    first_id = elections[0].id
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    counts = import_ndjson(dump, batch_size=2)
+
+    assert counts['students'] == 4 and counts['student_votes'] == 4 and counts['election_students'] == 5
+    restored = db.session.get(Election, first_id)
+    assert restored.title == "First" and restored.end_date == datetime(2025, 6, 1)
+    assert sorted(s.email for s in restored.students) == ["export0@test.com", "export1@test.com", "export2@test.com"]
+    assert Teacher.query.one().check_password("pw")
+    assert Student.query.count() == 4
+
+    # New rows get fresh IDs after an import (PostgreSQL needs its sequences moved)
+    new_student = create_student_with_id(generate_unique_id("s"), "after-import@test.com", "pw")
+    assert new_student.id > max(s.id for s in students)
+    assert Student.query.count() == 5
+    reset = str(sequence_reset(Student.__table__).compile(dialect=postgresql.dialect()))
+    assert "setval(pg_get_serial_sequence(" in reset and "max(students.id)" in reset
+
+def test_generate_dataset_bulk_inserts_structured_ballots(session):
+    import numpy as np
+    from app.models import Election, Student, StudentVote
+    from app.scripts.generate_dataset import generate_dataset, synthetic_ballots
+
+    voters, candidates, _ = synthetic_ballots(400, votes_per_student=8, clique_size=4, clique_share=0.7,
+                                              popularity_skew=1.0, mutual_share=0.5, seed=3)
+    pairs = set(zip(voters.tolist(), candidates.tolist()))
+    assert len(pairs) == len(voters) and not np.any(voters == candidates)
+    mutual = sum((c, v) in pairs for v, c in pairs) / len(pairs)
+    assert mutual > 0.4
+
+    report = generate_dataset(120, password="secret", votes_per_student=6, seed=1)
+    election = db.session.get(Election, report['election_id'])
+    assert len(election.students) == 120
+    assert StudentVote.query.filter_by(election_id=election.id).count() == report['votes'] == 120 * 6
+    hashes = {s.password_hash for s in Student.query}
+    assert len(hashes) == 1
+    assert Student.query.first().check_password("secret")